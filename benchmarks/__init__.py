@@ -0,0 +1 @@
+"""Offline benchmarks for ncei_access, see benchmarks/run.py."""
@@ -0,0 +1,284 @@
+"""
+Offline benchmarks for ncei_access, run against the local stand-in server.
+
+    python -m benchmarks.run                        # print results
+    python -m benchmarks.run --save baseline.json   # save a baseline
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+With --compare, any metric more than --tolerance worse than the baseline is reported
+and the exit status is 1. Timings only compare on the machine and settings that made
+the baseline, so when those differ the comparison is skipped; save a baseline on the
+machine that runs the comparison.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.stub_server import StubConfig, StubServer
+from ncei_access.ncei_accessor import NceiAccessor
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Whether a larger value of a metric is better, by metric name suffix.
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_s", "_ms", "_mib")
+
+
+def cpu_model() -> str:
+    """Model name of the CPU where the OS reports it, else its architecture."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine(args) -> Dict:
+    """What a baseline's timings depend on besides the code: the machine, the Python
+    and the benchmark settings."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "latency_s": args.latency,
+        "padding": args.padding,
+        "error_rate": args.error_rate,
+    }
+
+
+def machine_differences(current: Dict, baseline: Dict) -> List[str]:
+    """Keys of the machine description that differ between two results documents."""
+    current, baseline = current.get("machine", {}), baseline.get("machine", {})
+    if not baseline:
+        return ["machine"]
+    keys = sorted(set(current) | set(baseline))
+    return [k for k in keys if current.get(k) != baseline.get(k)]
+
+
+def timed(func: Callable, repeat: int = 3) -> float:
+    """Best wall time of func() over repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def percentile(values: List[float], q: float) -> float:
+    """q-th percentile (0-100) of values, by nearest rank."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_import(repeat: int = 5) -> Dict[str, float]:
+    """Time to import the package and the accessor in a fresh interpreter."""
+    code = (
+        "import time; t = time.perf_counter(); import ncei_access; "
+        "t1 = time.perf_counter(); import ncei_access.ncei_accessor; "
+        "t2 = time.perf_counter(); print(t1 - t, t2 - t)"
+    )
+    package, accessor = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        package.append(float(out[0]))
+        accessor.append(float(out[1]))
+    return {
+        "import_package_ms": statistics.median(package) * 1000,
+        "import_accessor_ms": statistics.median(accessor) * 1000,
+    }
+
+
+def bench_get_daily(
+    server: StubServer, station_counts: List[int], spans: List[int]
+) -> Dict[str, float]:
+    """get_daily throughput for every combination of station count and days."""
+    results = {}
+    ncei_db = NceiAccessor(rest_adapter=server.rest_adapter(), max_workers=8)
+    end = date(2024, 12, 31)
+    for count in station_counts:
+        stations = [f"USC{i:08d}" for i in range(count)]
+        for days in spans:
+            start = (end - timedelta(days=days - 1)).isoformat()
+            chunk = "year" if days > 366 else None
+            rows = []
+
+            def run():
+                rows[:] = ncei_db.get_daily(
+                    ["TMAX", "TMIN", "PRCP"],
+                    stations,
+                    start,
+                    end.isoformat(),
+                    chunk=chunk,
+                )
+
+            seconds = timed(run)
+            name = f"get_daily_{count}st_{days}d"
+            results[f"{name}_s"] = seconds
+            results[f"{name}_rows_per_s"] = len(rows) / seconds
+    return results
+
+
+def bench_find_closest(server: StubServer, calls: int = 30) -> Dict[str, float]:
+    """find_closest_station latency at random points inside the station grid."""
+    ncei_db = NceiAccessor(rest_adapter=server.rest_adapter())
+    rng = random.Random(1)
+    latencies = []
+    for _ in range(calls):
+        lat, lon = rng.uniform(30, 45), rng.uniform(-120, -70)
+        start = time.perf_counter()
+        ncei_db.find_closest_station(lat, lon, data_type="TMAX")
+        latencies.append(time.perf_counter() - start)
+    return {
+        "find_closest_p50_ms": percentile(latencies, 50) * 1000,
+        "find_closest_p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+def bench_throttled(server: StubServer, error_rate: float) -> Dict[str, float]:
+    """get_daily over many chunks while the server answers some requests with 429."""
+    previous = server.config.error_rate
+    server.config.error_rate = error_rate
+    try:
+        ncei_db = NceiAccessor(
+            rest_adapter=server.rest_adapter(retries=5, backoff_factor=0.01),
+            max_workers=8,
+        )
+        before = server.config.throttled
+        seconds = timed(
+            lambda: ncei_db.get_daily(
+                "TMAX", "USC00000001", "1990-01-01", "2019-12-31", chunk="year"
+            ),
+            repeat=1,
+        )
+        return {
+            "throttled_get_daily_s": seconds,
+            "throttled_responses": server.config.throttled - before,
+        }
+    finally:
+        server.config.error_rate = previous
+
+
+def bench_memory(server: StubServer) -> Dict[str, float]:
+    """Peak Python heap while fetching and merging a large chunked request."""
+    ncei_db = NceiAccessor(rest_adapter=server.rest_adapter(), max_workers=4)
+    stations = [f"USC{i:08d}" for i in range(20)]
+    tracemalloc.start()
+    try:
+        ncei_db.get_daily(
+            ["TMAX", "TMIN", "PRCP"], stations, "2015-01-01", "2024-12-31", chunk="year"
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"get_daily_peak_mib": peak / 2**20}
+
+
+def run(args) -> Dict:
+    """Run every benchmark and return the results document."""
+    results = {}
+    results.update(bench_import())
+    config = StubConfig(latency=args.latency, padding=args.padding)
+    with StubServer(config) as server:
+        results.update(bench_get_daily(server, args.stations, args.days))
+        results.update(bench_find_closest(server))
+        results.update(bench_throttled(server, args.error_rate))
+        results.update(bench_memory(server))
+        requests_served = server.config.requests
+    return {
+        "machine": machine(args),
+        "meta": {"requests_served": requests_served},
+        "results": {k: round(v, 4) for k, v in results.items()},
+    }
+
+
+def regressions(
+    current: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    """Metrics that got worse than baseline by more than tolerance (a fraction)."""
+    found = []
+    for name, old in baseline.items():
+        new = current.get(name)
+        if new is None or not old:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = new < old * (1 - tolerance)
+        elif name.endswith(LOWER_IS_BETTER):
+            worse = new > old * (1 + tolerance)
+        else:
+            continue
+        if worse:
+            found.append(f"{name}: {old} -> {new} ({(new - old) / old:+.0%})")
+    return found
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365, 3650])
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="seconds per response"
+    )
+    parser.add_argument("--padding", type=int, default=0, help="extra bytes per row")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.1, help="fraction of 429s"
+    )
+    parser.add_argument("--save", type=Path, help="write the results to this file")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="compare even if the baseline was made on another machine",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+    document = run(args)
+    print(json.dumps(document, indent=2))
+
+    if args.save:
+        args.save.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        differences = machine_differences(document, baseline)
+        if differences and not args.force:
+            print(
+                f"Not comparing: {args.compare} was made on a different machine or "
+                f"with different settings ({', '.join(differences)}).",
+                file=sys.stderr,
+            )
+            return 0
+        worse = regressions(document["results"], baseline["results"], args.tolerance)
+        for line in worse:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if worse else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Local stand-in for the NCEI Access API, used by the benchmarks so they run without a
+network. Responses are built from the recorded payload shapes in fixtures/: every
+requested station and day gets a copy of the recorded daily row, and station searches
+return copies of the recorded search result spread on a grid.
+"""
+
+import copy
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BASE_PATH = "/access/services/"
+
+
+def load_fixture(name: str):
+    """Parsed JSON fixture from benchmarks/fixtures."""
+    with (FIXTURES / name).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def station_grid(
+    spacing: float = 0.25,
+    north: float = 50.0,
+    west: float = -125.0,
+    south: float = 25.0,
+    east: float = -65.0,
+) -> List[Dict]:
+    """Copies of the recorded search result, one every spacing degrees."""
+    template = load_fixture("search_result.json")
+    results = []
+    rows = int((north - south) / spacing)
+    cols = int((east - west) / spacing)
+    for i in range(rows):
+        for j in range(cols):
+            result = copy.deepcopy(template)
+            result["stations"][0]["id"] = f"USC{i:04d}{j:04d}"
+            result["stations"][0]["name"] = f"STUB STATION {i}-{j}"
+            result["location"]["coordinates"] = [
+                round(west + j * spacing, 4),
+                round(south + i * spacing, 4),
+            ]
+            results.append(result)
+    return results
+
+
+class StubConfig:
+    """Behaviour of the stand-in server. Attributes can be changed while it runs.
+
+    - latency: Seconds each response is delayed, like a round trip to NCEI.
+    - error_rate: Fraction of requests answered with 429 and Retry-After: 0.
+    - padding: Extra characters added to every daily row, to grow payloads.
+    """
+
+    def __init__(
+        self, latency: float = 0.0, error_rate: float = 0.0, padding: int = 0
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.padding = padding
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.random = random.Random(0)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves data/v1 and search/v1/data like NCEI does."""
+
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        config = self.server.config
+        with config.lock:
+            config.requests += 1
+            throttle = config.random.random() < config.error_rate
+            if throttle:
+                config.throttled += 1
+        if config.latency:
+            time.sleep(config.latency)
+        if throttle:
+            self._send(429, b"{}", {"Retry-After": "0"})
+            return
+
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        endpoint = url.path[len(BASE_PATH) :].strip("/")
+        if endpoint == "data/v1":
+            self._daily(params)
+        elif endpoint == "search/v1/data":
+            self._search(params)
+        else:
+            self._send(404, b'{"errorMessage": "not found"}')
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.config.lock:
+            self.server.config.bytes_sent += len(body)
+
+    def _daily(self, params: Dict[str, List[str]]):
+        template = self.server.daily_template
+        data_types = params.get("dataTypes", [])
+        stations = params.get("stations", [])
+        start = date.fromisoformat(params["startDate"][0][:10])
+        end = date.fromisoformat(params["endDate"][0][:10])
+        padding = self.server.config.padding
+        rows = []
+        day = start
+        while day <= end:
+            iso = day.isoformat()
+            for station in stations:
+                row = {"DATE": iso, "STATION": station}
+                for data_type in data_types:
+                    row[data_type] = template.get(data_type, "0")
+                if padding:
+                    row["PADDING"] = "x" * padding
+                rows.append(row)
+            day += timedelta(days=1)
+        if params.get("format", ["json"])[0] == "csv":
+            self._send(200, _to_csv(rows, data_types).encode("utf-8"))
+            return
+        self._send(200, json.dumps(rows).encode("utf-8"))
+
+    def _search(self, params: Dict[str, List[str]]):
+        if "stations" in params:
+            wanted = set(params["stations"])
+            results = [
+                r for r in self.server.stations if r["stations"][0]["id"] in wanted
+            ]
+        else:
+            north, west, south, east = map(float, params["bbox"][0].split(","))
+            results = [
+                r
+                for r in self.server.stations
+                if south <= r["location"]["coordinates"][1] <= north
+                and west <= r["location"]["coordinates"][0] <= east
+            ]
+        limit = int(params.get("limit", ["1000"])[0])
+        body = {"totalCount": len(results), "results": results[:limit]}
+        self._send(200, json.dumps(body).encode("utf-8"))
+
+
+def _to_csv(rows: List[Dict], data_types: List[str]) -> str:
+    header = ["STATION", "DATE"] + list(data_types)
+    lines = [",".join(f'"{h}"' for h in header)]
+    for row in rows:
+        lines.append(",".join(f'"{str(row.get(h, "")).strip()}"' for h in header))
+    return "\n".join(lines) + "\n"
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stand-in server on 127.0.0.1. Use as a context manager:
+
+    .. code-block:: python
+
+        with StubServer(StubConfig(latency=0.02)) as server:
+            ncei_db = NceiAccessor(rest_adapter=server.rest_adapter())
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: StubConfig = None, stations: List[Dict] = None):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.config = config or StubConfig()
+        self.daily_template = load_fixture("daily_row.json")
+        self.stations = stations if stations is not None else station_grid()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to use in place of https://www.ncei.noaa.gov/access/services/."""
+        return f"http://127.0.0.1:{self.server_address[1]}{BASE_PATH}"
+
+    def rest_adapter(self, **kwargs):
+        """RestAdapter pointed at this server."""
+        # pylint: disable=import-outside-toplevel
+        from ncei_access.rest_adapter import RestAdapter
+
+        adapter = RestAdapter(**kwargs)
+        adapter.url = self.base_url
+        return adapter
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
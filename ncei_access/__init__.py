@@ -1,15 +1,29 @@
 """
 Includes dataType_ref and dataSet_ref objects.
+
+Both are read-only mappings that are only loaded on first access, so importing the
+package doesn't parse the bundled metadata. The parsed metadata is pickled into the
+ncei_access cache directory and reused until the bundled JSON changes.
 """
 
-import json
-from pathlib import Path
+import os
+from collections.abc import Mapping
+
+_data_dir = os.path.join(os.path.dirname(__file__), "data")
+
+# Bump when DataType or DataSet change so stale pickles are ignored.
+_METADATA_CACHE_VERSION = 1
 
-_data_path = Path(__file__).parent / "data" / "daily-summaries.json"
 
-with _data_path.open("r", encoding="utf-8") as f:
-    _data = json.load(f)
-    _data = _data["dataTypes"]
+def _cache_root() -> str:
+    """See ncei_access.cache.default_cache_dir. Kept here so the metadata cache can be
+    found without importing the response cache module."""
+    if os.environ.get("NCEI_ACCESS_CACHE_DIR"):
+        return os.environ["NCEI_ACCESS_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "ncei_access")
 
 
 class DataType:
@@ -39,15 +53,6 @@ class DataType:
         self.scale_weight = d.get("scaleWeight")
 
 
-dataType_ref = {d["id"]: DataType(d) for d in _data}
-
-
-_datasets_path = Path(__file__).parent / "data" / "datasets.json"
-
-with _datasets_path.open("r", encoding="utf-8") as f:
-    _datasets = json.load(f)
-
-
 class DataSet:
     """Contains metadata for the different data sets in the Access API. Here we include
     the following attributes but they are not comprehensive:
@@ -63,4 +68,95 @@ class DataSet:
         self.data_types = d.get("dataTypes", [])
 
 
-dataSet_ref = {d["id"]: DataSet(d) for d in _datasets}
+class LazyRef(Mapping):
+    """Read-only mapping of ID -> metadata object, built from a bundled JSON file the
+    first time it is used.
+
+    The built mapping is pickled to the ncei_access cache directory, keyed by the size
+    and modification time of the JSON file, so later processes skip JSON parsing. If
+    the cache can't be read or written, whatever the reason, the JSON is parsed as
+    usual and a bad cache file is replaced.
+    """
+
+    def __init__(self, filename: str, build):
+        """
+        :param filename: Name of the JSON file in ncei_access/data.
+        :param build: Function turning the parsed JSON into a dict of ID -> object.
+        """
+        self._path = os.path.join(_data_dir, filename)
+        self._build = build
+        self._data = None
+
+    def _cache_path(self) -> str:
+        stat = os.stat(self._path)
+        name = os.path.splitext(os.path.basename(self._path))[0]
+        stamp = f"{_METADATA_CACHE_VERSION}-{stat.st_size}-{stat.st_mtime_ns}"
+        return os.path.join(_cache_root(), "metadata", f"{name}-{stamp}.pickle")
+
+    def _load(self) -> dict:
+        if self._data is not None:
+            return self._data
+        import pickle  # pylint: disable=import-outside-toplevel
+
+        cache_path = None
+        try:
+            cache_path = self._cache_path()
+            with open(cache_path, "rb") as f:
+                data = pickle.load(f)
+            if not isinstance(data, dict):
+                raise TypeError(f"expected a dict, got {type(data).__name__}")
+            self._data = data
+            return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            # A stale or corrupt pickle can raise about anything, eg. ImportError
+            # for a class that moved. It is rebuilt from the JSON below.
+            import logging  # pylint: disable=import-outside-toplevel
+
+            logging.getLogger(__name__).warning(
+                f"Ignoring unreadable metadata cache {cache_path}: {e!r}"
+            )
+
+        import json  # pylint: disable=import-outside-toplevel
+
+        with open(self._path, "r", encoding="utf-8") as f:
+            data = self._build(json.load(f))
+        if cache_path:
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+        self._data = data
+        return data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __contains__(self, key) -> bool:
+        return key in self._load()
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._data is not None else "not loaded"
+        return f"<LazyRef {os.path.basename(self._path)} ({state})>"
+
+
+dataType_ref = LazyRef(
+    "daily-summaries.json",
+    lambda data: {d["id"]: DataType(d) for d in data["dataTypes"]},
+)
+
+dataSet_ref = LazyRef(
+    "datasets.json",
+    lambda data: {d["id"]: DataSet(d) for d in data},
+)
@@ -0,0 +1,161 @@
+"""
+Asyncio counterpart of NceiAccessor. Needs the optional aiohttp dependency
+(``pip install ncei-access[async]``).
+"""
+
+import asyncio
+import logging
+from typing import List, Union
+from ncei_access.async_rest_adapter import AsyncRestAdapter
+from ncei_access.models import Station
+from ncei_access.ncei_accessor import (
+    SEARCH_LIMIT,
+    boundary_params,
+    closest_station,
+    collect_search_results,
+    daily_params,
+    split_bounds,
+    station_from_result,
+    station_params,
+)
+
+
+class AsyncNceiAccessor:
+    """High level asyncio class to interact with NCEI Access API. Every method is a
+    coroutine with the same arguments and results as its NceiAccessor counterpart, so
+    many calls can be gathered on one event loop:
+
+    .. code-block:: python
+
+        async with AsyncNceiAccessor() as ncei_db:
+            results = await asyncio.gather(
+                *(ncei_db.get_daily("TMAX", s) for s in station_ids)
+            )
+    """
+
+    def __init__(
+        self, logger: logging.Logger = None, rest_adapter: AsyncRestAdapter = None
+    ):
+        """
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        :param rest_adapter: (optional) Configured AsyncRestAdapter to use, eg. to tune the concurrency limit or to share one pool between accessors. Defaults to None
+        """  # pylint: disable=line-too-long
+        self._rest_adapter = rest_adapter or AsyncRestAdapter(logger=logger)
+        self._logger = logger or logging.getLogger(__name__)
+
+    async def close(self):
+        """Close the underlying adapter's connections."""
+        await self._rest_adapter.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def get_daily(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+    ) -> list:
+        """Obtain daily data from user specified stations. See NceiAccessor.get_daily."""
+        params = daily_params(data_types, stations, start, end)
+        temps = await self._rest_adapter.get(ep_params=params)
+
+        return temps.data
+
+    async def get_daily_hilow(
+        self, stations, start: str = "2024-04-21", end: str = "2025-04-21"
+    ) -> list:
+        """Obtain daily high and low temperatures. See NceiAccessor.get_daily_hilow."""
+        return await self.get_daily(
+            data_types=["TMAX", "TMIN"],
+            stations=stations,
+            start=start,
+            end=end,
+        )
+
+    async def find_closest_station(
+        self, lat, lon, data_type: str = "", start_date: str = "", end_date: str = ""
+    ) -> Station:
+        """Find closest station to provided coordinates. See
+        NceiAccessor.find_closest_station."""
+        area_width = 0.5
+
+        for attempt in range(1, 11):
+            self._logger.debug(
+                msg=f"Attempt {attempt} to find closest station to lat={lat}, lon={lon}."  # pylint: disable=line-too-long
+            )
+
+            stations = await self.stations_in_boundary(
+                north=lat + area_width,
+                west=lon - area_width,
+                south=lat - area_width,
+                east=lon + area_width,
+            )
+
+            closest = closest_station(
+                stations, lat, lon, data_type, start_date, end_date
+            )
+            if closest is not None:
+                return closest
+            area_width = area_width * 1.5
+
+        self._logger.error(msg="No stations found within bounds after 10 attempts.")
+        return None
+
+    async def stations_in_boundary(
+        self,
+        north: float,
+        west: float,
+        south: float,
+        east: float,
+        max_depth: int = 8,
+        start: str = None,
+        end: str = None,
+    ) -> list:
+        """Find all stations within bounds that have at least some data within the last
+        100 days, or between start and end when given, splitting full searches into
+        quadrant tiles. See NceiAccessor.stations_in_boundary."""
+        results_by_id = {}
+        tiles = [(north, west, south, east)]
+        for depth in range(max_depth + 1):
+            found = await asyncio.gather(
+                *(
+                    self._rest_adapter.get(
+                        endpoint="search/v1/data",
+                        ep_params=boundary_params(*tile, start=start, end=end),
+                    )
+                    for tile in tiles
+                )
+            )
+            truncated = collect_search_results(
+                results_by_id, tiles, [r.data for r in found]
+            )
+            if not truncated:
+                break
+            if depth == max_depth:
+                self._logger.warning(
+                    f"{len(truncated)} tiles still have {SEARCH_LIMIT} stations after splitting {max_depth} times, some stations may be missing."  # pylint: disable=line-too-long
+                )
+                break
+            tiles = [quadrant for tile in truncated for quadrant in split_bounds(*tile)]
+
+        return [station_from_result(r) for r in results_by_id.values()]
+
+    async def find_station(self, station_id: str) -> Station:
+        """Get a station by its ID. See NceiAccessor.find_station."""
+        params = station_params(station_id)
+
+        station_results = await self._rest_adapter.get(
+            endpoint="search/v1/data", ep_params=params
+        )
+        station_results = station_results.data
+
+        if not station_results or not station_results[0]["stations"]:
+            self._logger.error(f"No station found with ID {station_id}.")
+            return None
+
+        return station_from_result(station_results[0])
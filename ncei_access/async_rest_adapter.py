@@ -0,0 +1,349 @@
+"""
+Low level asyncio counterpart of RestAdapter. Needs the optional aiohttp dependency
+(``pip install ncei-access[async]``).
+"""
+
+import asyncio
+import logging
+import time
+from json import JSONDecodeError
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - exercised only without the extra
+    aiohttp = None
+
+from ncei_access import jsonlib
+from ncei_access.cache import ResponseCache, request_key
+from ncei_access.exceptions import NceiAccessException
+from ncei_access.metrics import RequestEvent, emit
+from ncei_access.models import Result
+from ncei_access.ratelimit import RateLimiter
+from ncei_access.rest_adapter import (
+    RETRY_STATUSES,
+    backoff_delay,
+    make_result,
+    prepare_params,
+    retry_after_seconds,
+)
+
+
+def encode_params(ep_params: Dict) -> List[Tuple[str, str]]:
+    """Flatten parameters the way requests does: lists become repeated keys and every
+    value is sent as a string.
+
+    :param ep_params: parameters for API call.
+    :return: List of (key, value) pairs.
+    """
+    pairs = []
+    for key, value in ep_params.items():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        pairs.extend((key, str(v)) for v in values if v is not None)
+    return pairs
+
+
+def connection_trace_config() -> "aiohttp.TraceConfig":
+    """aiohttp tracing that adds the time spent opening connections to the
+    RequestEvent passed as a request's trace_request_ctx."""
+
+    async def on_start(session, context, params):  # pylint: disable=unused-argument
+        context.connect_started = time.perf_counter()
+
+    async def on_end(session, context, params):  # pylint: disable=unused-argument
+        event = context.trace_request_ctx
+        if isinstance(event, RequestEvent):
+            elapsed = time.perf_counter() - context.connect_started
+            event.connect = (event.connect or 0.0) + elapsed
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_start)
+    trace_config.on_connection_create_end.append(on_end)
+    return trace_config
+
+
+class AsyncRestAdapter:
+    """Low level asyncio tool for accessing API.
+
+    Every coroutine shares one aiohttp.ClientSession and so one connection pool. At most
+    max_concurrency requests are in flight at once; further calls wait on a semaphore,
+    so it is safe to gather hundreds of calls at a time. Identical requests in flight at
+    the same time are coalesced like in RestAdapter. The response cache and the rate
+    limiter block on SQLite and file locks, so they are called in worker threads to
+    keep the event loop free.
+    """
+
+    def __init__(
+        self,
+        hostname: str = "www.ncei.noaa.gov/access/services",
+        logger: logging.Logger = None,
+        timeout: float = 10,
+        max_concurrency: int = 20,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 60.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        session: "aiohttp.ClientSession" = None,
+        cache: ResponseCache = None,
+        coalesce: bool = True,
+        rate_limiter: RateLimiter = None,
+        listeners: Iterable[Callable] = None,
+        decoder: Callable[[bytes], Any] = None,
+    ):
+        """
+        :param hostname: Normally, www.ncei.noaa.gov/access/services, defaults to "www.ncei.noaa.gov/access/services"
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        :param timeout: Seconds to wait for the server to connect and to send data, defaults to 10
+        :param max_concurrency: Maximum number of requests in flight, also the size of the connection pool, defaults to 20
+        :param retries: Number of times to retry a request after a connection error or a status in retry_statuses, defaults to 3
+        :param backoff_factor: Base of the exponential backoff between retries in seconds, defaults to 0.5
+        :param backoff_max: Maximum backoff (and maximum honored Retry-After) in seconds, defaults to 60.0
+        :param retry_statuses: HTTP status codes that are retried, defaults to (429, 500, 502, 503, 504)
+        :param session: (optional) aiohttp.ClientSession to use instead of creating one. Defaults to None
+        :param cache: (optional) ResponseCache to serve repeated requests from disk. Defaults to None
+        :param coalesce: Share one request between coroutines asking for the same thing at the same time, defaults to True
+        :param rate_limiter: (optional) RateLimiter every attempt goes through, possibly shared with other adapters and processes. Its max_concurrency is not used, max_concurrency above applies instead. Defaults to None
+        :param listeners: (optional) Callables receiving a ncei_access.metrics.RequestEvent after every get, eg. a Metrics object. Defaults to None
+        :param decoder: (optional) Function decoding a response body from bytes. Defaults to ncei_access.jsonlib.loads, which uses orjson or msgspec when installed
+        """  # pylint: disable=line-too-long
+        if aiohttp is None and session is None:
+            raise ImportError(
+                "AsyncRestAdapter requires aiohttp: pip install ncei-access[async]"
+            )
+
+        self.url = f"https://{hostname}/"
+        self._logger = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.cache = cache
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._inflight = {}
+        self.rate_limiter = rate_limiter
+        self.listeners = list(listeners or [])
+        self.decoder = decoder or jsonlib.loads
+        self._session = session
+        self._owns_session = session is None
+        # Created lazily so the adapter can be built outside of a running event loop.
+        self._semaphore = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self.timeout, sock_connect=self.timeout),  # pylint: disable=line-too-long
+                headers={"Accept-Encoding": "gzip, deflate"},
+                trace_configs=[connection_trace_config()],
+            )
+            self._owns_session = True
+        return self._session
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def close(self):
+        """Close the pooled connections if the adapter created the session."""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _send(
+        self, full_url: str, ep_params: Dict, event: RequestEvent = None
+    ) -> Tuple[int, str, object]:
+        """Send a GET request with the same retry policy as RestAdapter._send.
+
+        :return: Status code, reason and decoded JSON body of the last response.
+        :raises NceiAccessException: If every attempt failed or the body is not JSON.
+        """
+        session = self._get_session()
+        params = encode_params(ep_params)
+        limiter = self.rate_limiter
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await asyncio.sleep(await asyncio.to_thread(limiter.reserve))
+            kwargs = {}
+            if event is not None:
+                event.attempts = attempt + 1
+                kwargs["trace_request_ctx"] = event
+                sent = time.perf_counter()
+            try:
+                async with session.get(full_url, params=params, **kwargs) as response:
+                    status_code = response.status
+                    if event is not None:
+                        event.ttfb = time.perf_counter() - sent
+                        event.status_code = status_code
+                    retry_after = None
+                    if status_code in self.retry_statuses:
+                        retry_after = retry_after_seconds(
+                            response.headers.get("Retry-After")
+                        )
+                        if retry_after is not None:
+                            retry_after = min(retry_after, self.backoff_max)
+                    if limiter is not None:
+                        await asyncio.to_thread(
+                            limiter.feedback, status_code, retry_after
+                        )
+                    if status_code in self.retry_statuses and attempt < self.retries:
+                        delay = retry_after
+                        if delay is None:
+                            delay = backoff_delay(
+                                attempt, self.backoff_factor, self.backoff_max
+                            )
+                        elif (
+                            limiter is not None
+                            and status_code in limiter.throttle_statuses
+                        ):
+                            # The limiter holds every request back until Retry-After
+                            # passes.
+                            delay = 0.0
+                        self._logger.warning(
+                            f"url={full_url}, attempt={attempt + 1}, status_code={status_code}, retrying in {delay:.2f}s"  # pylint: disable=line-too-long
+                        )
+                    else:
+                        start = time.perf_counter()
+                        body = await response.read()
+                        decode_start = time.perf_counter()
+                        try:
+                            data_out = self.decoder(body)
+                        except (ValueError, JSONDecodeError) as e:
+                            self._logger.error(
+                                f"url={full_url}, params={ep_params}, success=False, message={e}"  # pylint: disable=line-too-long
+                            )
+                            raise NceiAccessException("Bad JSON in response") from e
+                        if event is not None:
+                            event.download = decode_start - start
+                            event.decode = time.perf_counter() - decode_start
+                            event.bytes = len(body)
+                        return status_code, response.reason, data_out
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries:
+                    self._logger.error(msg=f"Request failed: {e}")
+                    raise NceiAccessException("Request failed") from e
+                delay = backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+                self._logger.warning(
+                    f"url={full_url}, attempt={attempt + 1}, error={e}, retrying in {delay:.2f}s"  # pylint: disable=line-too-long
+                )
+            except aiohttp.ClientError as e:
+                self._logger.error(msg=f"Request failed: {e}")
+                raise NceiAccessException("Request failed") from e
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, endpoint: str = "data/v1/", ep_params: Dict = None) -> Result:
+        """Fundamental coroutine for getting data. See RestAdapter.get.
+
+        :param endpoint: API endpoint, eg. "data/v1/" or "search/v1/data".
+        :param ep_params: parameters for API call, defaults to None
+        :raises NceiAccessException: If the request fails, the body is not JSON or the status is not a success.
+        :return: Result with the decoded response.
+        """  # pylint: disable=line-too-long
+        ep_params = prepare_params(endpoint, ep_params)
+        if not self.listeners:
+            return await self._get(endpoint, ep_params)
+
+        event = RequestEvent(endpoint, request_key(endpoint, ep_params))
+        start = time.perf_counter()
+        try:
+            result = await self._get(endpoint, ep_params, event)
+            event.status_code = result.status_code
+            return result
+        except Exception as e:
+            event.error = str(e)
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - start
+            emit(self.listeners, event)
+
+    async def _get(
+        self, endpoint: str, ep_params: Dict, event: RequestEvent = None
+    ) -> Result:
+        """Coalesce the request with identical ones in flight, see get."""
+        if not self.coalesce:
+            return await self._fetch(endpoint, ep_params, event)
+
+        key = request_key(endpoint, ep_params)
+        while key in self._inflight:
+            self.coalesced += 1
+            self._logger.debug(
+                f"endpoint={endpoint}, params={ep_params}, coalesced=True"
+            )
+            if event is not None:
+                event.coalesced = True
+            flight = self._inflight[key]
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The coroutine sending the request was cancelled, not this one: send
+                # it again unless this one was cancelled too.
+                if not flight.cancelled():
+                    raise
+                self.coalesced -= 1
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        try:
+            if event is not None:
+                event.coalesced = False
+            result = await self._fetch(endpoint, ep_params, event)
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def _fetch(
+        self, endpoint: str, ep_params: Dict, event: RequestEvent = None
+    ) -> Result:
+        """Serve a request from the cache or send it. See get."""
+        full_url = f"{self.url}{endpoint}"
+
+        self._logger.debug(f"url={full_url}, params={ep_params}")
+
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, endpoint, ep_params)
+            if event is not None:
+                event.cache = "miss" if cached is None else "hit"
+            if cached is not None:
+                self._logger.debug(f"url={full_url}, params={ep_params}, cache=hit")
+                return cached
+
+        async with self._get_semaphore():
+            status_code, message, data_out = await self._send(
+                full_url, ep_params, event=event
+            )
+
+        result = make_result(
+            endpoint,
+            data_out,
+            status_code,
+            message,
+            logger=self._logger,
+            full_url=full_url,
+            ep_params=ep_params,
+        )
+
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, endpoint, ep_params, result)
+
+        return result
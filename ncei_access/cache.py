@@ -0,0 +1,255 @@
+"""
+Persistent on-disk cache of API responses, used by RestAdapter when one is passed in.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Union
+from ncei_access import _cache_root, jsonlib
+from ncei_access.models import Result
+
+DAY = 24 * 60 * 60
+
+# Station and data type metadata changes as stations report, so searches go stale
+# quickly. Daily data for recent days can still be revised.
+DEFAULT_TTLS = {
+    "search/v1/data": DAY,
+    "data/v1": 7 * DAY,
+}
+
+
+def default_cache_dir() -> Path:
+    """Directory for ncei_access caches: $NCEI_ACCESS_CACHE_DIR if set, otherwise
+    $XDG_CACHE_HOME/ncei_access or ~/.cache/ncei_access."""
+    return Path(_cache_root())
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """Endpoint without leading or trailing slashes, so "data/v1/" and "data/v1" match."""
+    return endpoint.strip("/")
+
+
+def request_key(endpoint: str, ep_params: Dict = None) -> str:
+    """Stable key for a request: the normalized endpoint and parameters, with parameter
+    names and list values sorted so equivalent requests share a key.
+
+    :param endpoint: API endpoint.
+    :param ep_params: parameters for API call, defaults to None
+    :return: Hex digest.
+    """
+    params = {}
+    for name, value in (ep_params or {}).items():
+        if isinstance(value, (list, tuple)):
+            value = sorted(str(v) for v in value)
+        elif value is not None:
+            value = str(value)
+        params[name] = value
+    payload = json.dumps(
+        [normalize_endpoint(endpoint), params], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite backed cache of successful API responses.
+
+    Entries are zlib compressed and expire after a per-endpoint time to live. Daily data
+    whose endDate is more than historical_lag_days in the past is treated as closed and
+    kept for historical_ttl instead (forever by default). When the cache grows past
+    max_bytes the least recently used entries are evicted. The total size is kept up to
+    date by triggers, so writes don't scan the table. The database runs in WAL mode so
+    several threads and processes can share one cache file.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = None,
+        ttls: Dict[str, Optional[float]] = None,
+        default_ttl: Optional[float] = DAY,
+        historical_ttl: Optional[float] = None,
+        historical_lag_days: int = 30,
+        max_bytes: int = 1024**3,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param path: (optional) SQLite file. Defaults to responses.sqlite in default_cache_dir()
+        :param ttls: (optional) Seconds to live per endpoint, eg. {"search/v1/data": 3600}. None means forever. Merged over DEFAULT_TTLS
+        :param default_ttl: Seconds to live for endpoints not in ttls, defaults to one day
+        :param historical_ttl: Seconds to live for daily data ending more than historical_lag_days ago. Defaults to None, forever
+        :param historical_lag_days: Days after which daily data is considered closed, defaults to 30
+        :param max_bytes: Size cap of the stored responses, defaults to 1 GiB
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        """  # pylint: disable=line-too-long
+        self.path = Path(path) if path else default_cache_dir() / "responses.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update({normalize_endpoint(k): v for k, v in (ttls or {}).items()})
+        self.default_ttl = default_ttl
+        self.historical_ttl = historical_ttl
+        self.historical_lag_days = historical_lag_days
+        self.max_bytes = max_bytes
+        self._logger = logger or logging.getLogger(__name__)
+        # sqlite3 connections can't be shared between threads, so keep one per thread.
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    expires REAL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)"
+            )
+            # Running total of the size column, so set doesn't SUM the whole table.
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    total INTEGER NOT NULL
+                )"""
+            )
+            conn.execute(
+                """INSERT OR IGNORE INTO meta
+                SELECT 1, COALESCE(SUM(size), 0) FROM responses"""
+            )
+            conn.executescript(
+                """
+                CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses
+                BEGIN UPDATE meta SET total = total + new.size; END;
+                CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses
+                BEGIN UPDATE meta SET total = total - old.size; END;
+                CREATE TRIGGER IF NOT EXISTS responses_update
+                AFTER UPDATE OF size ON responses
+                BEGIN UPDATE meta SET total = total - old.size + new.size; END;
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Rows replaced by INSERT OR REPLACE fire the delete trigger only with this.
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, endpoint: str, ep_params: Dict = None) -> Optional[float]:
+        """Seconds a response to this request stays fresh, None for forever."""
+        endpoint = normalize_endpoint(endpoint)
+        end_date = (ep_params or {}).get("endDate")
+        if endpoint == "data/v1" and end_date:
+            try:
+                closed = date.fromisoformat(str(end_date)[:10]) < (
+                    date.today() - timedelta(days=self.historical_lag_days)
+                )
+            except ValueError:
+                closed = False
+            if closed:
+                return self.historical_ttl
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint: str, ep_params: Dict = None) -> Optional[Result]:
+        """Cached Result for the request, or None if missing or expired."""
+        key = request_key(endpoint, ep_params)
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT expires, body FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[0] is not None and row[0] < now):
+            self.misses += 1
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+        self.hits += 1
+        cached = jsonlib.loads(zlib.decompress(row[1]))
+        return Result(cached["status_code"], cached["message"], cached["data"])
+
+    def set(self, endpoint: str, ep_params: Dict, result: Result):
+        """Store a Result and evict old entries if the cache is over its size cap."""
+        ttl = self.ttl_for(endpoint, ep_params)
+        if ttl is not None and ttl <= 0:
+            return
+        body = zlib.compress(
+            jsonlib.dumps(
+                {
+                    "status_code": result.status_code,
+                    "message": result.message,
+                    "data": result.data,
+                }
+            )
+        )
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    request_key(endpoint, ep_params),
+                    normalize_endpoint(endpoint),
+                    now,
+                    None if ttl is None else now + ttl,
+                    now,
+                    len(body),
+                    body,
+                ),
+            )
+        if self.size() > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        """Total bytes of stored responses."""
+        row = self._connect().execute("SELECT total FROM meta").fetchone()
+        return row[0] if row else 0
+
+    def evict(self):
+        """Delete expired entries, then least recently used entries until the cache is
+        under max_bytes. Called by set when the cache is over max_bytes."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "DELETE FROM responses WHERE expires IS NOT NULL AND expires < ?",
+                (time.time(),),
+            )
+            excess = self.size() - self.max_bytes
+            if excess <= 0:
+                return
+            freed = 0
+            stale = []
+            for key, size in conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"
+            ):
+                stale.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self._logger.debug(f"Evicted {len(stale)} cached responses ({freed} bytes).")
+
+    def clear(self):
+        """Delete every cached response."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM responses")
@@ -0,0 +1,183 @@
+"""
+Local station catalog. Built once from station searches, saved to disk and queried
+locally with a spatial index instead of searching NCEI for every lookup.
+"""
+
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+from ncei_access.models import Station
+from ncei_access.spatial import SphereIndex
+
+Bounds = Tuple[float, float, float, float]
+
+
+class StationCatalog:
+    """Collection of stations with a spatial index for nearest, k-nearest and radius
+    queries. Data type and date filters work like Station.has_data_type.
+
+    .. code-block:: python
+
+        catalog = StationCatalog.from_boundary(ncei_db, 49, -125, 31, -102)
+        catalog.save("western_us.json.gz")
+        ...
+        catalog = StationCatalog.load("western_us.json.gz")
+        if catalog.is_stale(max_age_days=30):
+            catalog.refresh(ncei_db)
+        station = catalog.closest(40.63, -111.63, data_type="SNWD")
+    """
+
+    def __init__(
+        self,
+        stations: List[Station],
+        bounds: List[Bounds] = None,
+        built_at: float = None,
+    ):
+        """
+        :param stations: Stations in the catalog.
+        :param bounds: (optional) (north, west, south, east) boxes the catalog was built from, used by refresh. Defaults to None
+        :param built_at: (optional) Unix time the stations were fetched. Defaults to now
+        """  # pylint: disable=line-too-long
+        self.bounds = list(bounds or [])
+        self.built_at = built_at if built_at is not None else time.time()
+        self._set_stations(stations)
+
+    def _set_stations(self, stations: List[Station]):
+        self.stations = list(stations)
+        self._by_id = {s.station_id: s for s in self.stations}
+        self._index = SphereIndex([(s.lat, s.lon) for s in self.stations])
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __iter__(self) -> Iterator[Station]:
+        return iter(self.stations)
+
+    def __contains__(self, station_id: str) -> bool:
+        return station_id in self._by_id
+
+    def get(self, station_id: str) -> Optional[Station]:
+        """Station with the ID, or None if it isn't in the catalog."""
+        return self._by_id.get(station_id)
+
+    @classmethod
+    def from_boundary(
+        cls, accessor, north: float, west: float, south: float, east: float
+    ) -> "StationCatalog":
+        """Build a catalog from the stations NceiAccessor.stations_in_boundary finds.
+
+        :param accessor: NceiAccessor used for the search.
+        :return: StationCatalog object.
+        """
+        stations = accessor.stations_in_boundary(north, west, south, east)
+        return cls(stations, bounds=[(north, west, south, east)])
+
+    def refresh(self, accessor):
+        """Fetch the stations in the catalog's bounds again and rebuild the index."""
+        stations = {}
+        for bounds in self.bounds:
+            for station in accessor.stations_in_boundary(*bounds):
+                stations[station.station_id] = station
+        self._set_stations(list(stations.values()))
+        self.built_at = time.time()
+
+    def is_stale(self, max_age_days: float = 30) -> bool:
+        """True if the catalog was built more than max_age_days ago."""
+        return time.time() - self.built_at > max_age_days * 24 * 60 * 60
+
+    def save(self, path: Union[str, Path]):
+        """Write the catalog to a gzipped JSON file."""
+        payload = {
+            "built_at": self.built_at,
+            "bounds": self.bounds,
+            "stations": [
+                [s.station_id, s.name, s.lat, s.lon, s.data_types]
+                for s in self.stations
+            ],
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StationCatalog":
+        """Read a catalog written by save."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        stations = [
+            Station(
+                name=name, station_id=station_id, lat=lat, lon=lon, data_types=types
+            )
+            for station_id, name, lat, lon, types in payload["stations"]
+        ]
+        return cls(
+            stations,
+            bounds=[tuple(b) for b in payload.get("bounds", [])],
+            built_at=payload.get("built_at"),
+        )
+
+    def _predicate(self, data_type: str, start_date: str, end_date: str):
+        if not data_type:
+            return None
+        stations = self.stations
+        return lambda i: stations[i].has_data_type(data_type, start_date, end_date)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 1,
+        data_type: str = "",
+        start_date: str = "",
+        end_date: str = "",
+    ) -> List[Tuple[Station, float]]:
+        """The k stations closest to the coordinates.
+
+        :param lat: Latitude (decimal format)
+        :param lon: Longitude (decimal format)
+        :param k: Number of stations, defaults to 1
+        :param data_type: Optional data type to filter stations by.
+        :param start_date: Optional start date to filter stations by.
+        :param end_date: Optional end date to filter stations by.
+        :return: List of (Station, distance in km), closest first.
+        """
+        predicate = self._predicate(data_type, start_date, end_date)
+        return [
+            (self.stations[i], distance)
+            for distance, i in self._index.nearest(lat, lon, k, predicate)
+        ]
+
+    def closest(
+        self,
+        lat: float,
+        lon: float,
+        data_type: str = "",
+        start_date: str = "",
+        end_date: str = "",
+    ) -> Optional[Station]:
+        """Closest station to the coordinates, like NceiAccessor.find_closest_station.
+
+        :return: Station object, or None if no station qualifies.
+        """
+        found = self.nearest(lat, lon, 1, data_type, start_date, end_date)
+        return found[0][0] if found else None
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        data_type: str = "",
+        start_date: str = "",
+        end_date: str = "",
+    ) -> List[Tuple[Station, float]]:
+        """Stations within radius_km of the coordinates.
+
+        :return: List of (Station, distance in km), closest first.
+        """
+        predicate = self._predicate(data_type, start_date, end_date)
+        return [
+            (self.stations[i], distance)
+            for distance, i in self._index.within(lat, lon, radius_km, predicate)
+        ]
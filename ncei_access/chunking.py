@@ -0,0 +1,143 @@
+"""
+Helpers for splitting large get_daily requests into smaller ones that can be fetched
+in parallel, and for stitching the results back together.
+"""
+
+import zlib
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple, Union
+
+CHUNK_YEARS = {"year": 1, "decade": 10}
+
+# Budget, in characters, for the "stations=...&stations=..." part of a query string.
+# Keeps the whole URL well under the ~8k limit common to web servers and proxies.
+MAX_STATION_CHARS = 4000
+
+
+def parse_date(value: Union[str, date]) -> date:
+    """Parse the date part of an ISO date or datetime string, eg. "2024-04-21" or
+    "2024-04-21T00:00:00".
+
+    :param value: ISO formatted string or date.
+    :return: date object.
+    """
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def split_date_range(
+    start: Union[str, date], end: Union[str, date], chunk: Union[str, int]
+) -> List[Tuple[str, str]]:
+    """Split the inclusive range start..end into consecutive, non-overlapping inclusive
+    ranges.
+
+    :param start: First day of the range.
+    :param end: Last day of the range.
+    :param chunk: "month", "year" or "decade" for calendar aligned chunks, or a number of days.
+    :raises ValueError: If chunk is not understood.
+    :return: List of (start, end) ISO date strings in chronological order.
+    """  # pylint: disable=line-too-long
+    start_d, end_d = parse_date(start), parse_date(end)
+    if end_d < start_d:
+        return []
+
+    if isinstance(chunk, int):
+        if chunk < 1:
+            raise ValueError(f"chunk must be a positive number of days, got {chunk}")
+
+        def next_start(d):
+            return d + timedelta(days=chunk)
+
+    elif chunk == "month":
+
+        def next_start(d):
+            return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+    elif chunk in CHUNK_YEARS:
+        years = CHUNK_YEARS[chunk]
+
+        def next_start(d):
+            return date((d.year // years + 1) * years, 1, 1)
+
+    else:
+        raise ValueError(f"Unknown chunk {chunk!r}, use 'month', 'year', 'decade' or a number of days")  # pylint: disable=line-too-long
+
+    ranges = []
+    current = start_d
+    while current <= end_d:
+        following = next_start(current)
+        last = min(end_d, following - timedelta(days=1))
+        ranges.append((current.isoformat(), last.isoformat()))
+        current = following
+    return ranges
+
+
+def batch_stations(
+    stations: Union[str, List[str]],
+    batch_size: int = None,
+    max_chars: int = MAX_STATION_CHARS,
+) -> List[List[str]]:
+    """Split a list of station IDs into batches small enough for one request.
+
+    :param stations: Station ID or list of station IDs.
+    :param batch_size: (optional) Maximum number of stations per batch, to bound the size of each response. Defaults to None, no limit
+    :param max_chars: Maximum length of the encoded station parameters of a batch, defaults to MAX_STATION_CHARS
+    :return: List of batches, in the original order.
+    """  # pylint: disable=line-too-long
+    if isinstance(stations, str):
+        stations = [stations]
+
+    batches = []
+    current = []
+    current_chars = 0
+    for station in stations:
+        # "&stations=" plus the ID, which never needs percent-encoding.
+        chars = len(station) + 10
+        if current and (
+            current_chars + chars > max_chars
+            or (batch_size and len(current) >= batch_size)
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(station)
+        current_chars += chars
+    if current:
+        batches.append(current)
+    return batches
+
+
+def shard_stations(stations: List[str], index: int, count: int) -> List[str]:
+    """Stations belonging to one of count shards of a job. A station's shard depends
+    only on its ID, so machines given the same job and different shard indexes split it
+    with no overlap and no coordination, whatever order they list the stations in.
+
+    :param stations: Station IDs of the whole job.
+    :param index: Shard index, from 1 to count.
+    :param count: Number of shards.
+    :raises ValueError: If index is not between 1 and count.
+    :return: Stations of the shard, in the original order.
+    """
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard {index}/{count} is out of range, use 1/N to N/N")
+    return [s for s in stations if zlib.crc32(s.encode()) % count == index - 1]
+
+
+def merge_daily_rows(parts: Iterable[List[Dict]]) -> List[Dict]:
+    """Concatenate daily rows from several requests, ordered by station then date like
+    a single request would be. Rows for the same (STATION, DATE) are combined into one,
+    so duplicates from overlapping requests are dropped.
+
+    :param parts: Lists of daily rows as returned by the "data/v1" endpoint.
+    :return: Merged list of rows.
+    """
+    merged = {}
+    for part in parts:
+        for row in part:
+            key = (row.get("STATION") or "", row.get("DATE") or "")
+            if key in merged:
+                merged[key].update(row)
+            else:
+                merged[key] = dict(row)
+    return [merged[key] for key in sorted(merged)]
@@ -0,0 +1,368 @@
+"""
+The ``ncei-access`` command line tool, for bulk downloads of daily data.
+
+A job names the stations, either as a list of IDs or as a bounding box, the data types,
+the date range and the output format. It can come from a JSON file, from flags, or
+both, with flags taking precedence:
+
+.. code-block:: json
+
+    {"bbox": [41, -111, 40.5, -110.5], "data_types": ["TMAX", "TMIN"],
+     "start": "1990-01-01", "end": "2024-12-31", "format": "parquet"}
+
+.. code-block:: bash
+
+    ncei-access download --job job.json --out backfill --workers 8
+    ncei-access download --job job.json --out backfill --shard 2/4
+    ncei-access status backfill
+
+The job is split into (year, station batch) chunks and written with
+ncei_access.export.export_daily, which records every finished chunk in a manifest.
+Running the same command again after an interruption skips the finished chunks.
+With ``--shard i/N`` a run only takes the stations that
+ncei_access.chunking.shard_stations assigns to shard i, and keeps its own manifest.
+N machines given the same job and output directory then split it between them with
+no coordinator. A bbox is resolved to stations once, over the job's date range, and
+the list is saved with the job in the output directory, so resumed runs and every
+shard work from the same stations.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from ncei_access.chunking import parse_date, shard_stations
+from ncei_access.exceptions import NceiAccessException
+from ncei_access.export import FORMATS, MANIFEST, export_daily, manifest_key
+
+JOB_FILE = "_job.json"
+
+# Key of the stations a bbox job resolved to in the saved job file.
+RESOLVED_KEY = "resolved_stations"
+
+# Keys of a job spec. Flags of the same name override the values of a job file.
+JOB_KEYS = (
+    "stations",
+    "bbox",
+    "data_types",
+    "start",
+    "end",
+    "format",
+    "station_batch_size",
+)
+
+_logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as "i/N", eg. "2/4" for the second of four shards.
+
+    :raises ValueError: If value is not of the form i/N with 1 <= i <= N.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError as e:
+        raise ValueError(f"Shard {value!r} is not of the form i/N, eg. 1/4") from e
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard {value!r} is out of range, use 1/N to N/N")
+    return index, count
+
+
+def manifest_name(shard: Optional[Tuple[int, int]]) -> str:
+    """Name of the manifest of a run, one per shard so shards never write the same
+    file."""
+    if shard is None:
+        return MANIFEST
+    index, count = shard
+    return f"_manifest.shard-{index}-of-{count}.jsonl"
+
+
+def load_job(path: Optional[str], overrides: Dict) -> Dict:
+    """Job spec read from a JSON file, if any, with the non-None overrides applied.
+
+    :raises NceiAccessException: If the spec is incomplete or invalid.
+    """
+    job = {}
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                job = json.load(f)
+        except (OSError, ValueError) as e:
+            raise NceiAccessException(f"Cannot read job file {path}: {e}") from e
+        unknown = set(job) - set(JOB_KEYS)
+        if unknown:
+            raise NceiAccessException(
+                f"Unknown keys in job file {path}: {', '.join(sorted(unknown))}"
+            )
+    job.update({k: v for k, v in overrides.items() if v is not None})
+    job.setdefault("format", "parquet")
+    job.setdefault("station_batch_size", 10)
+
+    if isinstance(job.get("stations"), str):
+        job["stations"] = [job["stations"]]
+    if isinstance(job.get("data_types"), str):
+        job["data_types"] = [job["data_types"]]
+    if bool(job.get("stations")) == bool(job.get("bbox")):
+        raise NceiAccessException("A job needs either stations or a bbox, not both")
+    if job.get("bbox") and len(job["bbox"]) != 4:
+        raise NceiAccessException("bbox must be [north, west, south, east]")
+    missing = [k for k in ("data_types", "start", "end") if not job.get(k)]
+    if missing:
+        raise NceiAccessException(f"The job is missing {', '.join(missing)}")
+    if job["format"] not in FORMATS:
+        raise NceiAccessException(
+            f"Unknown format {job['format']!r}, expected one of {FORMATS}"
+        )
+    return job
+
+
+def _read_saved_job(target: Path) -> Optional[Dict]:
+    try:
+        with open(target, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def record_job(path: Path, job: Dict, resolve: Callable[[], List[str]] = None) -> Dict:
+    """Save the job spec in the output directory, or check that it matches the one
+    saved by an earlier run or another shard, so runs can't mix two jobs in one
+    directory.
+
+    A bbox job is saved with the stations resolve() finds in it, under
+    RESOLVED_KEY. Which stations a search returns changes over time, so every later
+    run and every shard takes the saved list instead of searching again. The file is
+    created only if it doesn't exist yet, so shards starting together all end up with
+    the list of whichever saved it first.
+
+    :param path: Output directory.
+    :param job: Job spec, see load_job.
+    :param resolve: (optional) Called to resolve a bbox job's stations when no run has saved them yet. Defaults to None
+    :raises NceiAccessException: If the directory holds a different job.
+    :return: The saved job.
+    """  # pylint: disable=line-too-long
+    target = path / JOB_FILE
+    saved = _read_saved_job(target)
+    if saved is None:
+        record = dict(job)
+        if job.get("bbox") and resolve is not None:
+            record[RESOLVED_KEY] = resolve()
+        path.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{JOB_FILE}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+        try:
+            # Unlike a rename, a link never replaces a file another run saved first.
+            os.link(tmp, target)
+            saved = record
+        except FileExistsError:
+            saved = _read_saved_job(target)
+        finally:
+            os.remove(tmp)
+    if {k: v for k, v in saved.items() if k != RESOLVED_KEY} != job:
+        raise NceiAccessException(
+            f"{path} holds a different job, see {target}. Use a new output directory."
+        )
+    return saved
+
+
+def resolve_stations(accessor, job: Dict) -> List[str]:
+    """Station IDs of a job, sorted. A bbox is resolved to the stations inside it that
+    recorded at least one of the job's data types between its start and end, from the
+    accessor's backend when it has one and from NCEI otherwise."""
+    # Importing here so the status command doesn't load requests
+    from ncei_access.planner import clip_window  # pylint: disable=import-outside-toplevel
+
+    if job.get("stations"):
+        return sorted(set(job["stations"]))
+
+    north, west, south, east = job["bbox"]
+    if accessor.backend is not None:
+        found = [
+            s
+            for s in accessor.backend.stations().values()
+            if south <= s.lat <= north and west <= s.lon <= east
+        ]
+    else:
+        found = accessor.stations_in_boundary(
+            north, west, south, east, start=job["start"], end=job["end"]
+        )
+    start, end = parse_date(job["start"]), parse_date(job["end"])
+    return sorted(
+        {
+            s.station_id
+            for s in found
+            if clip_window(s, job["data_types"], start, end)[0]
+        }
+    )
+
+
+def read_status(path: Path) -> Dict[str, int]:
+    """Totals over the manifests of every shard in an output directory. A chunk
+    recorded in several manifests, eg. by runs with different shard counts, counts
+    once."""
+    manifests = sorted(path.glob("_manifest*.jsonl"))
+    rows = {}
+    for manifest in manifests:
+        with open(manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = manifest_key(
+                        entry["station"],
+                        entry["start"],
+                        entry["end"],
+                        entry["data_types"],
+                        entry.get("format", "parquet"),
+                    )
+                except (ValueError, KeyError):
+                    continue
+                rows[key] = entry.get("rows", 0)
+    return {
+        "manifests": len(manifests),
+        "station_years": len(rows),
+        "rows": sum(rows.values()),
+    }
+
+
+def _download(args) -> int:
+    # Importing here so the status command doesn't load requests
+    from ncei_access.ncei_accessor import NceiAccessor  # pylint: disable=import-outside-toplevel
+
+    job = load_job(
+        args.job,
+        {
+            "stations": args.stations,
+            "bbox": args.bbox,
+            "data_types": args.data_types,
+            "start": args.start,
+            "end": args.end,
+            "format": args.format,
+            "station_batch_size": args.station_batch_size,
+        },
+    )
+    shard = parse_shard(args.shard) if args.shard else None
+    out = Path(args.out)
+
+    backend = None
+    if args.ghcnd:
+        from ncei_access.ghcnd import GhcndMirror  # pylint: disable=import-outside-toplevel
+
+        backend = GhcndMirror(args.ghcnd)
+    try:
+        accessor = NceiAccessor(max_workers=args.workers, backend=backend)
+        saved = record_job(out, job, lambda: resolve_stations(accessor, job))
+        if RESOLVED_KEY in saved:
+            stations = saved[RESOLVED_KEY]
+        else:
+            stations = resolve_stations(accessor, job)
+        if shard:
+            stations = shard_stations(stations, *shard)
+        _logger.info(
+            f"{len(stations)} stations{f' in shard {args.shard}' if shard else ''}, "
+            f"{job['start']} to {job['end']}, writing {job['format']} to {out}"
+        )
+        if args.dry_run or not stations:
+            return 0
+
+        counts = export_daily(
+            accessor,
+            job["data_types"],
+            stations,
+            job["start"],
+            job["end"],
+            out,
+            station_batch_size=job["station_batch_size"],
+            progress=lambda done, total: _logger.info(f"{done}/{total} chunks written"),
+            fmt=job["format"],
+            manifest=manifest_name(shard),
+        )
+    finally:
+        if backend is not None:
+            backend.close()
+    print(json.dumps(counts))
+    return 0
+
+
+def _status(args) -> int:
+    print(json.dumps(read_status(Path(args.out))))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser of the ncei-access command."""
+    parser = argparse.ArgumentParser(
+        prog="ncei-access", description="Bulk downloads of NCEI daily data."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="log debug messages"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    download = commands.add_parser(
+        "download",
+        help="download a job, resuming an earlier run",
+        description="Download a job into OUT. Run the same command again to resume.",
+    )
+    download.add_argument("--job", help="JSON job spec")
+    download.add_argument("-o", "--out", required=True, help="output directory")
+    download.add_argument("--stations", nargs="+", metavar="ID")
+    download.add_argument(
+        "--bbox", nargs=4, type=float, metavar=("NORTH", "WEST", "SOUTH", "EAST")
+    )
+    download.add_argument("--data-types", nargs="+", metavar="TYPE")
+    download.add_argument("--start", help="first day, eg. 1990-01-01")
+    download.add_argument("--end", help="last day, eg. 2024-12-31")
+    download.add_argument("--format", choices=FORMATS)
+    download.add_argument(
+        "--station-batch-size", type=int, help="stations per request, default 10"
+    )
+    download.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="parallel requests and kept-alive connections, default 4",
+    )
+    download.add_argument("--shard", metavar="I/N", help="only download shard I of N")
+    download.add_argument(
+        "--ghcnd", metavar="DIR", help="read from a local GHCN-Daily mirror"
+    )
+    download.add_argument(
+        "--dry-run", action="store_true", help="resolve the stations and stop"
+    )
+    download.set_defaults(run=_download)
+
+    status = commands.add_parser(
+        "status", help="summarize the manifests of an output directory"
+    )
+    status.add_argument("out", help="output directory")
+    status.set_defaults(run=_status)
+    return parser
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """Entry point of the ncei-access command.
+
+    :param argv: (optional) Arguments, defaults to sys.argv[1:]
+    :return: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    try:
+        return args.run(args)
+    except (NceiAccessException, ValueError) as e:
+        _logger.error(str(e))
+        return 1
+    except KeyboardInterrupt:
+        _logger.error("Interrupted. Run the same command again to resume.")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Vectorized climatology: monthly, seasonal and annual statistics of daily data for
+many stations at once, and rolling normals over those statistics. Needs the optional
+numpy dependency (``pip install ncei-access[columnar]``).
+
+.. code-block:: python
+
+    daily = ncei_db.get_daily_columns(["TMAX", "TMIN", "PRCP"], stations, "1981-01-01", "2020-12-31", chunk="year")
+    monthly = aggregate(daily, period="month", min_coverage=0.9)
+    normals = rolling_normals(monthly, window=30)
+    normals.to_pandas()
+"""  # pylint: disable=line-too-long
+
+import math
+from typing import Dict, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None
+
+from ncei_access.columnar import DailyColumns, scale_for, units_for
+
+PERIODS = ("month", "season", "water_year", "year")
+SEASONS = ("DJF", "MAM", "JJA", "SON")
+STATISTICS = ("mean", "sum", "min", "max", "count", "freeze_days")
+
+# Amounts measured as a state on a given day rather than accumulated over it, so
+# summing them over a period means nothing: snow depth, water equivalent of the snow
+# on the ground and thickness of ice on water.
+STATE_TYPES = frozenset(("SNWD", "WESD", "THIC"))
+
+# Number of sub-periods per year of each period, eg. 12 months.
+_SUBPERIODS = {"month": 12, "season": 4, "water_year": 1, "year": 1}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Climatology requires numpy: pip install ncei-access[columnar]"
+        )
+
+
+def default_statistics(data_type: str, units: str = None) -> List[str]:
+    """Statistics that make sense for a data type, going by its units in
+    dataType_ref: mean, min and max of temperatures (plus freeze days for TMIN),
+    maxima of the STATE_TYPES such as SNWD and WESD, totals of other amounts in
+    millimeters such as PRCP, SNOW and WESF, and means of everything else.
+
+    :param data_type: Data type ID, eg. "TMAX".
+    :param units: (optional) Units of the values. Defaults to the metric output units in dataType_ref
+    :return: List of statistic names, see STATISTICS.
+    """  # pylint: disable=line-too-long
+    units = units or units_for(data_type)
+    if units == "celsius":
+        stats = ["mean", "min", "max"]
+        if data_type == "TMIN":
+            stats.append("freeze_days")
+        return stats
+    if units == "millimeters":
+        return ["max"] if data_type in STATE_TYPES else ["sum"]
+    return ["mean"]
+
+
+def _period_keys(months: "np.ndarray", period: str) -> "np.ndarray":
+    """Integer key of the period each day falls in, from months since 1970-01."""
+    if period == "month":
+        return months
+    if period == "season":
+        # December counts towards the next year's DJF.
+        return (months + 1) // 3
+    if period == "water_year":
+        # October starts the next water year.
+        return (months + 3) // 12
+    return months // 12
+
+
+def _period_bounds(keys: "np.ndarray", period: str):
+    """First month and the month after the last of each period key, as months since
+    1970-01."""
+    if period == "month":
+        return keys, keys + 1
+    if period == "season":
+        return 3 * keys - 1, 3 * keys + 2
+    if period == "water_year":
+        return 12 * keys - 3, 12 * keys + 9
+    return 12 * keys, 12 * keys + 12
+
+
+def _period_labels(keys: "np.ndarray", period: str):
+    """(year, sub-period) of each period key. Sub-periods are months 1-12, seasons
+    1-4 (see SEASONS) or 0 for annual periods. Seasons are labelled with the year of
+    their second month, so December 2000 is in DJF 2001, and water years with the year
+    they end in."""
+    if period == "month":
+        return keys // 12 + 1970, keys % 12 + 1
+    if period == "season":
+        return (3 * keys) // 12 + 1970, (3 * keys) % 12 // 3 + 1
+    return keys + 1970, np.zeros_like(keys)
+
+
+class Aggregates:
+    """Statistics per station and period, one array per column.
+
+    - period: One of PERIODS, or "normal" for rolling normals.
+    - stations: Array of the distinct station IDs.
+    - station_codes: int32 array of indexes into stations, one per row.
+    - year: Year of each row, see aggregate for how periods are labelled.
+    - subperiod: Month (1-12), season (1-4, see SEASONS) or 0 for annual periods.
+    - days: Number of calendar days in each period, None for normals.
+    - values: Dict of float64 arrays named "<data type>_<statistic>", eg. "TMAX_mean".
+      Statistics of periods with too few valid days are NaN.
+    - units: Dict of the units of each values array.
+    """
+
+    def __init__(
+        self,
+        period: str,
+        stations: "np.ndarray",
+        station_codes: "np.ndarray",
+        year: "np.ndarray",
+        subperiod: "np.ndarray",
+        values: Dict[str, "np.ndarray"],
+        units: Dict[str, str] = None,
+        days: "np.ndarray" = None,
+    ):
+        self.period = period
+        self.stations = stations
+        self.station_codes = station_codes
+        self.year = year
+        self.subperiod = subperiod
+        self.values = values
+        self.units = units or {}
+        self.days = days
+
+    def __len__(self) -> int:
+        return len(self.year)
+
+    @property
+    def station(self) -> "np.ndarray":
+        """Station ID of every row."""
+        return self.stations[self.station_codes]
+
+    def to_pandas(self):
+        """pandas.DataFrame with STATION, YEAR and SUBPERIOD columns and one column per
+        statistic."""
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        columns = {
+            "STATION": pd.Categorical.from_codes(self.station_codes, self.stations),
+            "YEAR": self.year,
+            "SUBPERIOD": self.subperiod,
+        }
+        if self.days is not None:
+            columns["DAYS"] = self.days
+        columns.update(self.values)
+        return pd.DataFrame(columns)
+
+
+def _grouped(sorted_values: "np.ndarray", starts: "np.ndarray", stat: str):
+    """Reduce each run of sorted_values beginning at starts, ignoring NaN."""
+    valid = ~np.isnan(sorted_values)
+    if stat == "count":
+        return np.add.reduceat(valid, starts).astype(np.float64)
+    if stat == "sum":
+        return np.add.reduceat(np.where(valid, sorted_values, 0.0), starts)
+    if stat == "mean":
+        total = np.add.reduceat(np.where(valid, sorted_values, 0.0), starts)
+        count = np.add.reduceat(valid, starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total / count
+    if stat == "min":
+        return np.minimum.reduceat(np.where(valid, sorted_values, np.inf), starts)
+    if stat == "max":
+        return np.maximum.reduceat(np.where(valid, sorted_values, -np.inf), starts)
+    if stat == "freeze_days":
+        return np.add.reduceat(valid & (sorted_values <= 0), starts).astype(
+            np.float64
+        )
+    raise ValueError(f"Unknown statistic {stat!r}, expected one of {STATISTICS}")
+
+
+def aggregate(
+    daily: Union[DailyColumns, List[Dict]],
+    period: str = "month",
+    statistics: Dict[str, Sequence[str]] = None,
+    min_coverage: float = 0.9,
+) -> Aggregates:
+    """Compute statistics of daily data per station and month, season, water year or
+    year, without looping over rows in Python.
+
+    A statistic is NaN for a period where fewer than min_coverage of the period's
+    calendar days have a value, so partial periods at either end of the data are
+    reported as missing rather than biased. Freeze days count days with values at or
+    below 0 degrees C.
+
+    :param daily: DailyColumns, eg. from NceiAccessor.get_daily_columns, or rows from NceiAccessor.get_daily.
+    :param period: "month", "season" (DJF, MAM, JJA, SON), "water_year" (October through September, labelled with the year it ends in) or "year", defaults to "month"
+    :param statistics: (optional) Statistics to compute per data type, eg. {"TMIN": ["mean", "freeze_days"]}, see STATISTICS. Defaults to default_statistics of every data type in daily
+    :param min_coverage: Fraction of days in a period that must have values, defaults to 0.9
+    :return: Aggregates object, with a "<data type>_count" column of valid days for each data type.
+    """  # pylint: disable=line-too-long
+    _require_numpy()
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period {period!r}, expected one of {PERIODS}")
+    if not isinstance(daily, DailyColumns):
+        daily = DailyColumns.from_rows(daily)
+    if statistics is None:
+        statistics = {
+            data_type: default_statistics(data_type, daily.units.get(data_type))
+            for data_type in daily.values
+        }
+
+    months = daily.date.astype("datetime64[M]").astype(np.int64)
+    keys = _period_keys(months, period)
+    key_min = int(keys.min()) if len(keys) else 0
+    span = int(keys.max()) - key_min + 1 if len(keys) else 1
+    group_ids = daily.station_codes.astype(np.int64) * span + (keys - key_min)
+    groups, inverse = np.unique(group_ids, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(len(groups)))
+
+    station_codes = (groups // span).astype(np.int32)
+    group_keys = groups % span + key_min
+    first, after = _period_bounds(group_keys, period)
+    days = (
+        after.astype("datetime64[M]").astype("datetime64[D]")
+        - first.astype("datetime64[M]").astype("datetime64[D]")
+    ).astype(np.int64)
+    year, subperiod = _period_labels(group_keys, period)
+
+    values = {}
+    units = {}
+    for data_type, stats in statistics.items():
+        raw = daily.values[data_type]
+        data_units = daily.units.get(data_type)
+        if data_units is None and units_for(data_type):
+            # Unscaled columns: convert to metric output units first.
+            raw = raw * scale_for(data_type)
+            data_units = units_for(data_type)
+        sorted_values = raw[order]
+        count = _grouped(sorted_values, starts, "count")
+        complete = count >= min_coverage * days
+        values[f"{data_type}_count"] = count
+        units[f"{data_type}_count"] = "days"
+        for stat in stats:
+            if stat == "count":
+                continue
+            result = _grouped(sorted_values, starts, stat)
+            result[~complete] = np.nan
+            name = f"{data_type}_{stat}"
+            values[name] = result
+            units[name] = "days" if stat == "freeze_days" else data_units
+    return Aggregates(
+        period,
+        daily.stations,
+        station_codes,
+        year,
+        subperiod,
+        values,
+        units=units,
+        days=days,
+    )
+
+
+def rolling_normals(
+    aggregates: Aggregates, window: int = 30, min_fraction: float = 0.8
+) -> Aggregates:
+    """Rolling normals: the mean of each statistic over window consecutive years, per
+    station and sub-period (month or season), for every year a window ends in.
+
+    Years with a missing statistic are skipped, and a normal is NaN unless at least
+    min_fraction of the window's years have a value. Count columns are not averaged.
+
+    :param aggregates: Aggregates from aggregate.
+    :param window: Number of years per normal, defaults to 30
+    :param min_fraction: Fraction of years in a window that must have values, defaults to 0.8
+    :return: Aggregates with period "normal", labelled with the last year of each window. Rows where every normal is NaN are left out.
+    """  # pylint: disable=line-too-long
+    _require_numpy()
+    columns = [name for name in aggregates.values if not name.endswith("_count")]
+    n_sub = _SUBPERIODS.get(aggregates.period, 1)
+    n_stations = len(aggregates.stations)
+    if len(aggregates):
+        year_min = int(aggregates.year.min())
+        n_years = int(aggregates.year.max()) - year_min + 1
+    else:
+        year_min, n_years = 0, 0
+    n_windows = n_years - window + 1
+    empty = np.zeros(0, dtype=np.int64)
+    if n_windows < 1:
+        return Aggregates(
+            "normal",
+            aggregates.stations,
+            empty.astype(np.int32),
+            empty,
+            empty,
+            {name: np.zeros(0) for name in columns},
+            units={name: aggregates.units.get(name) for name in columns},
+        )
+
+    sub = np.maximum(aggregates.subperiod - 1, 0)
+    year_index = aggregates.year - year_min
+    min_years = math.ceil(min_fraction * window)
+    normals = {}
+    for name in columns:
+        cube = np.full((n_stations, n_sub, n_years), np.nan)
+        cube[aggregates.station_codes, sub, year_index] = aggregates.values[name]
+        valid = ~np.isnan(cube)
+        pad = np.zeros((n_stations, n_sub, 1))
+        totals = np.concatenate([pad, np.cumsum(np.where(valid, cube, 0.0), 2)], 2)
+        counts = np.concatenate([pad, np.cumsum(valid, 2)], 2)
+        total = totals[..., window:] - totals[..., :-window]
+        count = counts[..., window:] - counts[..., :-window]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            normal = total / count
+        normal[count < min_years] = np.nan
+        normals[name] = normal
+
+    present = np.zeros((n_stations, n_sub, n_windows), dtype=bool)
+    for normal in normals.values():
+        present |= ~np.isnan(normal)
+    station_codes, sub_index, window_index = np.nonzero(present)
+    subperiod = sub_index + 1 if n_sub > 1 else np.zeros_like(sub_index)
+    return Aggregates(
+        "normal",
+        aggregates.stations,
+        station_codes.astype(np.int32),
+        window_index + year_min + window - 1,
+        subperiod,
+        {name: normal[present] for name, normal in normals.items()},
+        units={name: aggregates.units.get(name) for name in columns},
+    )
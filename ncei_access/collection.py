@@ -0,0 +1,263 @@
+"""
+Array backed collection of stations. Needs the optional numpy dependency
+(``pip install ncei-access[columnar]``).
+"""
+
+from typing import Dict, Iterable, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None
+
+from ncei_access.models import Station
+from ncei_access.spatial import EARTH_RADIUS_KM
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "StationCollection requires numpy: pip install ncei-access[columnar]"
+        )
+
+
+def _day(value: str) -> "np.datetime64":
+    return np.datetime64(value[:10], "D")
+
+
+def haversine(lat1, lon1, lat2, lon2) -> "np.ndarray":
+    """Vectorized haversine distance in kilometers. Arguments broadcast like numpy
+    arrays, eg. one point against arrays of station coordinates."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class StationCollection:
+    """Stations stored column-wise in numpy arrays instead of as Station objects.
+
+    IDs, names and coordinates are one array each. The period of record of every
+    (station, data type) pair is kept in a flat coverage table, with data type IDs
+    interned into small integer codes and per-station offsets into the table (CSR
+    layout), so slicing stays cheap. Indexing with an int returns a Station view;
+    indexing with a slice, index array or boolean mask returns a new collection.
+
+    .. code-block:: python
+
+        stations = StationCollection.from_stations(ncei_db.stations_in_boundary(41, -112, 40, -111))
+        usable = stations[stations.has_data_type("SNWD", "1990-01-01", "2020-12-31")]
+        closest_five = usable[usable.nearest(40.63, -111.63, k=5)]
+    """  # pylint: disable=line-too-long
+
+    def __init__(
+        self,
+        ids: "np.ndarray",
+        names: "np.ndarray",
+        lat: "np.ndarray",
+        lon: "np.ndarray",
+        type_ids: List[str],
+        coverage_offsets: "np.ndarray",
+        coverage_types: "np.ndarray",
+        coverage_start: "np.ndarray",
+        coverage_end: "np.ndarray",
+        coverage_percent: "np.ndarray",
+    ):
+        _require_numpy()
+        self.ids = ids
+        self.names = names
+        self.lat = lat
+        self.lon = lon
+        self.type_ids = type_ids
+        self.coverage_offsets = coverage_offsets
+        self.coverage_types = coverage_types
+        self.coverage_start = coverage_start
+        self.coverage_end = coverage_end
+        self.coverage_percent = coverage_percent
+        self._type_codes = {t: i for i, t in enumerate(type_ids)}
+
+    @classmethod
+    def from_stations(cls, stations: Iterable[Station]) -> "StationCollection":
+        """Build a collection from Station objects."""
+        return cls._from_records(
+            (s.station_id, s.name, s.lat, s.lon, s.data_types or []) for s in stations
+        )
+
+    @classmethod
+    def from_search_results(cls, results: Iterable[Dict]) -> "StationCollection":
+        """Build a collection straight from "search/v1/data" results, without creating
+        a Station object per result."""
+        return cls._from_records(
+            (
+                r["stations"][0]["id"],
+                r["stations"][0]["name"],
+                r["location"]["coordinates"][1],
+                r["location"]["coordinates"][0],
+                r["stations"][0]["dataTypes"],
+            )
+            for r in results
+        )
+
+    @classmethod
+    def _from_records(cls, records) -> "StationCollection":
+        _require_numpy()
+        ids, names, lats, lons = [], [], [], []
+        offsets = [0]
+        type_codes = {}
+        types, starts, ends, percents = [], [], [], []
+        for station_id, name, lat, lon, data_types in records:
+            ids.append(station_id)
+            names.append(name)
+            lats.append(lat)
+            lons.append(lon)
+            for d in data_types:
+                types.append(type_codes.setdefault(d["id"], len(type_codes)))
+                starts.append((d.get("startDate") or "")[:10] or "NaT")
+                ends.append((d.get("endDate") or "")[:10] or "NaT")
+                coverage = d.get("coverage")
+                percents.append(np.nan if coverage is None else coverage)
+            offsets.append(len(types))
+        return cls(
+            ids=np.array(ids, dtype=str),
+            names=np.array(names, dtype=str),
+            lat=np.array(lats, dtype=np.float64),
+            lon=np.array(lons, dtype=np.float64),
+            type_ids=list(type_codes),
+            coverage_offsets=np.array(offsets, dtype=np.int64),
+            coverage_types=np.array(types, dtype=np.int32),
+            coverage_start=np.array(starts, dtype="datetime64[D]"),
+            coverage_end=np.array(ends, dtype="datetime64[D]"),
+            coverage_percent=np.array(percents, dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, key) -> Union[Station, "StationCollection"]:
+        if isinstance(key, (int, np.integer)):
+            return self._station(int(key))
+        index = np.arange(len(self))[key]
+        return self._take(np.atleast_1d(index))
+
+    def _station(self, i: int) -> Station:
+        lo, hi = self.coverage_offsets[i], self.coverage_offsets[i + 1]
+        # Unknown dates and coverages are NaT and NaN in the arrays and None here.
+        data_types = [
+            {
+                "id": self.type_ids[self.coverage_types[j]],
+                "startDate": None
+                if np.isnat(self.coverage_start[j])
+                else f"{self.coverage_start[j]}T00:00:00",
+                "endDate": None
+                if np.isnat(self.coverage_end[j])
+                else f"{self.coverage_end[j]}T23:59:59",
+                "coverage": None
+                if np.isnan(self.coverage_percent[j])
+                else float(self.coverage_percent[j]),
+            }
+            for j in range(lo, hi)
+        ]
+        return Station(
+            name=str(self.names[i]),
+            station_id=str(self.ids[i]),
+            lat=float(self.lat[i]),
+            lon=float(self.lon[i]),
+            data_types=data_types,
+        )
+
+    def _take(self, index: "np.ndarray") -> "StationCollection":
+        starts = self.coverage_offsets[index]
+        counts = self.coverage_offsets[index + 1] - starts
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        # Positions in the coverage table of every row of the selected stations.
+        rows = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return StationCollection(
+            ids=self.ids[index],
+            names=self.names[index],
+            lat=self.lat[index],
+            lon=self.lon[index],
+            type_ids=self.type_ids,
+            coverage_offsets=offsets,
+            coverage_types=self.coverage_types[rows],
+            coverage_start=self.coverage_start[rows],
+            coverage_end=self.coverage_end[rows],
+            coverage_percent=self.coverage_percent[rows],
+        )
+
+    def to_stations(self) -> List[Station]:
+        """Station objects for every station in the collection."""
+        return [self._station(i) for i in range(len(self))]
+
+    def _coverage_station(self) -> "np.ndarray":
+        """Station index of every coverage row."""
+        return np.repeat(np.arange(len(self)), np.diff(self.coverage_offsets))
+
+    def has_data_type(
+        self,
+        data_type: str,
+        start_date: str = None,
+        end_date: str = None,
+        min_coverage: float = None,
+    ) -> "np.ndarray":
+        """Boolean mask of the stations recording data_type, like Station.has_data_type
+        but for every station at once.
+
+        :param data_type: dataType of interest
+        :param start_date: data_type records should begin on or before start_date, defaults to None
+        :param end_date: data_type records should end on or after end_date, defaults to None
+        :param min_coverage: (optional) minimum coverage percent of the data type. Defaults to None
+        :return: Boolean array, one entry per station.
+        """  # pylint: disable=line-too-long
+        mask = np.zeros(len(self), dtype=bool)
+        code = self._type_codes.get(data_type)
+        if code is None:
+            return mask
+        rows = self.coverage_types == code
+        if start_date:
+            rows &= self.coverage_start <= _day(start_date)
+        if end_date:
+            rows &= self.coverage_end >= _day(end_date)
+        if min_coverage is not None:
+            rows &= self.coverage_percent >= min_coverage
+        mask[self._coverage_station()[rows]] = True
+        return mask
+
+    def distances(self, lat: float, lon: float) -> "np.ndarray":
+        """Distance in kilometers from every station to the coordinates."""
+        return haversine(lat, lon, self.lat, self.lon)
+
+    def distance_matrix(
+        self, lats: Sequence[float], lons: Sequence[float]
+    ) -> "np.ndarray":
+        """Distances in kilometers from many points to every station.
+
+        :return: Array of shape (number of points, number of stations).
+        """
+        lats = np.asarray(lats, dtype=np.float64)[:, None]
+        lons = np.asarray(lons, dtype=np.float64)[:, None]
+        return haversine(lats, lons, self.lat[None, :], self.lon[None, :])
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> "np.ndarray":
+        """Indexes of the k stations closest to the coordinates, closest first."""
+        distances = self.distances(lat, lon)
+        k = min(k, len(self))
+        if k <= 0:
+            return np.array([], dtype=np.int64)
+        top = np.argpartition(distances, k - 1)[:k]
+        return top[np.argsort(distances[top], kind="stable")]
+
+    def sort_by_distance(self, lat: float, lon: float) -> "StationCollection":
+        """New collection ordered from closest to farthest from the coordinates."""
+        return self[np.argsort(self.distances(lat, lon), kind="stable")]
+
+    def filter(self, mask: "np.ndarray") -> "StationCollection":
+        """New collection with the stations where mask is True."""
+        return self[np.asarray(mask, dtype=bool)]
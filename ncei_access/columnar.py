@@ -0,0 +1,161 @@
+"""
+Columnar, typed representation of daily data. Needs the optional numpy dependency
+(``pip install ncei-access[columnar]``); pandas and pyarrow are only needed for the
+matching conversions.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None
+
+from ncei_access import dataType_ref
+
+META_COLUMNS = ("DATE", "STATION")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Columnar output requires numpy: pip install ncei-access[columnar]"
+        )
+
+
+def scale_for(data_type: str) -> float:
+    """Factor that converts raw values of a data type into its metric output units,
+    eg. 0.1 for TMAX which is reported in tenths of degrees C. Data types without a
+    scale factor in dataType_ref are returned as is."""
+    ref = dataType_ref.get(data_type)
+    return (ref.scale_factor if ref else None) or 1
+
+
+def units_for(data_type: str) -> str:
+    """Metric output units of a data type, or None if unknown."""
+    ref = dataType_ref.get(data_type)
+    return ref.metric_output_units if ref else None
+
+
+def parse_values(raw: Sequence, scale: float = 1) -> "np.ndarray":
+    """Convert a sequence of raw string values into a float64 array in one pass.
+    Missing or blank values become NaN.
+
+    :param raw: Values as returned by the API, possibly None.
+    :param scale: Factor applied to every value, defaults to 1
+    :return: float64 array.
+    """
+    _require_numpy()
+    strings = np.array([v if v else "nan" for v in raw], dtype=str)
+    strings = np.char.strip(strings)
+    strings[strings == ""] = "nan"
+    values = strings.astype(np.float64)
+    if scale != 1:
+        values *= scale
+    return values
+
+
+class DailyColumns:
+    """Daily data as one array per column instead of one dict per row.
+
+    - date: datetime64[D] array.
+    - station_codes: int32 array of indexes into stations.
+    - stations: array of the distinct station IDs (the categories of the station column).
+    - values: dict of float64 arrays, one per data type, NaN where missing.
+    - units: dict of the units of each data type's values.
+    """
+
+    def __init__(
+        self,
+        date: "np.ndarray",
+        station_codes: "np.ndarray",
+        stations: "np.ndarray",
+        values: Dict[str, "np.ndarray"],
+        units: Dict[str, str] = None,
+    ):
+        self.date = date
+        self.station_codes = station_codes
+        self.stations = stations
+        self.values = values
+        self.units = units or {}
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: List[Dict],
+        data_types: Union[str, List[str]] = None,
+        scale: bool = True,
+    ) -> "DailyColumns":
+        """Build columns from get_daily rows.
+
+        :param rows: Daily rows as returned by NceiAccessor.get_daily.
+        :param data_types: (optional) Data types to keep. Defaults to every column found in the rows
+        :param scale: Apply dataType_ref scale factors so values are in metric output units, eg. degrees C instead of tenths, defaults to True
+        :return: DailyColumns object.
+        """  # pylint: disable=line-too-long
+        _require_numpy()
+        if isinstance(data_types, str):
+            data_types = [data_types]
+        if data_types is None:
+            seen = {}
+            for row in rows:
+                seen.update(dict.fromkeys(row))
+            data_types = [k for k in seen if k not in META_COLUMNS]
+
+        date = np.array([row["DATE"][:10] for row in rows], dtype="datetime64[D]")
+        stations, station_codes = np.unique(
+            np.array([row["STATION"] for row in rows], dtype=str), return_inverse=True
+        )
+        values = {}
+        units = {}
+        for data_type in data_types:
+            factor = scale_for(data_type) if scale else 1
+            values[data_type] = parse_values(
+                [row.get(data_type) for row in rows], factor
+            )
+            units[data_type] = units_for(data_type) if scale else None
+        return cls(
+            date, station_codes.astype(np.int32), stations, values, units=units
+        )
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @property
+    def station(self) -> "np.ndarray":
+        """Station ID of every row."""
+        return self.stations[self.station_codes]
+
+    def to_pandas(self):
+        """pandas.DataFrame with a datetime DATE column, a categorical STATION column and
+        one float column per data type."""
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        columns = {
+            "DATE": self.date.astype("datetime64[ns]"),
+            "STATION": pd.Categorical.from_codes(self.station_codes, self.stations),
+        }
+        columns.update(self.values)
+        return pd.DataFrame(columns)
+
+    def to_arrow(self):
+        """pyarrow.Table with a date32 DATE column, a dictionary encoded STATION column
+        and one float64 column per data type, with units in the field metadata."""
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        arrays = [
+            pa.array(self.date, type=pa.date32()),
+            pa.DictionaryArray.from_arrays(
+                pa.array(self.station_codes), pa.array(self.stations)
+            ),
+        ]
+        fields = [
+            pa.field("DATE", pa.date32()),
+            pa.field("STATION", arrays[1].type),
+        ]
+        for data_type, values in self.values.items():
+            arrays.append(pa.array(values, from_pandas=True))
+            units = self.units.get(data_type)
+            metadata = {"units": units} if units else None
+            fields.append(pa.field(data_type, pa.float64(), metadata=metadata))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
@@ -0,0 +1,236 @@
+"""
+Station elevations. NCEI only reports elevation as the daily ELEVATION data type, so
+elevations are resolved from a short window of daily data, many stations per request,
+and remembered on disk.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from ncei_access.cache import DAY, default_cache_dir
+from ncei_access.chunking import batch_stations
+from ncei_access.models import Station
+
+_default_service = None
+_default_lock = threading.Lock()
+
+
+def default_elevation_service() -> "ElevationService":
+    """Process wide ElevationService used by Station.elevation, created on first use."""
+    global _default_service  # pylint: disable=global-statement
+    with _default_lock:
+        if _default_service is None:
+            _default_service = ElevationService()
+        return _default_service
+
+
+class ElevationService:
+    """Elevations in meters of many stations, fetched in batches and memoized in a
+    SQLite file so each station's elevation is requested at most once.
+
+    For each station only window_days days of ELEVATION data are requested, ending on
+    the last day the station reported ELEVATION according to its dataTypes, or those
+    of the accessor's catalog. When that isn't known the window ends today, and
+    stations without a record in it are asked again over each of the longer
+    fallback_days windows before they are stored as having no elevation. Stations
+    sharing an end date are requested together, in batches, on the accessor's worker
+    pool. If the accessor has a backend, it is used
+    instead of the API: a backend with an elevations() method, like
+    ncei_access.ghcnd.GhcndMirror, answers directly, and any other backend is asked
+    for the ELEVATION data.
+
+    .. code-block:: python
+
+        elevations = ElevationService(accessor=ncei_db)
+        by_id = elevations.get_many(ncei_db.stations_in_boundary(41, -112, 40, -111))
+    """
+
+    def __init__(
+        self,
+        accessor=None,
+        path: Union[str, Path] = None,
+        window_days: int = 31,
+        station_batch_size: int = 50,
+        miss_ttl: Optional[float] = 30 * DAY,
+        logger: logging.Logger = None,
+        fallback_days: Sequence[int] = (366, 3653),
+    ):
+        """
+        :param accessor: (optional) NceiAccessor used for the requests, so they share its connection pool. Defaults to a new NceiAccessor
+        :param path: (optional) SQLite file. Defaults to elevations.sqlite in ncei_access.cache.default_cache_dir()
+        :param window_days: Number of days of ELEVATION data requested per station, defaults to 31
+        :param station_batch_size: Maximum number of stations per request, defaults to 50
+        :param miss_ttl: Seconds before a station without any elevation record is asked for again. None means never. Defaults to 30 days
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        :param fallback_days: Longer windows, in days and ending today, tried in turn for stations whose last ELEVATION record isn't known, defaults to (366, 3653)
+        """  # pylint: disable=line-too-long
+        if accessor is None:
+            # Importing here to avoid circular import issues
+            from ncei_access.ncei_accessor import NceiAccessor
+
+            accessor = NceiAccessor(logger=logger)
+        self.accessor = accessor
+        self.path = Path(path) if path else default_cache_dir() / "elevations.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.window_days = window_days
+        self.station_batch_size = station_batch_size
+        self.miss_ttl = miss_ttl
+        self.fallback_days = tuple(fallback_days)
+        self._logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS elevations (
+                    station TEXT PRIMARY KEY,
+                    elevation REAL,
+                    checked REAL NOT NULL
+                ) WITHOUT ROWID"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _known(self, station_ids: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Stored elevations of the stations, skipping misses older than miss_ttl."""
+        known = {}
+        now = time.time()
+        conn = self._connect()
+        for station_id in station_ids:
+            row = conn.execute(
+                "SELECT elevation, checked FROM elevations WHERE station = ?",
+                (station_id,),
+            ).fetchone()
+            if row is None:
+                continue
+            elevation, checked = row
+            if (
+                elevation is None
+                and self.miss_ttl is not None
+                and checked + self.miss_ttl < now
+            ):
+                continue
+            known[station_id] = elevation
+        return known
+
+    def _last_record(self, station: Union[str, Station]) -> Optional[date]:
+        """Last day the station reported ELEVATION, from its own metadata or the
+        accessor's catalog, or None if neither knows."""
+        if not isinstance(station, Station) or "ELEVATION" not in station.coverage:
+            catalog = getattr(self.accessor, "catalog", None)
+            station_id = station.station_id if isinstance(station, Station) else station
+            station = catalog.get(station_id) if catalog is not None else None
+        if isinstance(station, Station):
+            coverage = station.coverage.get("ELEVATION")
+            if coverage and coverage.end:
+                return min(coverage.end.date(), date.today())
+        return None
+
+    def get_many(
+        self, stations: Iterable[Union[str, Station]]
+    ) -> Dict[str, Optional[float]]:
+        """Elevations of many stations. Only stations not already stored are requested.
+
+        :param stations: Station objects or station IDs. Station objects let the request window end on the station's last ELEVATION record.
+        :return: Dict of station ID -> elevation in meters, or None if the station has no elevation record.
+        """  # pylint: disable=line-too-long
+        stations = {
+            (s.station_id if isinstance(s, Station) else s): s for s in stations
+        }
+        backend = self.accessor.backend
+        if hasattr(backend, "elevations"):
+            local = backend.elevations()
+            return {station_id: local.get(station_id) for station_id in stations}
+        elevations = self._known(stations)
+
+        # Stations whose windows end on the same day can share requests.
+        by_end, unknown = defaultdict(list), []
+        for station_id, station in stations.items():
+            if station_id in elevations:
+                continue
+            end = self._last_record(station)
+            if end is None:
+                unknown.append(station_id)
+                end = date.today()
+            by_end[end].append(station_id)
+        if not by_end:
+            return elevations
+
+        found = {station_id: None for ids in by_end.values() for station_id in ids}
+        found.update(self._fetch(by_end, self.window_days))
+        for days in self.fallback_days:
+            unknown = [
+                station_id for station_id in unknown if found[station_id] is None
+            ]
+            if not unknown:
+                break
+            found.update(self._fetch({date.today(): unknown}, days))
+
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO elevations VALUES (?, ?, ?)",
+                [(station_id, elev, now) for station_id, elev in found.items()],
+            )
+        elevations.update(found)
+        return elevations
+
+    def _fetch(self, by_end: Dict[date, List[str]], days: int) -> Dict[str, float]:
+        """Last elevation of the stations with a record in the days-long window ending
+        on their key of by_end."""
+        param_list = []
+        for end, station_ids in sorted(by_end.items()):
+            start = end - timedelta(days=days - 1)
+            for batch in batch_stations(station_ids, self.station_batch_size):
+                param_list.append(
+                    {
+                        "dataset": "daily-summaries",
+                        "dataTypes": ["ELEVATION"],
+                        "stations": batch,
+                        "startDate": start.isoformat(),
+                        "endDate": end.isoformat(),
+                    }
+                )
+        self._logger.debug(
+            f"Fetching elevations of {sum(map(len, by_end.values()))} stations over {days} days in {len(param_list)} requests."  # pylint: disable=line-too-long
+        )
+        backend = self.accessor.backend
+        if backend is not None:
+            responses = [
+                backend.get_daily(
+                    p["dataTypes"], p["stations"], p["startDate"], p["endDate"]
+                )
+                for p in param_list
+            ]
+        else:
+            responses = self.accessor.get_many(param_list)
+
+        found = {}
+        for rows in responses:
+            # Rows are in date order, so later rows overwrite earlier ones.
+            for row in rows:
+                if row.get("ELEVATION") not in (None, ""):
+                    found[row["STATION"]] = float(row["ELEVATION"])
+        return found
+
+    def get(self, station: Union[str, Station]) -> Optional[float]:
+        """Elevation of one station in meters, or None if it has no elevation record."""
+        station_id = station.station_id if isinstance(station, Station) else station
+        return self.get_many([station])[station_id]
+
+    def clear(self):
+        """Forget every stored elevation."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM elevations")
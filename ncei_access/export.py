@@ -0,0 +1,391 @@
+"""
+Export of daily data to files partitioned by station and year. Parquet, the default
+format, needs the optional numpy and pyarrow dependencies (``pip install
+ncei-access[arrow]``). CSV and JSON lines files hold the values as the API returns
+them and need nothing extra.
+
+Files are laid out Hive style, so pyarrow, pandas, Spark, DuckDB and friends read the
+directory as one dataset with STATION and YEAR columns:
+
+.. code-block:: text
+
+    path/STATION=USC00421759/YEAR=2024/data.parquet
+
+Exporting into a directory that already holds a station and year merges the new rows
+into its file, so each station and day is in the dataset once. On days in both, the
+exported data types take the new values and other data types keep the old ones.
+
+The period is split into years and the stations into batches. Each (year, station
+batch) is fetched, written and dropped before the next ones, so memory is bounded by
+max_workers batches whatever the size of the export. Every file is written under a
+temporary name and renamed into place. Finished (station, year) pairs are appended
+to a manifest in the export directory, so an interrupted export picks up where it
+left off when run again.
+"""
+
+import csv
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple, Union
+from ncei_access import jsonlib
+from ncei_access.chunking import batch_stations, split_date_range
+from ncei_access.columnar import DailyColumns
+
+MANIFEST = "_manifest.jsonl"
+FORMATS = ("parquet", "csv", "jsonl")
+
+_logger = logging.getLogger(__name__)
+
+Unit = Tuple[str, str, List[str]]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel,unused-import
+        import pyarrow.parquet  # pylint: disable=import-outside-toplevel,unused-import
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow: pip install ncei-access[arrow]"
+        ) from e
+
+
+def partition_path(
+    path: Union[str, Path], station: str, year: int, fmt: str = "parquet"
+) -> Path:
+    """File holding one station's data for one year."""
+    return Path(path) / f"STATION={station}" / f"YEAR={year}" / f"data.{fmt}"
+
+
+def _earlier_files(target: Path) -> List[Path]:
+    """Files of target's partition left by earlier exports, to merge into target."""
+    return sorted(target.parent.glob(f"data*{target.suffix}"))
+
+
+def _replace_earlier(target: Path, earlier: List[Path]):
+    """Remove the files of target's partition that were merged into target."""
+    for other in earlier:
+        if other != target:
+            other.unlink()
+
+
+def manifest_key(
+    station: str, start: str, end: str, data_types: List[str], fmt: str
+) -> str:
+    """Key of one finished (station, date range, data types, format) export in a
+    manifest."""
+    return f"{station}|{start}|{end}|{','.join(data_types)}|{fmt}"
+
+
+def read_manifest(path: Union[str, Path], manifest: str = MANIFEST) -> Set[str]:
+    """Keys of the (station, date range, data types, format) exports finished in path.
+    A line cut short by a crash is ignored."""
+    done = set()
+    try:
+        with open(Path(path) / manifest, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                done.add(
+                    manifest_key(
+                        entry["station"],
+                        entry["start"],
+                        entry["end"],
+                        entry["data_types"],
+                        entry.get("format", "parquet"),
+                    )
+                )
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def write_partitions(
+    columns: DailyColumns,
+    path: Union[str, Path],
+    year: int,
+    row_group_size: int = 65536,
+    compression: str = "zstd",
+) -> Dict[str, int]:
+    """Write one year of DailyColumns as one Parquet file per station, merged into
+    the file an earlier export left for the station and year, if any.
+
+    :return: Number of rows written for each station.
+    """
+    import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    table = columns.to_arrow()
+    codes = table.column("STATION").combine_chunks().indices
+    table = table.drop(["STATION"])
+    written = {}
+    for code, station in enumerate(columns.stations.tolist()):
+        part = table.filter(pc.equal(codes, code))
+        written[station] = part.num_rows
+        target = partition_path(path, station, year)
+        earlier = _earlier_files(target)
+        for other in earlier:
+            part = _merge_tables(pq.read_table(other), part)
+        _write_atomic(
+            target,
+            lambda tmp, part=part: pq.write_table(
+                part, tmp, row_group_size=row_group_size, compression=compression
+            ),
+        )
+        _replace_earlier(target, earlier)
+    return written
+
+
+def _merge_tables(old, new):
+    """Rows of two tables of one station, one per DATE in date order. Days in both
+    take the values of new in its columns and keep those of old in the others."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+    old_dates = old.column("DATE").to_numpy()
+    new_dates = new.column("DATE").to_numpy()
+    dates = np.union1d(old_dates, new_dates)
+
+    def rows_of(table_dates):
+        # Row of the table on each day of dates, null where it has none.
+        index = np.full(len(dates), -1, dtype=np.int64)
+        index[np.searchsorted(dates, table_dates)] = np.arange(len(table_dates))
+        return pa.array(index, mask=index < 0)
+
+    old_rows, new_rows = rows_of(old_dates), rows_of(new_dates)
+    in_new = pc.is_valid(new_rows)
+    fields, arrays = [pa.field("DATE", pa.date32())], [pa.array(dates, pa.date32())]
+    names = [n for n in old.column_names if n != "DATE"]
+    names += [n for n in new.column_names if n != "DATE" and n not in names]
+    for name in names:
+        if name not in new.column_names:
+            fields.append(old.schema.field(name))
+            arrays.append(old.column(name).take(old_rows))
+            continue
+        fields.append(new.schema.field(name))
+        values = new.column(name).take(new_rows)
+        if name in old.column_names:
+            values = pc.if_else(in_new, values, old.column(name).take(old_rows))
+        arrays.append(values)
+    return pa.Table.from_arrays(
+        arrays, schema=pa.schema(fields, metadata=new.schema.metadata)
+    )
+
+
+def write_rows(
+    rows: List[Dict],
+    data_types: List[str],
+    path: Union[str, Path],
+    year: int,
+    fmt: str = "csv",
+) -> Dict[str, int]:
+    """Write one year of daily rows, as returned by the API, as one CSV or JSON lines
+    file per station, merged into the file an earlier export left for the station
+    and year, if any. CSV files have a DATE column and one column per data type.
+
+    :return: Number of rows written for each station.
+    """
+    by_station: Dict[str, List[Dict]] = {}
+    for row in rows:
+        by_station.setdefault(row["STATION"], []).append(row)
+
+    for station, station_rows in by_station.items():
+        target = partition_path(path, station, year, fmt)
+        earlier = _earlier_files(target)
+        columns = list(data_types)
+        if earlier:
+            old_rows = [r for other in earlier for r in _read_text(other, fmt)]
+            station_rows, columns = _merge_rows(old_rows, station_rows, data_types)
+        _write_atomic(
+            target,
+            lambda tmp, station_rows=station_rows, columns=columns: _write_text(
+                tmp, station_rows, columns, fmt
+            ),
+        )
+        _replace_earlier(target, earlier)
+    return {station: len(r) for station, r in by_station.items()}
+
+
+def _read_text(target: Path, fmt: str) -> List[Dict]:
+    """Rows of a CSV or JSON lines file written by write_rows, without empty values."""
+    if fmt == "csv":
+        with open(target, "r", encoding="utf-8", newline="") as f:
+            return [
+                {k: v for k, v in row.items() if v != ""} for row in csv.DictReader(f)
+            ]
+    with open(target, "rb") as f:
+        return [jsonlib.loads(line) for line in f if line.strip()]
+
+
+def _merge_rows(
+    old_rows: List[Dict], new_rows: List[Dict], data_types: List[str]
+) -> Tuple[List[Dict], List[str]]:
+    """Rows of one station, one per DATE in date order, and their data type columns.
+    Days in both take the values of new_rows for data_types and keep those of
+    old_rows for the other data types."""
+    by_date = {row["DATE"]: row for row in old_rows}
+    columns = []
+    for key in [k for row in old_rows for k in row] + data_types:
+        if key not in ("DATE", "STATION") and key not in columns:
+            columns.append(key)
+    for row in new_rows:
+        kept = by_date.get(row["DATE"], {})
+        merged = {k: v for k, v in kept.items() if k not in data_types}
+        merged.update(row)
+        by_date[row["DATE"]] = merged
+    return [by_date[day] for day in sorted(by_date)], columns
+
+
+def _write_text(target: Path, rows: List[Dict], data_types: List[str], fmt: str):
+    if fmt == "csv":
+        with open(target, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(
+                f, ["DATE"] + data_types, restval="", extrasaction="ignore"
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(target, "wb") as f:
+            for row in rows:
+                row = {k: v for k, v in row.items() if k != "STATION"}
+                f.write(jsonlib.dumps(row) + b"\n")
+
+
+def _write_atomic(target: Path, write: Callable[[Path], None]):
+    """Write a file under a temporary name and rename it into place, so a crash never
+    leaves a partial file behind."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    write(tmp)
+    os.replace(tmp, target)
+
+
+def _end_partial_line(manifest: Path):
+    """Finish a manifest line cut short by a crash, so new entries start clean."""
+    try:
+        with open(manifest, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+    except FileNotFoundError:
+        pass
+
+
+def export_daily(
+    accessor,
+    data_types: Union[str, List[str]],
+    stations: Union[str, List[str]],
+    start: str,
+    end: str,
+    path: Union[str, Path],
+    station_batch_size: int = 10,
+    row_group_size: int = 65536,
+    compression: str = "zstd",
+    progress: Callable[[int, int], None] = None,
+    fmt: str = "parquet",
+    manifest: str = MANIFEST,
+) -> Dict[str, int]:
+    """Fetch daily data and write it to files partitioned by station and year. See the
+    module docstring for the layout. In Parquet files, values are float64 columns in
+    metric output units, with the units from ncei_access.dataType_ref in the field
+    metadata, and every file has a column for every data type so the dataset has one
+    schema.
+
+    :param accessor: NceiAccessor used to fetch the data.
+    :param data_types: data type(s) of interest.
+    :param stations: station id(s).
+    :param start: beginning date of period of interest.
+    :param end: end date of period of interest.
+    :param path: Directory of the export.
+    :param station_batch_size: Maximum number of stations per request, defaults to 10
+    :param row_group_size: Maximum number of rows per Parquet row group, defaults to 65536
+    :param compression: Parquet compression codec, defaults to "zstd"
+    :param progress: (optional) Called as progress(done, total) after each station batch and year is written. Defaults to None
+    :param fmt: File format, one of FORMATS, defaults to "parquet"
+    :param manifest: Name of the manifest file in path, eg. one per shard when several processes export to the same directory. Defaults to MANIFEST
+    :raises ValueError: If fmt is not one of FORMATS.
+    :return: Counts of "rows" and "files" written and "skipped" (station, year) pairs finished by an earlier run.
+    """  # pylint: disable=line-too-long
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    if fmt == "parquet":
+        _require_pyarrow()
+    data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+    stations = [stations] if isinstance(stations, str) else list(stations)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    done = read_manifest(path, manifest)
+
+    units: List[Unit] = []
+    skipped = 0
+    for year_start, year_end in split_date_range(start, end, "year"):
+        pending = [
+            s
+            for s in stations
+            if manifest_key(s, year_start, year_end, data_types, fmt) not in done
+        ]
+        skipped += len(stations) - len(pending)
+        if pending:
+            units.extend(
+                (year_start, year_end, batch)
+                for batch in batch_stations(pending, batch_size=station_batch_size)
+            )
+    if skipped:
+        _logger.info(f"Skipping {skipped} station years exported by an earlier run.")
+
+    counts = {"rows": 0, "files": 0, "skipped": skipped}
+    window = max(1, accessor.max_workers)
+    _end_partial_line(path / manifest)
+    with open(path / manifest, "a", encoding="utf-8") as log:
+        for offset in range(0, len(units), window):
+            batch_units = units[offset : offset + window]
+            parts = _fetch(accessor, data_types, batch_units)
+            for (year_start, year_end, batch), rows in zip(batch_units, parts):
+                year = int(year_start[:4])
+                if fmt == "parquet":
+                    written = write_partitions(
+                        DailyColumns.from_rows(rows, data_types),
+                        path,
+                        year,
+                        row_group_size=row_group_size,
+                        compression=compression,
+                    )
+                else:
+                    written = write_rows(rows, data_types, path, year, fmt)
+                counts["rows"] += sum(written.values())
+                counts["files"] += len(written)
+                for station in batch:
+                    entry = {
+                        "station": station,
+                        "start": year_start,
+                        "end": year_end,
+                        "data_types": data_types,
+                        "format": fmt,
+                        "rows": written.get(station, 0),
+                    }
+                    log.write(json.dumps(entry) + "\n")
+            log.flush()
+            if progress:
+                progress(min(offset + window, len(units)), len(units))
+    return counts
+
+
+def _fetch(accessor, data_types: List[str], units: List[Unit]) -> List[List[Dict]]:
+    """Rows of each unit, fetched in parallel, or read from the accessor's backend."""
+    if accessor.backend is not None:
+        return [
+            accessor.backend.get_daily(data_types, batch, year_start, year_end)
+            for year_start, year_end, batch in units
+        ]
+    # Importing here to avoid circular import issues
+    from ncei_access.ncei_accessor import daily_params  # pylint: disable=import-outside-toplevel
+
+    return accessor.get_many(
+        [daily_params(data_types, batch, s, e) for s, e, batch in units]
+    )
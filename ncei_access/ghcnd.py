@@ -0,0 +1,610 @@
+"""
+Local GHCN-Daily mirror as a data source for NceiAccessor. Needs the optional numpy
+dependency (``pip install ncei-access[columnar]``).
+
+Reads a copy of NOAA's GHCN-Daily bulk files
+(https://www.ncei.noaa.gov/pub/data/ghcn/daily/) laid out like the original:
+
+- ghcnd-stations.txt and ghcnd-inventory.txt
+- all/<station>.dly: fixed-width files, one per station
+- by_year/<year>.csv: one file per year, decompressed
+
+Files are memory-mapped. Each .dly file is indexed by the year, month and element of
+its lines, and each by-year CSV by the byte range of each station's lines. Queries
+only touch the lines they need and parse them with numpy. By-year indexes take a
+full pass over the file to build, so they are saved to the ncei_access cache
+directory and reused until the file changes.
+
+.. code-block:: python
+
+    mirror = GhcndMirror("/data/ghcnd")
+    ncei_db = na.NceiAccessor(backend=mirror, catalog=mirror.catalog())
+    rows = ncei_db.get_daily(["TMAX", "TMIN"], stations, "1950-01-01", "2020-12-31")
+"""  # pylint: disable=line-too-long
+
+import logging
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None
+
+from ncei_access import _cache_root
+from ncei_access.chunking import parse_date
+from ncei_access.columnar import DailyColumns, scale_for, units_for
+from ncei_access.exceptions import NceiAccessException
+from ncei_access.models import Station
+
+# Layout of a .dly line: ID, YYYYMM and element, then 31 days of a 5 character value
+# followed by measurement, quality and source flags.
+DLY_VALUES_AT = 21
+DLY_DAY_WIDTH = 8
+DLY_DAYS = 31
+MISSING = -9999
+
+# By-year CSV lines start with "ID,YYYYMMDD,ELEM," so the value is at a fixed offset.
+CSV_VALUE_AT = 26
+_ID_WIDTH = 11
+
+_INDEX_VERSION = 1
+
+T = TypeVar("T")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "The GHCN-Daily mirror requires numpy: pip install ncei-access[columnar]"
+        )
+
+
+def parse_int_fields(fields: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Parse integers from fixed-width byte fields, one field per row. A field may hold
+    spaces, a minus sign and digits, and ends at the first other byte, eg. a comma.
+
+    :param fields: uint8 array of shape (rows, width).
+    :return: int64 values and a boolean array, False where a field has no digits.
+    """
+    digit = (fields >= ord("0")) & (fields <= ord("9"))
+    allowed = digit | (fields == ord(" ")) | (fields == ord("-"))
+    inside = np.logical_and.accumulate(allowed, axis=1)
+    digit &= inside
+    values = np.zeros(len(fields), dtype=np.int64)
+    for j in range(fields.shape[1]):
+        values = np.where(
+            digit[:, j], values * 10 + (fields[:, j].astype(np.int64) - 48), values
+        )
+    negative = ((fields == ord("-")) & inside).any(axis=1)
+    return np.where(negative, -values, values), digit.any(axis=1)
+
+
+def _gather(buf: "np.ndarray", starts: "np.ndarray", width: int) -> "np.ndarray":
+    """Bytes starts[i]..starts[i] + width of buf as a (len(starts), width) array,
+    clipped to the end of buf."""
+    index = np.minimum(starts[:, None] + np.arange(width), len(buf) - 1)
+    return buf[index]
+
+
+def _ids(buf: "np.ndarray", starts: "np.ndarray") -> "np.ndarray":
+    """Station IDs at the start of each line, as an S11 array."""
+    return np.ascontiguousarray(_gather(buf, starts, _ID_WIDTH)).view(
+        f"S{_ID_WIDTH}"
+    )[:, 0]
+
+
+def _dates(ymd: "np.ndarray") -> "np.ndarray":
+    """datetime64[D] array from YYYYMMDD integers."""
+    months = (ymd // 10000 - 1970) * 12 + ymd // 100 % 100 - 1
+    return months.astype("datetime64[M]").astype("datetime64[D]") + (ymd % 100 - 1)
+
+
+def _type_index(wanted: "np.ndarray", elements: "np.ndarray") -> "np.ndarray":
+    """Position in wanted of each element. Every element must be in wanted."""
+    order = np.argsort(wanted)
+    return order[np.searchsorted(wanted[order], elements)]
+
+
+def _records(buf: "np.ndarray", line_length: int) -> "np.ndarray":
+    """Fixed-width lines of buf as a (lines, line_length) array. A missing newline at
+    the end of the last line is tolerated."""
+    n_lines = (len(buf) + 1) // line_length
+    if len(buf) < n_lines * line_length:
+        buf = np.append(buf, np.uint8(ord("\n")))
+    return buf[: n_lines * line_length].reshape(n_lines, line_length)
+
+
+def _map(path: Path) -> Tuple[Optional[mmap.mmap], "np.ndarray"]:
+    """Memory-map a file read-only. Empty files can't be mapped and give an empty
+    array."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, np.zeros(0, dtype=np.uint8)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, np.frombuffer(mapped, dtype=np.uint8)
+
+
+def _with_mapped(path: Path, read: Callable[["np.ndarray"], T]) -> T:
+    """Call read with the memory-mapped bytes of a file, then unmap it. read must
+    return copies, not views of the bytes."""
+    mapped, buf = _map(path)
+    try:
+        return read(buf)
+    finally:
+        del buf
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                # A traceback still holds a view; the map closes when it's collected.
+                pass
+
+
+def _index_dly(buf: "np.ndarray") -> Tuple[int, "np.ndarray", "np.ndarray"]:
+    """(line length, YYYYMM of each line, element of each line) of a .dly file."""
+    newlines = np.flatnonzero(buf[:512] == ord("\n"))
+    line_length = int(newlines[0]) + 1 if len(newlines) else len(buf) + 1
+    records = _records(buf, line_length)
+    year_month, _ = parse_int_fields(records[:, 11:17])
+    elements = np.ascontiguousarray(records[:, 17:21]).view("S4")[:, 0]
+    return line_length, year_month.astype(np.int32), elements
+
+
+def scan_station_runs(
+    buf: "np.ndarray", block_size: int = 1 << 26
+) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """Find the runs of consecutive lines belonging to the same station in a by-year
+    CSV, reading block_size bytes at a time.
+
+    :return: Station ID, first byte and end byte of each run, in file order.
+    """
+    ids, starts = [], []
+    previous = None
+    for block_start in range(0, len(buf), block_size):
+        block = buf[block_start : block_start + block_size]
+        line_starts = np.flatnonzero(block == ord("\n")) + block_start + 1
+        line_starts = line_starts[line_starts < len(buf)]
+        if block_start == 0:
+            line_starts = np.concatenate([[0], line_starts])
+        if not len(line_starts):
+            continue
+        line_ids = _ids(buf, line_starts)
+        changed = np.ones(len(line_ids), dtype=bool)
+        changed[1:] = line_ids[1:] != line_ids[:-1]
+        if previous is not None:
+            changed[0] = line_ids[0] != previous
+        ids.append(line_ids[changed])
+        starts.append(line_starts[changed])
+        previous = line_ids[-1]
+    if not ids:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.zeros(0, dtype=f"S{_ID_WIDTH}"), empty, empty
+    ids, starts = np.concatenate(ids), np.concatenate(starts).astype(np.int64)
+    ends = np.append(starts[1:], len(buf))
+    return ids, starts, ends
+
+
+class _YearFile:
+    """Memory-mapped by-year CSV with its station run index."""
+
+    def __init__(self, path: Path, index_dir: Optional[Path]):
+        self.path = path
+        self._mmap, self.buf = _map(path)
+        ids, starts, ends = self._load_index(index_dir)
+        order = np.argsort(ids, kind="stable")
+        self.ids, self.starts, self.ends = ids[order], starts[order], ends[order]
+
+    def _load_index(self, index_dir: Optional[Path]):
+        if index_dir is None:
+            return scan_station_runs(self.buf)
+        stat = self.path.stat()
+        index_path = index_dir / (
+            f"{self.path.stem}-{_INDEX_VERSION}-{stat.st_size}-{stat.st_mtime_ns}.npz"
+        )
+        try:
+            with np.load(index_path) as saved:
+                return saved["ids"], saved["starts"], saved["ends"]
+        except (OSError, KeyError, ValueError):
+            pass
+        ids, starts, ends = scan_station_runs(self.buf)
+        try:
+            index_dir.mkdir(parents=True, exist_ok=True)
+            tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=ids, starts=starts, ends=ends)
+            os.replace(tmp, index_path)
+        except OSError:
+            pass
+        return ids, starts, ends
+
+    def line_starts(self, station_id: str) -> "np.ndarray":
+        """Byte offset of every line of the station."""
+        key = station_id.encode("ascii")
+        lo = np.searchsorted(self.ids, key, side="left")
+        hi = np.searchsorted(self.ids, key, side="right")
+        starts = []
+        for start, end in zip(self.starts[lo:hi], self.ends[lo:hi]):
+            block = self.buf[start:end]
+            inner = np.flatnonzero(block == ord("\n")) + start + 1
+            starts.append(np.concatenate([[start], inner[inner < end]]))
+        if not starts:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(starts).astype(np.int64)
+
+    def close(self):
+        self.buf = None
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+Observations = Tuple[List[str], "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]
+
+
+class GhcndMirror:
+    """Serves get_daily, get_daily_columns and find_station from a local GHCN-Daily
+    mirror instead of the NCEI API. Pass it to NceiAccessor as backend.
+
+    Values are the raw GHCN-Daily integers, eg. tenths of degrees C for TMAX, the
+    same as the API returns, so scaling with dataType_ref works the same way.
+    Stations with a .dly file are read from it; other stations are read from the
+    by-year CSVs of the requested years, if there are any.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        dly_dir: Union[str, Path] = None,
+        by_year_dir: Union[str, Path] = None,
+        index_dir: Union[str, Path] = None,
+        drop_flagged: bool = False,
+        index_cache_size: int = 4096,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param root: Directory of the mirror, holding ghcnd-stations.txt and ghcnd-inventory.txt.
+        :param dly_dir: (optional) Directory of the .dly files. Defaults to root/all
+        :param by_year_dir: (optional) Directory of the decompressed by-year CSVs. Defaults to root/by_year
+        :param index_dir: (optional) Where by-year indexes are saved. Defaults to "ghcnd" in the ncei_access cache directory
+        :param drop_flagged: Leave out values with a quality flag, ie. that failed a quality check, defaults to False
+        :param index_cache_size: Number of .dly file indexes kept in memory, defaults to 4096
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        :raises NceiAccessException: If root is not a directory.
+        """  # pylint: disable=line-too-long
+        _require_numpy()
+        self.root = Path(root)
+        if not self.root.is_dir():
+            raise NceiAccessException(f"GHCN-Daily mirror {self.root} not found")
+        self.dly_dir = Path(dly_dir) if dly_dir else self.root / "all"
+        self.by_year_dir = Path(by_year_dir) if by_year_dir else self.root / "by_year"
+        self.index_dir = (
+            Path(index_dir) if index_dir else Path(_cache_root()) / "ghcnd"
+        )
+        self.drop_flagged = drop_flagged
+        self.index_cache_size = index_cache_size
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stations = None
+        self._elevations = None
+        self._dly_indexes = OrderedDict()
+        self._year_files = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap the by-year files."""
+        with self._lock:
+            for year_file in self._year_files.values():
+                if year_file is not None:
+                    year_file.close()
+            self._year_files.clear()
+
+    # Stations
+
+    def stations(self) -> Dict[str, Station]:
+        """Every station of ghcnd-stations.txt by ID, with the periods of record of
+        ghcnd-inventory.txt as data_types. Read once, on first use."""
+        with self._lock:
+            if self._stations is None:
+                self._stations, self._elevations = self._read_stations()
+            return self._stations
+
+    def elevations(self) -> Dict[str, Optional[float]]:
+        """Elevation in meters of every station of ghcnd-stations.txt by ID, None where
+        it is missing (-999.9). Used by ncei_access.elevation.ElevationService."""
+        self.stations()
+        return self._elevations
+
+    def _read_stations(self) -> Tuple[Dict[str, Station], Dict[str, Optional[float]]]:
+        inventory = {}
+        inventory_path = self.root / "ghcnd-inventory.txt"
+        if inventory_path.exists():
+            with open(inventory_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    inventory.setdefault(line[:11], []).append(
+                        {
+                            "id": line[31:35].strip(),
+                            "startDate": f"{line[36:40]}-01-01T00:00:00",
+                            "endDate": f"{line[41:45]}-12-31T23:59:59",
+                        }
+                    )
+
+        stations, elevations = {}, {}
+        stations_path = self.root / "ghcnd-stations.txt"
+        if not stations_path.exists():
+            self._logger.warning(f"{stations_path} not found, no station metadata.")
+            return stations, elevations
+        with open(stations_path, "r", encoding="utf-8") as f:
+            for line in f:
+                station_id = line[:11]
+                state = line[38:40].strip()
+                region = f"{state} {station_id[:2]}" if state else station_id[:2]
+                stations[station_id] = Station(
+                    name=f"{line[41:71].strip()}, {region}",
+                    station_id=station_id,
+                    lat=float(line[12:20]),
+                    lon=float(line[21:30]),
+                    data_types=inventory.get(station_id, []),
+                )
+                elevation = float(line[31:37])
+                elevations[station_id] = None if elevation <= -999 else elevation
+        return stations, elevations
+
+    def find_station(self, station_id: str) -> Optional[Station]:
+        """Station with the ID, or None if the mirror doesn't list it."""
+        return self.stations().get(station_id)
+
+    def catalog(self) -> "StationCatalog":
+        """StationCatalog of every station in the mirror, for find_closest_station."""
+        # Importing here so the spatial index is only built when asked for
+        from ncei_access.catalog import StationCatalog  # pylint: disable=import-outside-toplevel
+
+        return StationCatalog(list(self.stations().values()))
+
+    # .dly files
+
+    def _dly_index(self, path: Path):
+        """(line length, YYYYMM of each line, element of each line) of a .dly file,
+        or None if it doesn't exist."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._dly_indexes.get(path)
+            if cached is not None and cached[0] == stamp:
+                self._dly_indexes.move_to_end(path)
+                return cached[1]
+
+        index = _with_mapped(path, _index_dly)
+
+        with self._lock:
+            self._dly_indexes[path] = (stamp, index)
+            while len(self._dly_indexes) > self.index_cache_size:
+                self._dly_indexes.popitem(last=False)
+        return index
+
+    def _read_dly(
+        self, station_id: str, data_types: List[str], start, end
+    ) -> Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]]:
+        """(dates, data type indexes, values) of a station from its .dly file, or None
+        if there is no .dly file."""
+        path = self.dly_dir / f"{station_id}.dly"
+        index = self._dly_index(path)
+        if index is None:
+            return None
+        line_length, year_month, elements = index
+        wanted = np.array([t.encode("ascii") for t in data_types], dtype="S4")
+        lines = np.flatnonzero(
+            np.isin(elements, wanted)
+            & (year_month >= start.year * 100 + start.month)
+            & (year_month <= end.year * 100 + end.month)
+        )
+        if not len(lines):
+            return _empty_observations()
+
+        days = _with_mapped(
+            path,
+            lambda buf: _records(buf, line_length)[
+                lines, DLY_VALUES_AT : DLY_VALUES_AT + DLY_DAYS * DLY_DAY_WIDTH
+            ].reshape(-1, DLY_DAY_WIDTH),
+        )
+
+        values, present = parse_int_fields(days[:, :5])
+        present &= values != MISSING
+        if self.drop_flagged:
+            present &= days[:, 6] == ord(" ")
+
+        first = _dates(year_month[lines].astype(np.int64) * 100 + 1)
+        dates = (first[:, None] + np.arange(DLY_DAYS)).ravel()
+        # Days 29-31 of shorter months are placeholders.
+        present &= dates.astype("datetime64[M]") == np.repeat(
+            first.astype("datetime64[M]"), DLY_DAYS
+        )
+        present &= (dates >= np.datetime64(start)) & (dates <= np.datetime64(end))
+        types = np.repeat(_type_index(wanted, elements[lines]), DLY_DAYS)
+        return dates[present], types[present], values[present]
+
+    # By-year CSVs
+
+    def _year_file(self, year: int) -> Optional[_YearFile]:
+        with self._lock:
+            if year not in self._year_files:
+                path = self.by_year_dir / f"{year}.csv"
+                self._year_files[year] = (
+                    _YearFile(path, self.index_dir) if path.exists() else None
+                )
+            return self._year_files[year]
+
+    def _read_by_year(
+        self, station_id: str, data_types: List[str], start, end
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """(dates, data type indexes, values) of a station from the by-year CSVs."""
+        wanted = np.array([t.encode("ascii") for t in data_types], dtype="S4")
+        parts = []
+        for year in range(start.year, end.year + 1):
+            year_file = self._year_file(year)
+            if year_file is None:
+                continue
+            starts = year_file.line_starts(station_id)
+            if not len(starts):
+                continue
+            buf = year_file.buf
+            elements = np.ascontiguousarray(_gather(buf, starts + 21, 4)).view("S4")
+            keep = np.isin(elements[:, 0], wanted)
+            starts, elements = starts[keep], elements[keep, 0]
+            day, _ = parse_int_fields(_gather(buf, starts + 12, 8))
+            fields = _gather(buf, starts + CSV_VALUE_AT, 7)
+            values, present = parse_int_fields(fields)
+            # Flags follow the value: ",M,Q,S" where each flag may be empty.
+            comma = np.argmax(fields == ord(","), axis=1)
+            m_flag = starts + CSV_VALUE_AT + comma + 1
+            q_flag = np.where(buf[m_flag] == ord(","), m_flag + 1, m_flag + 2)
+            if self.drop_flagged:
+                present &= buf[q_flag] == ord(",")
+            dates = _dates(day)
+            present &= (dates >= np.datetime64(start)) & (dates <= np.datetime64(end))
+            type_index = _type_index(wanted, elements)
+            parts.append((dates[present], type_index[present], values[present]))
+        if not parts:
+            return _empty_observations()
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    # Queries
+
+    def _observations(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str,
+        end: str,
+    ) -> Observations:
+        """(sorted station IDs, station codes, dates, data type indexes, values) of
+        every observation of the query."""
+        data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+        stations = [stations] if isinstance(stations, str) else stations
+        station_ids = sorted(set(stations))
+        start_d, end_d = parse_date(start), parse_date(end)
+
+        codes, dates, types, values = [], [], [], []
+        for code, station_id in enumerate(station_ids):
+            found = self._read_dly(station_id, data_types, start_d, end_d)
+            if found is None:
+                found = self._read_by_year(station_id, data_types, start_d, end_d)
+            codes.append(np.full(len(found[0]), code, dtype=np.int32))
+            dates.append(found[0])
+            types.append(found[1])
+            values.append(found[2])
+        if not station_ids:
+            return ([],) + _empty_observations(with_codes=True)
+        return (
+            station_ids,
+            np.concatenate(codes),
+            np.concatenate(dates),
+            np.concatenate(types),
+            np.concatenate(values),
+        )
+
+    @staticmethod
+    def _rows_index(codes: "np.ndarray", dates: "np.ndarray"):
+        """Distinct (station code, date) pairs in station then date order, and the
+        pair of every observation."""
+        days = dates.astype(np.int64)
+        keys = codes.astype(np.int64) << 32 | (days + (1 << 31))
+        unique, inverse = np.unique(keys, return_inverse=True)
+        row_codes = (unique >> 32).astype(np.int32)
+        row_dates = ((unique & 0xFFFFFFFF) - (1 << 31)).astype("datetime64[D]")
+        return row_codes, row_dates, inverse
+
+    def get_daily(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+    ) -> List[Dict]:
+        """Daily rows shaped like NceiAccessor.get_daily's: one dict per station and
+        day with DATE, STATION and the data types that have a value, ordered by station
+        then date.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest, defaults to "2024-04-21"
+        :param end: end date of period of interest, defaults to "2025-04-21"
+        :return: List of rows.
+        """
+        data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+        station_ids, codes, dates, types, values = self._observations(
+            data_types, stations, start, end
+        )
+        row_codes, row_dates, inverse = self._rows_index(codes, dates)
+        rows = [
+            {"DATE": day, "STATION": station_ids[code]}
+            for day, code in zip(row_dates.astype(str).tolist(), row_codes.tolist())
+        ]
+        for i, data_type in enumerate(data_types):
+            mask = types == i
+            for row, value in zip(inverse[mask].tolist(), values[mask].tolist()):
+                rows[row][data_type] = str(value)
+        return rows
+
+    def get_daily_columns(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+        scale: bool = True,
+    ) -> DailyColumns:
+        """Daily data as DailyColumns, built straight from the parsed arrays without
+        going through row dicts.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest, defaults to "2024-04-21"
+        :param end: end date of period of interest, defaults to "2025-04-21"
+        :param scale: Apply scale factors, eg. tenths of degrees C become degrees C, defaults to True
+        :return: DailyColumns object.
+        """  # pylint: disable=line-too-long
+        data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+        station_ids, codes, dates, types, values = self._observations(
+            data_types, stations, start, end
+        )
+        row_codes, row_dates, inverse = self._rows_index(codes, dates)
+        # Only stations with rows become categories, as in DailyColumns.from_rows.
+        used, row_codes = np.unique(row_codes, return_inverse=True)
+        columns = {}
+        units = {}
+        for i, data_type in enumerate(data_types):
+            column = np.full(len(row_dates), np.nan)
+            mask = types == i
+            column[inverse[mask]] = values[mask]
+            if scale and scale_for(data_type) != 1:
+                column *= scale_for(data_type)
+            columns[data_type] = column
+            units[data_type] = units_for(data_type) if scale else None
+        return DailyColumns(
+            row_dates,
+            row_codes.astype(np.int32),
+            np.array(station_ids, dtype=str)[used] if len(used) else np.array([], str),
+            columns,
+            units=units,
+        )
+
+
+def _empty_observations(with_codes: bool = False):
+    empty = (
+        np.zeros(0, dtype="datetime64[D]"),
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+    )
+    return (np.zeros(0, dtype=np.int32),) + empty if with_codes else empty
@@ -0,0 +1,84 @@
+"""
+JSON encoding and decoding with the fastest library installed: orjson, then msgspec,
+then the standard library. Install one with ``pip install ncei-access[fast]``.
+
+The library is picked on first use rather than at import, so ``import ncei_access``
+stays cheap. Set NCEI_ACCESS_JSON to "orjson", "msgspec" or "json" to force one.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+_lock = threading.Lock()
+_selected: Optional[Tuple[str, Callable[[bytes], Any], Callable[[Any], bytes]]] = None
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _load_backend(name: str):
+    """(name, loads, dumps) of a backend. Raises ImportError if it isn't installed."""
+    # pylint: disable=import-outside-toplevel
+    if name == "orjson":
+        import orjson
+
+        return name, orjson.loads, orjson.dumps
+    if name == "msgspec":
+        import msgspec
+
+        decoder = msgspec.json.Decoder()
+        encoder = msgspec.json.Encoder()
+
+        def loads(body: bytes) -> Any:
+            try:
+                return decoder.decode(body)
+            except msgspec.DecodeError as e:
+                # Callers catch ValueError, like json and orjson raise.
+                raise ValueError(str(e)) from e
+
+        return name, loads, encoder.encode
+    if name == "json":
+        return name, json.loads, _json_dumps
+    raise ValueError(f"Unknown JSON backend {name!r}, expected one of {BACKENDS}")
+
+
+def _backend():
+    global _selected  # pylint: disable=global-statement
+    if _selected is not None:
+        return _selected
+    with _lock:
+        if _selected is None:
+            forced = os.environ.get("NCEI_ACCESS_JSON")
+            if forced:
+                _selected = _load_backend(forced)
+            else:
+                for name in BACKENDS:
+                    try:
+                        _selected = _load_backend(name)
+                        break
+                    except ImportError:
+                        continue
+    return _selected
+
+
+def backend() -> str:
+    """Name of the JSON library in use."""
+    return _backend()[0]
+
+
+def loads(body: bytes) -> Any:
+    """Decode a JSON document from bytes (or str).
+
+    :raises ValueError: If body is not valid JSON.
+    """
+    return _backend()[1](body)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON bytes."""
+    return _backend()[2](obj)
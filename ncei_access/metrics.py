@@ -0,0 +1,303 @@
+"""
+Instrumentation for the REST adapters and NceiAccessor.
+
+Adapters and accessors take a list of listeners: callables that receive a
+RequestEvent for every request and a StageEvent for every timed processing stage.
+Metrics is a listener that aggregates events into counters and histograms and
+renders them in the Prometheus/OpenMetrics text format.
+
+.. code-block:: python
+
+    metrics = Metrics()
+    ncei_db = na.NceiAccessor(listeners=[metrics])
+    ...
+    print(metrics.to_openmetrics())
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)  # fmt: skip
+
+
+class RequestEvent:
+    """What happened to one call of RestAdapter.get or AsyncRestAdapter.get.
+
+    - endpoint: API endpoint, without surrounding slashes.
+    - key: Short hash of the endpoint and normalized parameters, see cache.request_key.
+    - status_code: HTTP status of the final response, None if there was none.
+    - elapsed: Seconds from the call to its return.
+    - connect: Seconds spent opening connections, when the adapter can tell, else None.
+    - ttfb: Seconds until the response headers of the last attempt arrived.
+    - download: Seconds reading the response body of the last attempt.
+    - decode: Seconds decoding the JSON body.
+    - bytes: Size of the response body, None if unknown.
+    - attempts: Number of HTTP attempts, 0 if served from the cache or coalesced.
+    - cache: "hit", "miss", or None if the adapter has no cache.
+    - coalesced: True if the call waited on an identical request instead of sending one.
+    - error: Error message if the call raised, else None.
+    """
+
+    __slots__ = (
+        "endpoint",
+        "key",
+        "status_code",
+        "elapsed",
+        "connect",
+        "ttfb",
+        "download",
+        "decode",
+        "bytes",
+        "attempts",
+        "cache",
+        "coalesced",
+        "error",
+    )
+
+    def __init__(self, endpoint: str, key: str):
+        self.endpoint = endpoint.strip("/")
+        self.key = key[:16]
+        self.status_code = None
+        self.elapsed = 0.0
+        self.connect = None
+        self.ttfb = None
+        self.download = None
+        self.decode = None
+        self.bytes = None
+        self.attempts = 0
+        self.cache = None
+        self.coalesced = False
+        self.error = None
+
+    @property
+    def retries(self) -> int:
+        """Number of attempts after the first."""
+        return max(0, self.attempts - 1)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RequestEvent({fields})"
+
+
+class StageEvent:
+    """Duration of a processing stage inside NceiAccessor, eg. merging chunked rows or
+    building Station objects.
+
+    - stage: Name of the stage.
+    - elapsed: Seconds the stage took.
+    - items: Number of items processed, if known.
+    """
+
+    __slots__ = ("stage", "elapsed", "items")
+
+    def __init__(self, stage: str, elapsed: float, items: int = None):
+        self.stage = stage
+        self.elapsed = elapsed
+        self.items = items
+
+    def __repr__(self) -> str:
+        return f"StageEvent(stage={self.stage!r}, elapsed={self.elapsed!r}, items={self.items!r})"  # pylint: disable=line-too-long
+
+
+Event = Union[RequestEvent, StageEvent]
+Listener = Callable[[Event], None]
+
+
+def emit(listeners: Sequence[Listener], event: Event):
+    """Send an event to every listener. A failing listener is logged and skipped so it
+    can't break the request that produced the event."""
+    for listener in listeners:
+        try:
+            listener(event)
+        except Exception:  # pylint: disable=broad-exception-caught
+            _logger.exception(f"Instrumentation listener {listener!r} failed")
+
+
+@contextmanager
+def stage(listeners: Sequence[Listener], name: str, items: int = None):
+    """Time the block and emit a StageEvent for it if there are listeners.
+
+    .. code-block:: python
+
+        with stage(self.listeners, "merge", len(parts)):
+            rows = merge_daily_rows(parts)
+    """
+    if not listeners:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        emit(listeners, StageEvent(name, time.perf_counter() - start, items))
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket upper bounds, as in Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, number of values <= bound) for every bucket and +Inf."""
+        total = 0
+        out = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1): the upper bound of the bucket it falls
+        in. None if the histogram is empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Metrics:
+    """Listener aggregating RequestEvents and StageEvents into counters and latency
+    histograms. Thread-safe, so one Metrics can be shared by every adapter and
+    accessor in a process.
+
+    Counters: requests (by endpoint and status), retries, cache hits and misses,
+    coalesced requests and bytes received, all by endpoint. Histograms: total, TTFB,
+    download and decode seconds by endpoint, and stage seconds by stage.
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = LATENCY_BUCKETS, prefix: str = "ncei"
+    ):
+        """
+        :param buckets: Upper bounds in seconds of the histogram buckets, defaults to LATENCY_BUCKETS
+        :param prefix: Prefix of the exported metric names, defaults to "ncei"
+        """  # pylint: disable=line-too-long
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+
+    def __call__(self, event: Event):
+        with self._lock:
+            if isinstance(event, RequestEvent):
+                self._on_request(event)
+            elif isinstance(event, StageEvent):
+                self._observe(
+                    "stage_seconds", _labels(stage=event.stage), event.elapsed
+                )
+
+    def _count(self, name: str, labels: Labels, value: float = 1):
+        series = self.counters.setdefault(name, {})
+        series[labels] = series.get(labels, 0) + value
+
+    def _observe(self, name: str, labels: Labels, value: float):
+        series = self.histograms.setdefault(name, {})
+        if labels not in series:
+            series[labels] = Histogram(self.buckets)
+        series[labels].observe(value)
+
+    def _on_request(self, event: RequestEvent):
+        endpoint = _labels(endpoint=event.endpoint)
+        status = "error" if event.status_code is None else event.status_code
+        self._count("requests", _labels(endpoint=event.endpoint, status=status))
+        if event.retries:
+            self._count("retries", endpoint, event.retries)
+        if event.cache == "hit":
+            self._count("cache_hits", endpoint)
+        elif event.cache == "miss":
+            self._count("cache_misses", endpoint)
+        if event.coalesced:
+            self._count("coalesced", endpoint)
+        if event.bytes:
+            self._count("received_bytes", endpoint, event.bytes)
+        self._observe("request_seconds", endpoint, event.elapsed)
+        for name in ("ttfb", "download", "decode"):
+            value = getattr(event, name)
+            if value is not None:
+                self._observe(f"{name}_seconds", endpoint, value)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        """Histogram of one series, eg. metrics.histogram("request_seconds",
+        endpoint="data/v1"), or None if nothing was recorded."""
+        return self.histograms.get(name, {}).get(_labels(**labels))
+
+    def counter(self, name: str, **labels) -> float:
+        """Value of one counter series, eg. metrics.counter("cache_hits",
+        endpoint="data/v1")."""
+        return self.counters.get(name, {}).get(_labels(**labels), 0)
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_openmetrics(self) -> str:
+        """Every series in the OpenMetrics text format, which Prometheus can scrape."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}_total{_format_labels(labels)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                full = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {full} histogram")
+                lines.append(f"# UNIT {full} seconds")
+                for labels, hist in sorted(series.items()):
+                    for bound, total in hist.cumulative():
+                        le = f'le="{_format_bound(bound)}"'
+                        lines.append(
+                            f"{full}_bucket{_format_labels(labels, le)} {total}"
+                        )
+                    lines.append(f"{full}_count{_format_labels(labels)} {hist.count}")
+                    lines.append(f"{full}_sum{_format_labels(labels)} {hist.sum}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
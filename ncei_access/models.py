@@ -2,8 +2,9 @@
 Classes that organize the outputs of functions into defined objects.
 """
 
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from datetime import datetime
+from functools import lru_cache
 from math import radians, sin, cos, sqrt, atan2
 
 
@@ -21,10 +22,68 @@ class Result:
         self.data = data if data else []
 
 
+class Coverage:
+    """Period of record of one data type at a station, parsed once from the station's
+    dataTypes entry.
+
+    - start: datetime of the first record, or None if unknown.
+    - end: datetime of the last record, or None if unknown.
+    - coverage: percent of days with records over the period, or None if unknown.
+    """
+
+    __slots__ = ("start", "end", "coverage")
+
+    def __init__(
+        self, start: datetime = None, end: datetime = None, coverage: float = None
+    ):
+        self.start = start
+        self.end = end
+        self.coverage = coverage
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Coverage":
+        """Parse a dataTypes entry of the "search/v1/data" endpoint."""
+        start, end = d.get("startDate"), d.get("endDate")
+        return cls(
+            start=datetime.fromisoformat(start) if start else None,
+            end=datetime.fromisoformat(end) if end else None,
+            coverage=d.get("coverage"),
+        )
+
+    def covers(
+        self,
+        start_dt: datetime = None,
+        end_dt: datetime = None,
+        min_coverage: float = None,
+    ) -> bool:
+        """True if the period of record begins on or before start_dt, ends on or after
+        end_dt and has at least min_coverage percent coverage. Checks with None are
+        skipped."""
+        if start_dt and (self.start is None or start_dt < self.start):
+            return False
+        if end_dt and (self.end is None or end_dt > self.end):
+            return False
+        if min_coverage is not None and (
+            self.coverage is None or self.coverage < min_coverage
+        ):
+            return False
+        return True
+
+
+@lru_cache(maxsize=1024)
+def parse_query_date(value: str) -> datetime:
+    """Parse a date given to a filter. Cached, since the same few dates are checked
+    against every station in a search."""
+    return datetime.fromisoformat(value.upper())
+
+
 class Station:
     """Class representing a weather station with all the details. It's the returned
     object from the find_station function"""
 
+    # Slots keep large catalogs of stations small in memory.
+    __slots__ = ("name", "station_id", "lat", "lon", "_data_types", "_coverage")
+
     def __init__(
         self,
         name: str = "",
@@ -46,6 +105,26 @@ class Station:
         self.lon = lon
         self.data_types = data_types
 
+    @property
+    def data_types(self) -> list:
+        """dataTypes entries of the station as returned by the search endpoint."""
+        return self._data_types
+
+    @data_types.setter
+    def data_types(self, value: list):
+        self._data_types = value
+        self._coverage = None
+
+    @property
+    def coverage(self) -> Dict[str, Coverage]:
+        """Period of record of each data type at the station, keyed by data type ID.
+        Built from data_types on first use."""
+        if self._coverage is None:
+            self._coverage = {
+                d["id"]: Coverage.from_dict(d) for d in (self._data_types or [])
+            }
+        return self._coverage
+
     def has_data_type(
         self, data_type: str, start_date: str = None, end_date: str = None
     ) -> bool:
@@ -58,24 +137,15 @@ class Station:
         :param end_date: data_type records should end on or after end_date, defaults to None
         :return: boolean
         """  # pylint: disable=line-too-long
-        type_dict = next((d for d in self.data_types if d["id"] == data_type), None)
+        type_coverage = self.coverage.get(data_type)
 
-        if not type_dict:
+        if not type_coverage:
             return False
 
-        if start_date:
-            start_dt = datetime.fromisoformat(start_date.upper())
-            type_start = datetime.fromisoformat(type_dict["startDate"])
-            if start_dt < type_start:
-                return False
-
-        if end_date:
-            end_dt = datetime.fromisoformat(end_date.upper())
-            type_end = datetime.fromisoformat(type_dict["endDate"])
-            if end_dt > type_end:
-                return False
-
-        return True
+        return type_coverage.covers(
+            parse_query_date(start_date) if start_date else None,
+            parse_query_date(end_date) if end_date else None,
+        )
 
     def distance_to(self, lat: float, lon: float) -> float:
         """Calculate distance to provided coordinates from station using the haversine
@@ -102,36 +172,78 @@ class Station:
         self,
         start_date: str = None,
         end_date: str = None,
+        service: "ElevationService" = None,
     ) -> float:
         """Return the elevation of the station in meters. If start and/or end dates are
         provided, return the elevations if it's recorded during that period. If no dates are
-        provided, return the most recent elevation record. This is actually kindof a hack
-        because the NCEI API doesn't seem to include station elevation in the station
-        metadata but it *is* recorded as a daily data type. So we just get the daily
-        elevation data and return the most-ish recent record or all records if dates are
-        provided.
-
-        :param start_date: Optional start date to check for elevation records, defaults to '2015-01-01'
-        :param end_date: Optional end date to check for elevation records, defaults to '2025-01-01'
-        :return: Elevation in meters.
+        provided, return the most recent elevation record. The NCEI API doesn't include
+        station elevation in the station metadata but it *is* recorded as a daily data
+        type, so the elevation is looked up by an ElevationService, which requests a short
+        window of daily elevation data and remembers the result on disk.
+
+        :param start_date: Optional start date to check for elevation records, defaults to '2015-01-01' if only end_date is provided
+        :param end_date: Optional end date to check for elevation records, defaults to '2025-01-01' if only start_date is provided
+        :param service: (optional) ElevationService to use, eg. one sharing your NceiAccessor. Defaults to ncei_access.elevation.default_elevation_service()
+        :return: Elevation in meters, or None if the station has no elevation record.
         """  # pylint: disable=line-too-long
 
         # Importing here to avoid circular import issues
-        from ncei_access import ncei_accessor as na
+        from ncei_access.elevation import default_elevation_service
 
-        ncei_db = na.NceiAccessor()
-
-        elevation_data = ncei_db.get_daily(
-            data_types="ELEVATION",
-            stations=self.station_id,
-            start=start_date if start_date else "2015-01-01",
-            end=end_date if end_date else "2025-01-01",
-        )
+        service = service or default_elevation_service()
 
         if start_date or end_date:
+            elevation_data = service.accessor.get_daily(
+                data_types="ELEVATION",
+                stations=self.station_id,
+                start=start_date if start_date else "2015-01-01",
+                end=end_date if end_date else "2025-01-01",
+            )
             return [
                 {"DATE": x.get("DATE"), "ELEVATION": float(x.get("ELEVATION"))}
                 for x in elevation_data
             ]
 
-        return float(elevation_data[-1].get("ELEVATION"))
+        return service.get(self)
+
+
+def filter_stations(
+    stations: Iterable[Station],
+    data_types: List[str],
+    start_date: str = None,
+    end_date: str = None,
+    min_coverage: float = None,
+) -> List[Station]:
+    """Stations that record every one of data_types over the whole period, eg. every
+    station with TMAX and SNWD covering 1990-2020 with at least 95% coverage:
+
+    .. code-block:: python
+
+        filter_stations(stations, ["TMAX", "SNWD"], "1990-01-01", "2020-12-31", 95)
+
+    The dates are parsed once for the whole list and each station's coverage index is
+    reused, so nothing is re-parsed per station.
+
+    :param stations: Stations to filter.
+    :param data_types: Data type IDs that must all be recorded. A single string is allowed.
+    :param start_date: records should begin on or before start_date, defaults to None
+    :param end_date: records should end on or after end_date, defaults to None
+    :param min_coverage: minimum coverage percent of each data type, defaults to None
+    :return: List of the stations that qualify, in their original order.
+    """  # pylint: disable=line-too-long
+    if isinstance(data_types, str):
+        data_types = [data_types]
+    start_dt = parse_query_date(start_date) if start_date else None
+    end_dt = parse_query_date(end_date) if end_date else None
+
+    def qualifies(station: Station) -> bool:
+        coverage = station.coverage
+        for data_type in data_types:
+            type_coverage = coverage.get(data_type)
+            if not type_coverage or not type_coverage.covers(
+                start_dt, end_dt, min_coverage
+            ):
+                return False
+        return True
+
+    return [station for station in stations if qualifies(station)]
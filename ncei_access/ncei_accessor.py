@@ -5,20 +5,217 @@ Main class for accessing NCEI Access API.
 """
 
 import logging
-from typing import Union, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ncei_access.chunking import batch_stations, merge_daily_rows, split_date_range
+from ncei_access.exceptions import NceiAccessException
+from ncei_access.metrics import stage
 from ncei_access.rest_adapter import RestAdapter
+from ncei_access.models import Result, Station, filter_stations
 
-# from ncei_access.exceptions import NceiAccessException
-from ncei_access.models import Result, Station
+
+def daily_params(
+    data_types: Union[str, List[str]],
+    stations: Union[str, List[str]],
+    start: str,
+    end: str,
+) -> Dict:
+    """Query parameters for daily data from the "data/v1" endpoint."""
+    return {
+        "dataset": "daily-summaries",
+        "dataTypes": [data_types] if isinstance(data_types, str) else data_types,
+        "stations": [stations] if isinstance(stations, str) else stations,
+        "startDate": start,
+        "endDate": end,
+    }
+
+
+# Most results the "search/v1/data" endpoint returns for one request.
+SEARCH_LIMIT = 1000
+
+Bounds = Tuple[float, float, float, float]
+
+
+def boundary_params(
+    north: float,
+    west: float,
+    south: float,
+    east: float,
+    start: str = None,
+    end: str = None,
+) -> Dict:
+    """Query parameters for stations in a bounding box from the "search/v1/data"
+    endpoint, with data between start and end, or in the last 100 days by default."""
+    if start is None:
+        start = (datetime.now() - timedelta(days=100)).strftime("%Y-%m-%d")
+    params = {
+        "dataset": "daily-summaries",
+        "startDate": start,
+        "bbox": f"{north},{west},{south},{east}",
+        "limit": SEARCH_LIMIT,
+    }
+    if end is not None:
+        params["endDate"] = end
+    return params
+
+
+def split_bounds(north: float, west: float, south: float, east: float) -> List[Bounds]:
+    """The four quadrants of a (north, west, south, east) box: NW, NE, SW, SE. Stations
+    on a shared edge can fall in two quadrants."""
+    mid_lat = (north + south) / 2
+    mid_lon = (west + east) / 2
+    return [
+        (north, west, mid_lat, mid_lon),
+        (north, mid_lon, mid_lat, east),
+        (mid_lat, west, south, mid_lon),
+        (mid_lat, mid_lon, south, east),
+    ]
+
+
+def collect_search_results(
+    results_by_id: Dict[str, Dict], tiles: List[Bounds], found: List[list]
+) -> List[Bounds]:
+    """Add the station search results of each tile to results_by_id, deduplicated by
+    station ID.
+
+    :return: The tiles whose results hit SEARCH_LIMIT and so may be missing stations.
+    """
+    truncated = []
+    for tile, tile_results in zip(tiles, found):
+        for r in tile_results:
+            if r.get("stations"):
+                results_by_id.setdefault(r["stations"][0]["id"], r)
+        if len(tile_results) >= SEARCH_LIMIT:
+            truncated.append(tile)
+    return truncated
+
+
+def station_params(station_id: str) -> Dict:
+    """Query parameters for a single station from the "search/v1/data" endpoint."""
+    return {
+        "dataset": "daily-summaries",
+        "stations": station_id,
+        "limit": 1,
+    }
+
+
+def station_from_result(result: Dict) -> Station:
+    """Build a Station from one entry of the "search/v1/data" endpoint results."""
+    return Station(
+        name=result["stations"][0]["name"],
+        station_id=result["stations"][0]["id"],
+        lat=result["location"]["coordinates"][1],
+        lon=result["location"]["coordinates"][0],
+        data_types=result["stations"][0]["dataTypes"],
+    )
+
+
+def closest_station(
+    stations: List[Station],
+    lat: float,
+    lon: float,
+    data_type: str = "",
+    start_date: str = "",
+    end_date: str = "",
+) -> Optional[Station]:
+    """Closest of the stations to the coordinates, only considering stations that record
+    data_type over the dates if data_type is provided.
+
+    :return: Closest station or None if no station qualifies.
+    """
+    # Only keep stations with data type of interest, if provided.
+    if data_type:
+        stations = filter_stations(stations, [data_type], start_date, end_date)
+    if not stations:
+        return None
+    return min(stations, key=lambda s: s.distance_to(lat, lon))
 
 
 class NceiAccessor:
     """High level class to interact with NCEI Access API."""
 
-    def __init__(self, logger: logging.Logger = None):
-        self._rest_adapter = RestAdapter(logger=logger)
+    def __init__(
+        self,
+        logger: logging.Logger = None,
+        rest_adapter: RestAdapter = None,
+        max_workers: int = 4,
+        catalog: "StationCatalog" = None,
+        listeners: List[Callable] = None,
+        backend: "GhcndMirror" = None,
+    ):
+        """
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        :param rest_adapter: (optional) Configured RestAdapter to use, eg. to tune the connection pool and retries or to share one pool between accessors. Defaults to None
+        :param max_workers: Number of threads used to fetch the pieces of a split request in parallel. A RestAdapter created here keeps at least this many connections alive. Defaults to 4
+        :param catalog: (optional) StationCatalog used to answer find_closest_station locally instead of searching NCEI. Defaults to None
+        :param listeners: (optional) Callables receiving a ncei_access.metrics.StageEvent for each timed processing stage ("merge", "stations", "columnar"), eg. a Metrics object. Also passed to the RestAdapter if one is created here. Defaults to None
+        :param backend: (optional) Local data source answering get_daily, get_daily_columns and find_station instead of the NCEI API, eg. a ncei_access.ghcnd.GhcndMirror. It needs get_daily(data_types, stations, start, end) and find_station(station_id) methods, and may have get_daily_columns(data_types, stations, start, end, scale). Defaults to None
+        """  # pylint: disable=line-too-long
+        self.listeners = list(listeners or [])
+        # The pool keeps a connection alive for every worker thread.
+        self._rest_adapter = rest_adapter or RestAdapter(
+            logger=logger,
+            listeners=self.listeners,
+            pool_maxsize=max(10, max_workers),
+        )
         self._logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.catalog = catalog
+        self.backend = backend
+
+    def get_many(
+        self,
+        param_list: List[Dict],
+        retries: int = 2,
+        endpoint: str = "data/v1/",
+        progress: Callable[[int, int], None] = None,
+    ) -> List[list]:
+        """Fetch several requests in parallel on a thread pool. A request that fails is
+        retried up to `retries` more times on its own, without refetching the others.
+
+        :param param_list: Query parameters for each request, eg. from daily_params.
+        :param retries: Number of extra rounds for failed requests, defaults to 2
+        :param endpoint: API endpoint, defaults to "data/v1/"
+        :param progress: (optional) Called as progress(done, total) each time a request completes. Defaults to None
+        :raises NceiAccessException: If a request still fails after all retries.
+        :return: Result data of each request, in the order of param_list.
+        """  # pylint: disable=line-too-long
+        done = 0
+        results = [None] * len(param_list)
+        pending = list(range(len(param_list)))
+        workers = max(1, min(self.max_workers, len(param_list)))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for attempt in range(retries + 1):
+                futures = {
+                    executor.submit(
+                        self._rest_adapter.get,
+                        endpoint=endpoint,
+                        ep_params=dict(param_list[i]),
+                    ): i
+                    for i in pending
+                }
+                failed = []
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        results[i] = future.result().data
+                        done += 1
+                        if progress:
+                            progress(done, len(param_list))
+                    except NceiAccessException as e:
+                        self._logger.warning(
+                            f"Request {i + 1}/{len(param_list)} failed on attempt {attempt + 1}: {e}"  # pylint: disable=line-too-long
+                        )
+                        failed.append(i)
+                if not failed:
+                    return results
+                pending = sorted(failed)
+
+        raise NceiAccessException(
+            f"{len(pending)} of {len(param_list)} requests failed after {retries + 1} attempts"  # pylint: disable=line-too-long
+        )
 
     def get_daily(
         self,
@@ -26,26 +223,213 @@ class NceiAccessor:
         stations: Union[str, List[str]],
         start: str = "2024-04-21",
         end: str = "2025-04-21",
+        chunk: Union[str, int] = None,
+        chunk_retries: int = 2,
+        station_batch_size: int = None,
+        progress: Callable[[int, int], None] = None,
+        prune: bool = False,
     ) -> Result:
         """Obtain daily data from user specified stations (or just a single station)
         over the specified period of interest.
 
+        Long periods can be split into chunks and long station lists into batches.
+        The pieces are fetched in parallel (see max_workers) and stitched back
+        together in station and date order. A piece that fails is retried on its own.
+        Station lists too long for one URL are always split. With a backend, the
+        query is answered by the backend in one go and the splitting options are
+        ignored.
+
+        With prune, requests are planned from the stations' periods of record by
+        ncei_access.planner.plan_daily: each station is only asked for the data types
+        and days it has records for, and stations with similar records share requests.
+
         :param data_types: data type(s) of interest. Can be a single string or a list of strings. See ncei_access.dataType_ref for available data types.
         :param stations: station id. Obtained from find_station function.
         :param start: beginning date of period of interest. See NCEI Access documentation for string format, defaults to "2024-04-21"
         :param end: end date of period of interest. See NCEI Access documentation for string format, defaults to "2025-04-21"
+        :param chunk: (optional) split the period into "month", "year" or "decade" chunks, or chunks of this many days. Defaults to None, a single request
+        :param chunk_retries: Number of times a failed chunk or batch is retried, defaults to 2
+        :param station_batch_size: (optional) Maximum number of stations per request, to bound the size of each response. Defaults to None
+        :param progress: (optional) Called as progress(done, total) each time a chunk or batch completes. Defaults to None
+        :param prune: Skip data types and days the stations have no records for. Stations can then also be Station objects; station IDs are looked up in the accessor's catalog. Defaults to False
         :return: Daily highs and lows from station requested.
         """ # pylint: disable=line-too-long
-        params = {
-            "dataset": "daily-summaries",
-            "dataTypes": [data_types] if isinstance(data_types, str) else data_types,
-            "stations": [stations] if isinstance(stations, str) else stations,
-            "startDate": start,
-            "endDate": end,
-        }
-        temps = self._rest_adapter.get(ep_params=params)
+        if prune:
+            return self._get_daily_planned(
+                data_types,
+                stations,
+                start,
+                end,
+                chunk=chunk,
+                chunk_retries=chunk_retries,
+                station_batch_size=station_batch_size,
+                progress=progress,
+            )
+
+        if self.backend is not None:
+            return self.backend.get_daily(data_types, stations, start, end)
+
+        batches = batch_stations(stations, batch_size=station_batch_size)
+
+        if chunk is None and len(batches) <= 1:
+            params = daily_params(data_types, stations, start, end)
+            temps = self._rest_adapter.get(ep_params=params)
+
+            return temps.data
+
+        date_ranges = [(start, end)]
+        if chunk is not None:
+            date_ranges = split_date_range(start, end, chunk)
+        param_list = [
+            daily_params(data_types, batch, chunk_start, chunk_end)
+            for batch in batches
+            for chunk_start, chunk_end in date_ranges
+        ]
+        self._logger.debug(
+            f"Fetching {len(batches)} station batches over {len(date_ranges)} date chunks."  # pylint: disable=line-too-long
+        )
+        parts = self.get_many(param_list, retries=chunk_retries, progress=progress)
+
+        with stage(self.listeners, "merge", sum(map(len, parts))):
+            return merge_daily_rows(parts)
+
+    def _get_daily_planned(
+        self,
+        data_types: Union[str, List[str]],
+        stations: List[Union[str, Station]],
+        start: str,
+        end: str,
+        chunk: Union[str, int] = None,
+        chunk_retries: int = 2,
+        station_batch_size: int = None,
+        progress: Callable[[int, int], None] = None,
+    ) -> List[Dict]:
+        # Importing here to avoid circular import issues
+        from ncei_access.planner import plan_daily
+
+        plan = plan_daily(
+            data_types,
+            stations,
+            start,
+            end,
+            catalog=self.catalog,
+            chunk=chunk,
+            station_batch_size=station_batch_size,
+        )
+        if self.backend is not None:
+            return merge_daily_rows(
+                self.backend.get_daily(r.data_types, r.stations, r.start, r.end)
+                for r in plan
+            )
+        if not plan.requests:
+            return []
+        parts = self.get_many(plan.params(), retries=chunk_retries, progress=progress)
+
+        with stage(self.listeners, "merge", sum(map(len, parts))):
+            return merge_daily_rows(parts)
+
+    def iter_daily(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+        batch_size: int = None,
+        chunk: Union[str, int] = None,
+        station_batch_size: int = None,
+    ) -> Iterator[Union[Dict, List[Dict]]]:
+        """Stream daily data instead of returning it all at once. Rows are parsed from
+        the CSV response as it downloads and yielded straight away, so memory stays flat
+        however long the period or station list. Date chunks and station batches are
+        requested one after the other, in order.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest, defaults to "2024-04-21"
+        :param end: end date of period of interest, defaults to "2025-04-21"
+        :param batch_size: (optional) yield lists of up to this many rows instead of single rows. Defaults to None
+        :param chunk: (optional) split the period into chunks, see get_daily. Defaults to None
+        :param station_batch_size: (optional) maximum number of stations per request, see get_daily. Defaults to None
+        :return: Iterator of rows shaped like get_daily's, or of lists of rows.
+        """  # pylint: disable=line-too-long
+        date_ranges = [(start, end)]
+        if chunk is not None:
+            date_ranges = split_date_range(start, end, chunk)
+
+        batch = []
+        for station_batch in batch_stations(stations, batch_size=station_batch_size):
+            for chunk_start, chunk_end in date_ranges:
+                params = daily_params(data_types, station_batch, chunk_start, chunk_end)
+                for row in self._rest_adapter.iter_csv(ep_params=params):
+                    if batch_size is None:
+                        yield row
+                        continue
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+        if batch:
+            yield batch
+
+    def get_daily_columns(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+        scale: bool = True,
+        **kwargs,
+    ) -> "DailyColumns":
+        """Obtain daily data like get_daily, but as typed columns: datetime64 dates, a
+        categorical station column and one float64 array per data type, scaled into
+        metric output units using ncei_access.dataType_ref. Needs numpy.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest, defaults to "2024-04-21"
+        :param end: end date of period of interest, defaults to "2025-04-21"
+        :param scale: Apply scale factors, eg. tenths of degrees C become degrees C, defaults to True
+        :param kwargs: Passed on to get_daily, eg. chunk or station_batch_size.
+        :return: DailyColumns object, see ncei_access.columnar.
+        """  # pylint: disable=line-too-long
+        if hasattr(self.backend, "get_daily_columns"):
+            with stage(self.listeners, "columnar"):
+                return self.backend.get_daily_columns(
+                    data_types, stations, start, end, scale=scale
+                )
+
+        # Importing here so numpy is only needed for columnar output
+        from ncei_access.columnar import DailyColumns
+
+        rows = self.get_daily(data_types, stations, start, end, **kwargs)
+        with stage(self.listeners, "columnar", len(rows)):
+            return DailyColumns.from_rows(rows, data_types, scale=scale)
+
+    def export_daily(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str,
+        end: str,
+        path: str,
+        **kwargs,
+    ) -> Dict[str, int]:
+        """Fetch daily data straight into Parquet files partitioned by station and
+        year, with bounded memory, resuming an interrupted export when run again.
+        Needs numpy and pyarrow. See ncei_access.export.export_daily.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest.
+        :param end: end date of period of interest.
+        :param path: Directory of the export.
+        :param kwargs: Passed on to ncei_access.export.export_daily, eg. station_batch_size or row_group_size.
+        :return: Counts of rows and files written and of station years skipped.
+        """  # pylint: disable=line-too-long
+        # Importing here so pyarrow is only needed for exports
+        from ncei_access.export import export_daily
 
-        return temps.data
+        return export_daily(self, data_types, stations, start, end, path, **kwargs)
 
     def get_daily_hilow(
         self, stations, start: str = "2024-04-21", end: str = "2025-04-21"
@@ -78,6 +462,8 @@ class NceiAccessor:
         :param end_date: Optional end date to filter stations by.
         :return: Station object containing name, station_id, lat, lon.
         """
+        if self.catalog is not None:
+            return self.catalog.closest(lat, lon, data_type, start_date, end_date)
 
         area_width = 0.5
         attempt = 0
@@ -96,78 +482,158 @@ class NceiAccessor:
                 east=lon + area_width,
             )
 
-            # Only keep stations with data type of interest, if provided.
-            if data_type:
-                stations = [
-                    station
-                    for station in stations
-                    if station.has_data_type(data_type, start_date, end_date)
-                ]
-            self._logger.debug(
-                msg=f"Found {len(stations)} stations within bounds: {area_width} degrees around lat={lat}, lon={lon}."  # pylint: disable=line-too-long
+            closest = closest_station(
+                stations, lat, lon, data_type, start_date, end_date
             )
             # If no stations found, increase area width and try again.
-            if not stations:
+            if closest is None:
                 self._logger.debug(
                     msg=f"No stations found within bounds: {area_width} degrees around lat={lat}, lon={lon}. "  # pylint: disable=line-too-long
                     f"Increasing area width to {area_width * 1.5}."
                 )
                 area_width = area_width * 1.5
                 continue
-            # If stations found, sort by distance and return closest.
-            else:
-                self._logger.debug(
-                    msg=f"Found {len(stations)} stations within bounds: {area_width} degrees around lat={lat}, lon={lon}. "  # pylint: disable=line-too-long
-                    f"Returning closest station."
-                )
-                # Sort stations by distance to provided coordinates.
-                stations.sort(key=lambda s: s.distance_to(lat, lon))
-                return stations[0]
+            # If stations found, return closest.
+            self._logger.debug(
+                msg=f"Found stations within bounds: {area_width} degrees around lat={lat}, lon={lon}. "  # pylint: disable=line-too-long
+                f"Returning closest station."
+            )
+            return closest
         # If no stations found after 10 attempts, return None.
         self._logger.error(msg="No stations found within bounds after 10 attempts.")
         return None
 
-    def stations_in_boundary(
-        self, north: float, west: float, south: float, east: float
-    ) -> list:
-        """Find all stations within bounds that have at least some data within the last
-        100 days.
+    def find_closest_stations(
+        self,
+        points: List[Tuple[float, float]],
+        data_type: str = "",
+        start_date: str = "",
+        end_date: str = "",
+        **kwargs,
+    ) -> List[Optional[Station]]:
+        """Find the closest station to each of many points. Nearby points share bounding
+        box searches, which run in parallel, and all points are resolved in one
+        vectorized pass. Needs numpy. See ncei_access.nearest.find_closest_stations.
 
-        :param lat_N: _description_
-        :param lon_W: _description_
-        :param lat_S: _description_
-        :param lat_E: _description_
-        :return: list of stations
+        :param points: (lat, lon) pairs in decimal format.
+        :param data_type: Optional data type to filter stations by.
+        :param start_date: Optional start date to filter stations by.
+        :param end_date: Optional end date to filter stations by.
+        :param kwargs: Passed on to ncei_access.nearest.find_closest_stations, eg. cell.
+        :return: Closest Station for each point, or None where none was found.
         """
+        if self.catalog is not None:
+            return [
+                self.catalog.closest(lat, lon, data_type, start_date, end_date)
+                for lat, lon in points
+            ]
 
-        recently = datetime.now() - timedelta(days=100)
-        params = {
-            "dataset": "daily-summaries",
-            "startDate": recently.strftime("%Y-%m-%d"),
-            "bbox": f"{north},{west},{south},{east}",
-            "limit": 1000,
-        }
+        # Importing here so numpy is only needed for batch lookups
+        from ncei_access.nearest import find_closest_stations
 
-        station_results = self._rest_adapter.get(
-            endpoint="search/v1/data", ep_params=params
+        return find_closest_stations(
+            self, points, data_type, start_date, end_date, **kwargs
         )
-        station_results = station_results.data
 
-        stations = []
-
-        # Assuming we're getting something back here.
-        for station in station_results:
-            stations.append(
-                Station(
-                    name=station["stations"][0]["name"],
-                    station_id=station["stations"][0]["id"],
-                    lat=station["location"]["coordinates"][1],
-                    lon=station["location"]["coordinates"][0],
-                    data_types=station["stations"][0]["dataTypes"],
+    def _search_boundary(
+        self,
+        north: float,
+        west: float,
+        south: float,
+        east: float,
+        max_depth: int,
+        start: str = None,
+        end: str = None,
+    ) -> List[Dict]:
+        """Station search results in the bounds, see search_tiles."""
+        tiles = [(north, west, south, east)]
+        return list(self.search_tiles(tiles, max_depth, start=start, end=end).values())
+
+    def search_tiles(
+        self,
+        tiles: List[Bounds],
+        max_depth: int,
+        results_by_id: Dict[str, Dict] = None,
+        start: str = None,
+        end: str = None,
+    ) -> Dict[str, Dict]:
+        """Station search results in several bounds, added to results_by_id. A search
+        that hits SEARCH_LIMIT is split into quadrant tiles, recursively, and each level
+        of several tiles is fetched in parallel. A single tile is fetched on the calling
+        thread. Failed searches are only retried by the RestAdapter. Stations need data
+        between start and end, see boundary_params.
+
+        :return: results_by_id, search results keyed by station ID.
+        """
+        results_by_id = {} if results_by_id is None else results_by_id
+        for depth in range(max_depth + 1):
+            param_list = [
+                boundary_params(*tile, start=start, end=end) for tile in tiles
+            ]
+            if len(param_list) == 1:
+                found = [
+                    self._rest_adapter.get(
+                        endpoint="search/v1/data", ep_params=param_list[0]
+                    ).data
+                ]
+            else:
+                found = self.get_many(
+                    param_list, retries=0, endpoint="search/v1/data"
+                )
+            truncated = collect_search_results(results_by_id, tiles, found)
+            if not truncated:
+                break
+            if depth == max_depth:
+                self._logger.warning(
+                    f"{len(truncated)} tiles still have {SEARCH_LIMIT} stations after splitting {max_depth} times, some stations may be missing."  # pylint: disable=line-too-long
                 )
+                break
+            self._logger.debug(
+                f"Splitting {len(truncated)} truncated tiles into quadrants."
             )
+            tiles = [quadrant for tile in truncated for quadrant in split_bounds(*tile)]
+        return results_by_id
 
-        return stations
+    def stations_in_boundary(
+        self,
+        north: float,
+        west: float,
+        south: float,
+        east: float,
+        as_collection: bool = False,
+        max_depth: int = 8,
+        start: str = None,
+        end: str = None,
+    ) -> list:
+        """Find all stations within bounds that have at least some data within the last
+        100 days, or between start and end when given. The API returns at most
+        SEARCH_LIMIT stations per search, so when a search is full the box is split
+        into quadrants, recursively, until every tile fits. Tiles are searched in
+        parallel and stations are deduplicated by ID.
+
+        :param north: Northern latitude of the bounding box.
+        :param west: Western longitude of the bounding box.
+        :param south: Southern latitude of the bounding box.
+        :param east: Eastern longitude of the bounding box.
+        :param as_collection: Return an array backed StationCollection instead of a list, needs numpy, defaults to False
+        :param max_depth: Maximum number of times a box is split, defaults to 8
+        :param start: (optional) Only find stations with data on or after this date. Defaults to None, 100 days ago
+        :param end: (optional) Only find stations with data on or before this date. Defaults to None
+        :return: list of stations
+        """  # pylint: disable=line-too-long
+
+        station_results = self._search_boundary(
+            north, west, south, east, max_depth, start, end
+        )
+
+        with stage(self.listeners, "stations", len(station_results)):
+            if as_collection:
+                # Importing here so numpy is only needed for collections
+                from ncei_access.collection import StationCollection
+
+                return StationCollection.from_search_results(station_results)
+
+            return [station_from_result(r) for r in station_results]
 
     def find_station(self, station_id: str) -> Station:
         """Get a station by its ID.
@@ -175,11 +641,13 @@ class NceiAccessor:
         :param station_id: NCEI/NOAA? ID for station
         :return: Station object with name, station_id, lat, lon, and data_types.
         """
-        params = {
-            "dataset": "daily-summaries",
-            "stations": station_id,
-            "limit": 1,
-        }
+        if self.backend is not None:
+            station = self.backend.find_station(station_id)
+            if station is None:
+                self._logger.error(f"No station found with ID {station_id}.")
+            return station
+
+        params = station_params(station_id)
 
         station_results = self._rest_adapter.get(
             endpoint="search/v1/data", ep_params=params
@@ -190,10 +658,4 @@ class NceiAccessor:
             self._logger.error(f"No station found with ID {station_id}.")
             return None
 
-        return Station(
-            name=station_results[0]["stations"][0]["name"],
-            station_id=station_results[0]["stations"][0]["id"],
-            lat=station_results[0]["location"]["coordinates"][1],
-            lon=station_results[0]["location"]["coordinates"][0],
-            data_types=station_results[0]["stations"][0]["dataTypes"],
-        )
+        return station_from_result(station_results[0])
@@ -0,0 +1,151 @@
+"""
+Batch nearest-station resolution for many points. Needs the optional numpy dependency
+(``pip install ncei-access[columnar]``).
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the extra
+    np = None
+
+from ncei_access.collection import StationCollection
+from ncei_access.models import Station
+from ncei_access.ncei_accessor import station_from_result
+
+KM_PER_DEGREE = 111.19
+# Points are resolved against the station table this many at a time, which bounds the
+# size of the point x station distance matrix.
+POINT_BLOCK = 1024
+
+
+def cluster_points(
+    lats: "np.ndarray", lons: "np.ndarray", cell: float
+) -> Dict[Tuple[int, int], "np.ndarray"]:
+    """Group points by the grid cell of size cell degrees they fall in.
+
+    :return: Dict of cell -> indexes of the points in it.
+    """
+    keys = np.floor(np.stack((lats, lons), axis=1) / cell).astype(np.int64)
+    cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse, minlength=len(cells)))[:-1]
+    return {
+        (int(c[0]), int(c[1])): idx
+        for c, idx in zip(cells, np.split(order, splits))
+    }
+
+
+def guaranteed_radius(
+    lats: "np.ndarray", lons: "np.ndarray", box: Tuple[float, float, float, float]
+) -> "np.ndarray":
+    """Conservative distance in kilometers from each point to the edge of the
+    (north, west, south, east) box. Every station closer than this lies inside the box,
+    so if a box search found one, it is the true nearest station."""
+    north, west, south, east = box
+    to_lat_edge = np.minimum(north - lats, lats - south) * KM_PER_DEGREE
+    widest_lat = np.radians(min(90.0, max(abs(north), abs(south))))
+    to_lon_edge = (
+        np.minimum(lons - west, east - lons) * KM_PER_DEGREE * np.cos(widest_lat)
+    )
+    return np.maximum(0.0, np.minimum(to_lat_edge, to_lon_edge))
+
+
+def find_closest_stations(
+    accessor,
+    points: Sequence[Tuple[float, float]],
+    data_type: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    cell: float = 1.0,
+    area_width: float = 0.5,
+    attempts: int = 10,
+    max_depth: int = 8,
+) -> List[Optional[Station]]:
+    """Closest qualifying station to each of many points.
+
+    Points are clustered on a grid and each cluster is covered by one bounding box
+    search, padded by area_width degrees; the searches run in parallel on the
+    accessor's worker pool and their stations are deduplicated into one
+    StationCollection. Every point is then resolved in one vectorized pass. A point
+    whose nearest station could lie outside its searched box is searched again with a
+    box 1.5 times wider, like find_closest_station. A box whose search comes back full
+    is split into quadrants until no tile is full, like stations_in_boundary, so the
+    candidates in a box are complete before any point is resolved against it.
+
+    :param accessor: NceiAccessor used for the searches.
+    :param points: (lat, lon) pairs.
+    :param data_type: Optional data type to filter stations by.
+    :param start_date: Optional start date to filter stations by.
+    :param end_date: Optional end date to filter stations by.
+    :param cell: Size in degrees of the grid cells used to cluster points, defaults to 1.0
+    :param area_width: Initial padding in degrees around each cluster, defaults to 0.5
+    :param attempts: Maximum number of widening rounds, defaults to 10
+    :param max_depth: Maximum number of times a full box search is split, defaults to 8
+    :return: Closest Station for each point, or None where none was found.
+    """  # pylint: disable=line-too-long
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    lats, lons = coords[:, 0], coords[:, 1]
+    result = [None] * len(coords)
+    unresolved = np.arange(len(coords))
+    results_by_id = {}
+    candidates = None
+
+    for attempt in range(attempts):
+        if not len(unresolved):
+            break
+        last_attempt = attempt == attempts - 1
+
+        boxes = []
+        box_points = []
+        clusters = cluster_points(lats[unresolved], lons[unresolved], cell)
+        for members in clusters.values():
+            members = unresolved[members]
+            boxes.append(
+                (
+                    float(lats[members].max()) + area_width,
+                    float(lons[members].min()) - area_width,
+                    float(lats[members].min()) - area_width,
+                    float(lons[members].max()) + area_width,
+                )
+            )
+            box_points.append(members)
+
+        before = len(results_by_id)
+        accessor.search_tiles(boxes, max_depth, results_by_id)
+        if candidates is None or len(results_by_id) != before:
+            candidates = StationCollection.from_search_results(results_by_id.values())
+            if data_type:
+                candidates = candidates.filter(
+                    candidates.has_data_type(data_type, start_date, end_date)
+                )
+
+        still_unresolved = []
+        for box, members in zip(boxes, box_points):
+            if not len(candidates):
+                still_unresolved.append(members)
+                continue
+            radius = guaranteed_radius(lats[members], lons[members], box)
+            for lo in range(0, len(members), POINT_BLOCK):
+                block = members[lo : lo + POINT_BLOCK]
+                distances = candidates.distance_matrix(lats[block], lons[block])
+                best = distances.argmin(axis=1)
+                best_distance = distances[np.arange(len(block)), best]
+                accept = best_distance <= radius[lo : lo + POINT_BLOCK]
+                if last_attempt:
+                    accept[:] = True
+                for point, station_index in zip(block[accept], best[accept]):
+                    station_id = str(candidates.ids[station_index])
+                    result[point] = station_from_result(results_by_id[station_id])
+                still_unresolved.append(block[~accept])
+
+        unresolved = (
+            np.concatenate(still_unresolved)
+            if still_unresolved
+            else np.array([], dtype=np.int64)
+        )
+        area_width *= 1.5
+
+    return result
@@ -0,0 +1,200 @@
+"""
+Planning of get_daily requests from station metadata. Every station's requested
+window is clipped to the period of record of the data types it actually has, and
+station and data type pairs with no records in the window are dropped. Each date chunk
+then only asks for the stations with records in it. Stations keeping the same data
+types are batched together, in order of their windows so stations with similar
+windows share requests.
+
+Asking a station for days it never recorded returns nothing, so a request's window
+can be the hull of its stations' windows without making the response any bigger.
+Data types are not pooled the same way: a pair dropped for low coverage, or whose
+period of record is out of date, would come back in the response of a request
+asking another station for that data type.
+
+Station metadata goes stale: a period of record ending in the last recent_days days
+is taken to be ongoing, so data recorded since the metadata was fetched is still
+requested.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from ncei_access.chunking import batch_stations, parse_date, split_date_range
+from ncei_access.models import Station
+from ncei_access.ncei_accessor import daily_params
+
+_logger = logging.getLogger(__name__)
+
+
+class PlannedRequest:
+    """One request of a plan: data types and stations over an inclusive date range."""
+
+    __slots__ = ("data_types", "stations", "start", "end")
+
+    def __init__(
+        self, data_types: List[str], stations: List[str], start: str, end: str
+    ):
+        self.data_types = data_types
+        self.stations = stations
+        self.start = start
+        self.end = end
+
+    def params(self) -> Dict:
+        """Query parameters of the request for the "data/v1" endpoint."""
+        return daily_params(self.data_types, self.stations, self.start, self.end)
+
+    def __repr__(self) -> str:
+        return (
+            f"PlannedRequest({self.data_types}, {len(self.stations)} stations, "
+            f"{self.start}..{self.end})"
+        )
+
+
+class Plan:
+    """Requests planned by plan_daily.
+
+    - requests: list of PlannedRequest.
+    - dropped: (station ID, data type) pairs with no records in the requested window.
+    - unknown: IDs of stations without metadata, requested over the whole window.
+    """
+
+    def __init__(
+        self,
+        requests: List[PlannedRequest],
+        dropped: List[Tuple[str, str]],
+        unknown: List[str],
+    ):
+        self.requests = requests
+        self.dropped = dropped
+        self.unknown = unknown
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    def __iter__(self):
+        return iter(self.requests)
+
+    def params(self) -> List[Dict]:
+        """Query parameters of every request."""
+        return [r.params() for r in self.requests]
+
+
+def clip_window(
+    station: Station,
+    data_types: List[str],
+    start: date,
+    end: date,
+    min_coverage: float = None,
+    ongoing_after: date = None,
+) -> Tuple[List[str], Optional[date], Optional[date]]:
+    """Data types of the station with records between start and end, and the part of
+    start..end their periods of record span.
+
+    :param station: Station with data_types metadata.
+    :param data_types: Data types of interest.
+    :param start: First day of interest.
+    :param end: Last day of interest.
+    :param min_coverage: (optional) Also drop data types with less than this percent coverage over their period of record. Defaults to None
+    :param ongoing_after: (optional) Periods of record ending on or after this day are taken to still be going on. Defaults to None
+    :return: (data types kept, first day, last day), with None days if nothing is kept.
+    """  # pylint: disable=line-too-long
+    kept, first, last = [], None, None
+    for data_type in data_types:
+        coverage = station.coverage.get(data_type)
+        if coverage is None or not coverage.covers(min_coverage=min_coverage):
+            continue
+        type_start = max(start, coverage.start.date()) if coverage.start else start
+        ongoing = coverage.end is None or (
+            ongoing_after is not None and coverage.end.date() >= ongoing_after
+        )
+        type_end = end if ongoing else min(end, coverage.end.date())
+        if type_start > type_end:
+            continue
+        kept.append(data_type)
+        first = type_start if first is None else min(first, type_start)
+        last = type_end if last is None else max(last, type_end)
+    return kept, first, last
+
+
+def plan_daily(
+    data_types: Union[str, List[str]],
+    stations: Iterable[Union[str, Station]],
+    start: str,
+    end: str,
+    catalog: "StationCatalog" = None,
+    chunk: Union[str, int] = None,
+    station_batch_size: int = None,
+    min_coverage: float = None,
+    recent_days: int = 90,
+) -> Plan:
+    """Plan the requests for daily data of stations from their periods of record.
+
+    :param data_types: data type(s) of interest.
+    :param stations: Station objects, or station IDs to look up in catalog.
+    :param start: beginning date of period of interest.
+    :param end: end date of period of interest.
+    :param catalog: (optional) StationCatalog with the metadata of stations given by ID. Stations without metadata are requested over the whole window for every data type. Defaults to None
+    :param chunk: (optional) split each request's window into "month", "year" or "decade" chunks, or chunks of this many days. Defaults to None
+    :param station_batch_size: (optional) Maximum number of stations per request. Defaults to None
+    :param min_coverage: (optional) Drop data types with less than this percent coverage over their period of record. Defaults to None
+    :param recent_days: Periods of record ending less than this many days ago are taken to still be going on, defaults to 90
+    :return: Plan object.
+    """  # pylint: disable=line-too-long
+    data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+    if isinstance(stations, (str, Station)):
+        stations = [stations]
+    start_d, end_d = parse_date(start), parse_date(end)
+    ongoing_after = date.today() - timedelta(days=recent_days)
+
+    windows, dropped, unknown, seen = [], [], [], set()
+    for station in stations:
+        if isinstance(station, str):
+            station = (catalog.get(station) if catalog else None) or station
+        station_id = station if isinstance(station, str) else station.station_id
+        if station_id in seen:
+            continue
+        seen.add(station_id)
+
+        if isinstance(station, str) or station.data_types is None:
+            unknown.append(station_id)
+            windows.append((start_d, end_d, station_id, data_types))
+            continue
+        kept, first, last = clip_window(
+            station, data_types, start_d, end_d, min_coverage, ongoing_after
+        )
+        dropped.extend((station_id, dt) for dt in data_types if dt not in kept)
+        if kept:
+            windows.append((first, last, station_id, kept))
+
+    windows.sort(key=lambda w: (w[0], w[1], w[2]))
+    requests = []
+    date_ranges = [(start_d, end_d)]
+    if chunk is not None and windows:
+        first, last = windows[0][0], max(w[1] for w in windows)
+        date_ranges = [
+            (parse_date(s), parse_date(e))
+            for s, e in split_date_range(first, last, chunk)
+        ]
+    for chunk_start, chunk_end in date_ranges:
+        by_types: Dict[Tuple[str, ...], Dict[str, Tuple]] = {}
+        for w in windows:
+            if w[0] <= chunk_end and w[1] >= chunk_start:
+                by_types.setdefault(tuple(w[3]), {})[w[2]] = w
+        for kept, active in by_types.items():
+            for batch in batch_stations(list(active), batch_size=station_batch_size):
+                members = [active[station_id] for station_id in batch]
+                requests.append(
+                    PlannedRequest(
+                        list(kept),
+                        batch,
+                        max(chunk_start, min(w[0] for w in members)).isoformat(),
+                        min(chunk_end, max(w[1] for w in members)).isoformat(),
+                    )
+                )
+
+    _logger.debug(
+        f"Planned {len(requests)} requests for {len(windows)} stations, dropped "
+        f"{len(dropped)} station and data type pairs without records."
+    )
+    return Plan(requests, dropped, unknown)
@@ -0,0 +1,188 @@
+"""
+Client-side rate limiting for the REST adapters, shareable between threads and,
+through a lock file, between processes on one host.
+"""
+
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+THROTTLE_STATUSES = (429, 503)
+
+# tokens, updated, rate, last_decrease
+_STATE = struct.Struct("<dddd")
+
+
+class RateLimiter:
+    """Token bucket limiting requests per second, with adaptive (AIMD) throttling.
+
+    Every request takes a token; tokens refill at the current rate up to burst. When a
+    response says the server is throttling (429 or 503), the rate is cut by
+    decrease_factor, at most once per second so a burst of rejected requests counts as
+    one signal, and a Retry-After pauses every user of the limiter. Each success then
+    adds increase / rate requests per second, so the rate climbs back by about
+    `increase` per second until it reaches max_rate again.
+
+    Threads share a limiter by sharing the object. Processes share one by passing the
+    same path: the bucket then lives in that file and is updated under an exclusive
+    lock (POSIX only). max_concurrency is enforced per process.
+
+    .. code-block:: python
+
+        limiter = RateLimiter(rate=5, max_concurrency=4, path="/tmp/ncei.limiter")
+        ncei_db = na.NceiAccessor(rest_adapter=RestAdapter(rate_limiter=limiter))
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        max_concurrency: int = None,
+        burst: float = 1.0,
+        min_rate: float = 0.1,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        throttle_statuses: Iterable[int] = THROTTLE_STATUSES,
+        path: Union[str, Path] = None,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param rate: Maximum (and starting) requests per second, defaults to 5.0
+        :param max_concurrency: (optional) Maximum number of requests in flight in this process. Defaults to None, no limit
+        :param burst: Maximum number of tokens saved up while idle, defaults to 1.0
+        :param min_rate: Rate never cut below this, in requests per second, defaults to 0.1
+        :param increase: Requests per second added back per second of successes, defaults to 0.1
+        :param decrease_factor: Rate multiplier applied when throttled, defaults to 0.5
+        :param throttle_statuses: HTTP status codes that mean the server is throttling, defaults to (429, 503)
+        :param path: (optional) File holding the bucket, to share it between processes. Defaults to None, shared by threads only
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        """  # pylint: disable=line-too-long
+        self.max_rate = float(rate)
+        self.burst = float(burst)
+        self.min_rate = float(min_rate)
+        self.increase = float(increase)
+        self.decrease_factor = float(decrease_factor)
+        self.throttle_statuses = frozenset(throttle_statuses)
+        self.path = Path(path) if path else None
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._slots = (
+            threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        )
+        self._state = (self.burst, time.time(), self.max_rate, 0.0)
+        self._fd = None
+
+        if self.path is not None:
+            if fcntl is None:
+                self._logger.warning(
+                    "File locks are not supported on this platform, the rate limiter is only shared between threads."  # pylint: disable=line-too-long
+                )
+                self.path = None
+            else:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    def close(self):
+        """Close the shared state file, if any."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _update(self, change):
+        """Apply change(tokens, updated, rate, last_decrease, now) -> (new state,
+        return value) atomically, across processes if the limiter has a path."""
+        with self._lock:
+            if self._fd is None:
+                now = time.time()
+                self._state, value = change(*self._state, now)
+                return value
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(self._fd, _STATE.size, 0)
+                state = _STATE.unpack(raw) if len(raw) == _STATE.size else self._state
+                now = time.time()
+                state, value = change(*state, now)
+                os.pwrite(self._fd, _STATE.pack(*state), 0)
+                return value
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def rate(self) -> float:
+        """Current requests per second."""
+        return self._update(lambda t, u, rate, d, now: ((t, u, rate, d), rate))
+
+    def reserve(self) -> float:
+        """Take a token without waiting for it.
+
+        :return: Seconds the caller must wait before sending its request.
+        """
+
+        def take(tokens, updated, rate, last_decrease, now):
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * rate) - 1
+            wait = -tokens / rate if tokens < 0 else 0.0
+            return (tokens, now, rate, last_decrease), wait
+
+        return self._update(take)
+
+    def acquire(self):
+        """Block until a concurrency slot and a token are available."""
+        if self._slots is not None:
+            self._slots.acquire()
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, status_code: int = None, retry_after: float = None):
+        """Give back the concurrency slot taken by acquire and report the outcome.
+
+        :param status_code: HTTP status of the response, None if there was none.
+        :param retry_after: (optional) Seconds from the response's Retry-After header. Defaults to None
+        """  # pylint: disable=line-too-long
+        if self._slots is not None:
+            self._slots.release()
+        self.feedback(status_code, retry_after)
+
+    def feedback(self, status_code: int = None, retry_after: float = None):
+        """Adapt the rate to a response: cut it when the server throttles, raise it
+        slowly on success. Connection errors (status_code None) leave it unchanged.
+
+        :param status_code: HTTP status of the response, None if there was none.
+        :param retry_after: (optional) Seconds from the response's Retry-After header. Defaults to None
+        """  # pylint: disable=line-too-long
+        if status_code is None:
+            return
+        throttled = status_code in self.throttle_statuses
+        if not throttled and not 200 <= status_code <= 299:
+            return
+
+        def adapt(tokens, updated, rate, last_decrease, now):
+            if not throttled:
+                rate = min(self.max_rate, rate + self.increase / rate)
+                return (tokens, updated, rate, last_decrease), None
+            if now - last_decrease >= 1.0:
+                rate = max(self.min_rate, rate * self.decrease_factor)
+                last_decrease = now
+                self._logger.warning(
+                    f"Throttled with status {status_code}, rate limit now {rate:.2f} requests/s"  # pylint: disable=line-too-long
+                )
+            if retry_after:
+                # Push the bucket into debt so nobody sends before Retry-After passes.
+                tokens = min(tokens, -retry_after * rate)
+                updated = max(updated, now)
+            return (tokens, updated, rate, last_decrease), None
+
+        self._update(adapt)
+
+    def stats(self) -> Dict[str, float]:
+        """Current rate and tokens, eg. for logging."""
+        tokens, _, rate, _ = self._update(lambda *s: (s[:4], s[:4]))
+        return {"rate": rate, "tokens": tokens, "max_rate": self.max_rate}
@@ -4,87 +4,470 @@
 Low level components of NCEI Access API wrapper.
 """
 
-from typing import Dict
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+import csv
 import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
 from json import JSONDecodeError
 import requests
 import requests.packages
+from requests.adapters import HTTPAdapter
+from ncei_access import jsonlib
+from ncei_access.cache import ResponseCache, request_key
 from ncei_access.exceptions import NceiAccessException
+from ncei_access.metrics import RequestEvent, emit
 from ncei_access.models import Result
+from ncei_access.ratelimit import RateLimiter
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :param value: Raw header value, possibly None.
+    :return: Seconds to wait, or None if the header is missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(
+    attempt: int, backoff_factor: float, backoff_max: float, jitter: float = 1.0
+) -> float:
+    """Exponential backoff with "full jitter": a random delay in
+    [0, min(backoff_max, backoff_factor * 2 ** attempt)].
+
+    :param attempt: Zero based retry attempt number.
+    :param backoff_factor: Base delay in seconds.
+    :param backoff_max: Upper bound on the delay in seconds.
+    :param jitter: Fraction of the delay that is randomized. 0 disables jitter, defaults to 1.0
+    :return: Seconds to sleep before the next attempt.
+    """  # pylint: disable=line-too-long
+    delay = min(backoff_max, backoff_factor * (2**attempt))
+    return delay * (1 - jitter) + random.uniform(0, delay * jitter)
+
+
+def prepare_params(endpoint: str, ep_params: Dict = None) -> Dict:
+    """Apply the request-side API quirks to the parameters of a call.
+
+    :param endpoint: API endpoint, see RestAdapter.get.
+    :param ep_params: parameters for API call, defaults to None
+    :return: The parameters to send.
+    """
+    if ep_params is None:
+        ep_params = {}
+
+    # API quirk 1: force format=json for 'data' endpoint
+    if endpoint == "data/v1/":
+        ep_params.setdefault("format", "json")
+
+    return ep_params
+
+
+def make_result(
+    endpoint: str,
+    data_out,
+    status_code: int,
+    message: str,
+    logger: logging.Logger,
+    full_url: str = "",
+    ep_params: Dict = None,
+) -> Result:
+    """Turn a decoded response body into a Result, applying the response-side API
+    quirks.
+
+    :param endpoint: API endpoint the response came from.
+    :param data_out: Decoded JSON body.
+    :param status_code: HTTP status code.
+    :param message: HTTP reason phrase.
+    :param logger: Logger to report the outcome on.
+    :param full_url: URL requested, only used for logging, defaults to ""
+    :param ep_params: Parameters sent, only used for logging, defaults to None
+    :raises NceiAccessException: If the status code is not a success.
+    :return: Result with the response data.
+    """
+    # Return result if status code indicates success
+    is_success = 200 <= status_code <= 299
+
+    # API quirk 2: for search endpoint, results are nested under "results"
+    result_data = (
+        data_out.get("results", data_out)
+        if endpoint == "search/v1/data" and isinstance(data_out, dict)
+        else data_out
+    )
+
+    log_msg = (
+        f"url={full_url}, params={ep_params}, success={is_success}, "
+        f"status_code={status_code}, message={message}"
+    )
+
+    if is_success:
+        logger.debug(log_msg)
+        return Result(status_code, message=message, data=result_data)
+
+    logger.error(log_msg)
+    raise NceiAccessException(f"{status_code}: {message}")
+
+
+class _Flight:
+    """A request in progress that identical requests from other threads wait on."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
 
 
 class RestAdapter:
-    """Low level tool for accessing API."""
+    """Low level tool for accessing API.
+
+    A single ``requests.Session`` (and so a single urllib3 connection pool) is kept for
+    the life of the adapter, so connections to NCEI are reused with keep-alive instead
+    of paying a TCP+TLS handshake on every call. The pool is thread-safe, so one adapter
+    can be shared by a pool of worker threads.
+
+    Identical requests (same endpoint and normalized parameters) made by several threads
+    at the same time are coalesced: only the first is sent and the others wait for it
+    and get the same Result. The number of requests saved this way is kept in
+    ``coalesced``.
+    """
 
     def __init__(
         self,
         hostname: str = "www.ncei.noaa.gov/access/services",
         logger: logging.Logger = None,
+        timeout: float = 10,
+        pool_maxsize: int = 10,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 60.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        session: requests.Session = None,
+        cache: ResponseCache = None,
+        coalesce: bool = True,
+        rate_limiter: RateLimiter = None,
+        listeners: Iterable[Callable] = None,
+        decoder: Callable[[bytes], Any] = None,
     ):
         """
         :param hostname: Normally, www.ncei.noaa.gov/access/services, defaults to "www.ncei.noaa.gov/access/services"
-        :param ver: Currectly only v1, defaults to "v1"
         :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
-        """#pylint: disable=line-too-long
+        :param timeout: Seconds to wait for the server to connect and to send data, defaults to 10
+        :param pool_maxsize: Maximum number of kept-alive connections, should be at least the number of threads sharing the adapter, defaults to 10
+        :param retries: Number of times to retry a request after a connection error or a status in retry_statuses, defaults to 3
+        :param backoff_factor: Base of the exponential backoff between retries in seconds, defaults to 0.5
+        :param backoff_max: Maximum backoff (and maximum honored Retry-After) in seconds, defaults to 60.0
+        :param retry_statuses: HTTP status codes that are retried, defaults to (429, 500, 502, 503, 504)
+        :param session: (optional) Preconfigured requests.Session to use instead of creating one. Defaults to None
+        :param cache: (optional) ResponseCache to serve repeated requests from disk. Defaults to None
+        :param coalesce: Share one request between threads asking for the same thing at the same time, defaults to True
+        :param rate_limiter: (optional) RateLimiter every attempt goes through, possibly shared with other adapters and processes. Defaults to None
+        :param listeners: (optional) Callables receiving a ncei_access.metrics.RequestEvent after every get, eg. a Metrics object. Defaults to None
+        :param decoder: (optional) Function decoding a response body from bytes. Defaults to ncei_access.jsonlib.loads, which uses orjson or msgspec when installed
+        """  # pylint: disable=line-too-long
 
         self.url = f"https://{hostname}/"
         self._logger = logger or logging.getLogger(__name__)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.cache = cache
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.rate_limiter = rate_limiter
+        self.listeners = list(listeners or [])
+        self.decoder = decoder or jsonlib.loads
+
+        if session is None:
+            session = requests.Session()
+            # Retries are handled in _send() so that Retry-After and logging work the
+            # same for every failure, so the transport itself never retries.
+            http_adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0
+            )
+            session.mount("https://", http_adapter)
+            session.mount("http://", http_adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        self._session = session
+
+    def close(self):
+        """Close pooled connections."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _send(
+        self,
+        full_url: str,
+        ep_params: Dict,
+        stream: bool = False,
+        event: RequestEvent = None,
+    ) -> requests.Response:
+        """Send a GET request, retrying connection errors and retryable statuses with
+        exponential backoff and jitter. Retry-After is honored when the server sends it.
+        With stream=True only the headers have been read when the response is returned,
+        and the rate limiter's concurrency slot stays taken until the caller has read
+        the body and called _release_stream.
+
+        :return: The last response received.
+        :raises NceiAccessException: If every attempt failed to get a response.
+        """
+        limiter = self.rate_limiter
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            if event is not None:
+                event.attempts = attempt + 1
+                sent = time.perf_counter()
+            try:
+                response = self._session.get(
+                    url=full_url, params=ep_params, timeout=self.timeout, stream=stream
+                )
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if limiter is not None:
+                    limiter.release()
+                if attempt >= self.retries:
+                    self._logger.error(msg=f"Request failed: {e}")
+                    raise NceiAccessException("Request failed") from e
+                delay = backoff_delay(attempt, self.backoff_factor, self.backoff_max)
+                self._logger.warning(
+                    f"url={full_url}, attempt={attempt + 1}, error={e}, retrying in {delay:.2f}s"  # pylint: disable=line-too-long
+                )
+            except requests.exceptions.RequestException as e:
+                if limiter is not None:
+                    limiter.release()
+                self._logger.error(msg=f"Request failed: {e}")
+                raise NceiAccessException("Request failed") from e
+            else:
+                if event is not None:
+                    event.ttfb = time.perf_counter() - sent
+                    event.status_code = response.status_code
+                retry_after = None
+                if response.status_code in self.retry_statuses:
+                    retry_after = retry_after_seconds(
+                        response.headers.get("Retry-After")
+                    )
+                    if retry_after is not None:
+                        retry_after = min(retry_after, self.backoff_max)
+                final = (
+                    response.status_code not in self.retry_statuses
+                    or attempt >= self.retries
+                )
+                if limiter is not None:
+                    if final and stream:
+                        limiter.feedback(response.status_code, retry_after)
+                    else:
+                        limiter.release(response.status_code, retry_after)
+                if final:
+                    return response
+                delay = retry_after
+                if delay is None:
+                    delay = backoff_delay(
+                        attempt, self.backoff_factor, self.backoff_max
+                    )
+                elif (
+                    limiter is not None
+                    and response.status_code in limiter.throttle_statuses
+                ):
+                    # The limiter holds every request back until Retry-After passes.
+                    delay = 0.0
+                self._logger.warning(
+                    f"url={full_url}, attempt={attempt + 1}, status_code={response.status_code}, retrying in {delay:.2f}s"  # pylint: disable=line-too-long
+                )
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def _release_stream(self):
+        """Give back the concurrency slot of a response sent with stream=True."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.release()
 
     def get(self, endpoint: str = "data/v1/", ep_params: Dict = None) -> Result:
         """Fundamental function for getting data.
 
         :param endpoint: 4 options: - "data/v1" for getting data. - "search/v1/data" for searching for stations or dataTypes. - "support/v3/datasets" to discover metadata about datasets. - "orders/v1" to retrieve information about previous orders. Idk.
         :param ep_params: parameters for API call, defaults to None
-        :raises NceiAccessException: _description_
-        :raises NceiAccessException: _description_
-        :raises NceiAccessException: _description_
-        :return: _description_
+        :raises NceiAccessException: If the request fails after all retries.
+        :raises NceiAccessException: If the response body is not JSON.
+        :raises NceiAccessException: If the response status is not a success.
+        :return: Result with the decoded response.
         """#pylint: disable=line-too-long
-        if ep_params is None:
-            ep_params = {}
+        ep_params = prepare_params(endpoint, ep_params)
+        if not self.listeners:
+            return self._get(endpoint, ep_params)
 
-        full_url = f"{self.url}{endpoint}"
+        event = RequestEvent(endpoint, request_key(endpoint, ep_params))
+        start = time.perf_counter()
+        try:
+            result = self._get(endpoint, ep_params, event)
+            event.status_code = result.status_code
+            return result
+        except Exception as e:
+            event.error = str(e)
+            raise
+        finally:
+            event.elapsed = time.perf_counter() - start
+            emit(self.listeners, event)
 
-        # API quirk 1: force format=json for 'data' endpoint
-        if endpoint == "data/v1/":
-            ep_params.setdefault("format", "json")
+    def _get(
+        self, endpoint: str, ep_params: Dict, event: RequestEvent = None
+    ) -> Result:
+        """Coalesce the request with identical ones in flight, see get."""
+        if not self.coalesce:
+            return self._fetch(endpoint, ep_params, event)
 
-        self._logger.debug(f"url={full_url}, params={ep_params}")
+        key = request_key(endpoint, ep_params)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            self._logger.debug(
+                f"endpoint={endpoint}, params={ep_params}, coalesced=True"
+            )
+            if event is not None:
+                event.coalesced = True
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
 
         try:
-            response = requests.get(url=full_url, params=ep_params, timeout=10)
-        except requests.exceptions.RequestException as e:
-            self._logger.error(msg=f"Request failed: {e}")
-            raise NceiAccessException("Request failed") from e
+            flight.result = self._fetch(endpoint, ep_params, event)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def _fetch(
+        self, endpoint: str, ep_params: Dict, event: RequestEvent = None
+    ) -> Result:
+        """Serve a request from the cache or send it. See get."""
+        full_url = f"{self.url}{endpoint}"
+
+        self._logger.debug(f"url={full_url}, params={ep_params}")
+
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, ep_params)
+            if event is not None:
+                event.cache = "miss" if cached is None else "hit"
+            if cached is not None:
+                self._logger.debug(f"url={full_url}, params={ep_params}, cache=hit")
+                return cached
+
+        # With instrumentation the body is read separately so that waiting for the
+        # headers, downloading and decoding can be timed on their own.
+        response = self._send(
+            full_url, ep_params, stream=event is not None, event=event
+        )
+        if event is not None:
+            start = time.perf_counter()
+            try:
+                event.bytes = len(response.content)
+            except requests.exceptions.RequestException as e:
+                self._logger.error(msg=f"Request failed: {e}")
+                raise NceiAccessException("Request failed") from e
+            finally:
+                self._release_stream()
+            event.download = time.perf_counter() - start
+            start = time.perf_counter()
 
         try:
-            data_out = response.json()
+            data_out = self.decoder(response.content)
         except (ValueError, JSONDecodeError) as e:
             self._logger.error(
                 f"url={full_url}, params={ep_params}, success=False, message={e}"
             )
             raise NceiAccessException("Bad JSON in response") from e
 
-        # Return result if status code indicates success
-        is_success = 200 <= response.status_code <= 299
-        message = response.reason
-        status_code = response.status_code
+        if event is not None:
+            event.decode = time.perf_counter() - start
 
-        # API quirk 2: for search endpoint, results are nested under "results"
-        result_data = (
-            data_out.get("results", data_out)
-            if endpoint == "search/v1/data"
-            else data_out
+        result = make_result(
+            endpoint,
+            data_out,
+            response.status_code,
+            response.reason,
+            logger=self._logger,
+            full_url=full_url,
+            ep_params=ep_params,
         )
 
-        log_msg = (
-            f"url={full_url}, params={ep_params}, success={is_success}, "
-            f"status_code={status_code}, message={message}"
-        )
+        if self.cache is not None:
+            self.cache.set(endpoint, ep_params, result)
 
-        if is_success:
-            self._logger.debug(log_msg)
-            return Result(status_code, message=message, data=result_data)
+        return result
 
-        self._logger.error(log_msg)
-        raise NceiAccessException(f"{status_code}: {message}")
+    def iter_csv(
+        self, endpoint: str = "data/v1/", ep_params: Dict = None
+    ) -> Iterator[Dict]:
+        """Stream a request in CSV format and yield each row as a dict as soon as its line
+        arrives, so memory use does not grow with the size of the response. Blank fields
+        are left out, matching the rows of the JSON format. Responses are never cached.
+
+        :param endpoint: API endpoint, defaults to "data/v1/"
+        :param ep_params: parameters for API call, defaults to None
+        :raises NceiAccessException: If the request fails after all retries or the status is not a success.
+        :return: Iterator of row dicts.
+        """  # pylint: disable=line-too-long
+        ep_params = dict(ep_params or {})
+        ep_params["format"] = "csv"
+        full_url = f"{self.url}{endpoint}"
+
+        self._logger.debug(f"url={full_url}, params={ep_params}, stream=True")
+
+        response = self._send(full_url, ep_params, stream=True)
+        try:
+            if not 200 <= response.status_code <= 299:
+                self._logger.error(
+                    f"url={full_url}, params={ep_params}, success=False, "
+                    f"status_code={response.status_code}, message={response.reason}"
+                )
+                raise NceiAccessException(f"{response.status_code}: {response.reason}")
+            response.encoding = response.encoding or "utf-8"
+            try:
+                lines = response.iter_lines(decode_unicode=True)
+                for row in csv.DictReader(lines):
+                    yield {k: v for k, v in row.items() if v not in ("", None)}
+            except requests.exceptions.RequestException as e:
+                self._logger.error(msg=f"Stream interrupted: {e}")
+                raise NceiAccessException("Stream interrupted") from e
+        finally:
+            # The body is read or abandoned: free the connection and the limiter slot.
+            response.close()
+            self._release_stream()
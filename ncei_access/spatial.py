@@ -0,0 +1,157 @@
+"""
+Spatial index for nearest neighbour and radius queries on latitude/longitude points.
+"""
+
+import heapq
+from math import asin, cos, pi, radians, sin
+from typing import Callable, List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """Cartesian coordinates of a point on the unit sphere."""
+    lat_r, lon_r = radians(lat), radians(lon)
+    return (cos(lat_r) * cos(lon_r), cos(lat_r) * sin(lon_r), sin(lat_r))
+
+
+def chord_to_km(chord: float) -> float:
+    """Great circle distance in kilometers for a straight line (chord) distance between
+    two points on the unit sphere."""
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km: float) -> float:
+    """Chord length on the unit sphere for a great circle distance in kilometers."""
+    return 2 * sin(min(km / EARTH_RADIUS_KM, pi) / 2)
+
+
+class SphereIndex:
+    """KD-tree over points on the unit sphere. Since the straight line distance between
+    two points on a sphere grows with their great circle distance, nearest neighbours in
+    3D are nearest neighbours on the globe, with no trouble at the poles or the
+    antimeridian. Queries take a few microseconds to tens of microseconds.
+
+    Nodes are stored in flat lists: the tree over points[lo:hi] has its root at the
+    middle position, the left subtree before and the right subtree after.
+    """
+
+    def __init__(self, coordinates: Sequence[Tuple[float, float]]):
+        """
+        :param coordinates: (lat, lon) of each point. Query results are indexes into this sequence.
+        """  # pylint: disable=line-too-long
+        points = [to_unit_vector(lat, lon) for lat, lon in coordinates]
+        self._order = list(range(len(points)))
+        self._axis = [0] * len(points)
+        self._build(0, len(points), points)
+        self._sorted_points = [points[i] for i in self._order]
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _build(self, lo: int, hi: int, points: List[Tuple[float, float, float]]):
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 0:
+                continue
+            segment = self._order[lo:hi]
+            # Split on the axis with the widest spread.
+            spreads = [
+                max(points[i][axis] for i in segment)
+                - min(points[i][axis] for i in segment)
+                for axis in range(3)
+            ]
+            axis = spreads.index(max(spreads))
+            segment.sort(key=lambda i, a=axis: points[i][a])
+            self._order[lo:hi] = segment
+            mid = (lo + hi) // 2
+            self._axis[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int = 1,
+        predicate: Callable[[int], bool] = None,
+    ) -> List[Tuple[float, int]]:
+        """The k points closest to (lat, lon).
+
+        :param lat: Latitude (decimal format)
+        :param lon: Longitude (decimal format)
+        :param k: Number of neighbours, defaults to 1
+        :param predicate: (optional) Only points whose index passes predicate(index) are returned. Defaults to None
+        :return: List of (distance in km, index) pairs, closest first.
+        """  # pylint: disable=line-too-long
+        query = to_unit_vector(lat, lon)
+        best = []  # max-heap of (-squared distance, index)
+        points, order, axes = self._sorted_points, self._order, self._axis
+        stack = [(0, len(points), 0.0)]
+        while stack:
+            lo, hi, bound = stack.pop()
+            if lo >= hi or (len(best) == k and bound > -best[0][0]):
+                continue
+            mid = (lo + hi) // 2
+            point = points[mid]
+            d2 = (
+                (point[0] - query[0]) ** 2
+                + (point[1] - query[1]) ** 2
+                + (point[2] - query[2]) ** 2
+            )
+            if (len(best) < k or d2 < -best[0][0]) and (
+                predicate is None or predicate(order[mid])
+            ):
+                if len(best) == k:
+                    heapq.heapreplace(best, (-d2, order[mid]))
+                else:
+                    heapq.heappush(best, (-d2, order[mid]))
+            diff = query[axes[mid]] - point[axes[mid]]
+            near, far = (lo, mid), (mid + 1, hi)
+            if diff >= 0:
+                near, far = far, near
+            # Visit the near side first by pushing it last.
+            stack.append((far[0], far[1], max(bound, diff * diff)))
+            stack.append((near[0], near[1], bound))
+        return sorted((chord_to_km((-d2) ** 0.5), i) for d2, i in best)
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        predicate: Callable[[int], bool] = None,
+    ) -> List[Tuple[float, int]]:
+        """All points within radius_km of (lat, lon).
+
+        :param lat: Latitude (decimal format)
+        :param lon: Longitude (decimal format)
+        :param radius_km: Great circle radius in kilometers.
+        :param predicate: (optional) Only points whose index passes predicate(index) are returned. Defaults to None
+        :return: List of (distance in km, index) pairs, closest first.
+        """  # pylint: disable=line-too-long
+        query = to_unit_vector(lat, lon)
+        r2 = km_to_chord(radius_km) ** 2
+        found = []
+        points, order, axes = self._sorted_points, self._order, self._axis
+        stack = [(0, len(points))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            point = points[mid]
+            d2 = (
+                (point[0] - query[0]) ** 2
+                + (point[1] - query[1]) ** 2
+                + (point[2] - query[2]) ** 2
+            )
+            if d2 <= r2 and (predicate is None or predicate(order[mid])):
+                found.append((chord_to_km(d2**0.5), order[mid]))
+            diff = query[axes[mid]] - point[axes[mid]]
+            if diff < 0 or diff * diff <= r2:
+                stack.append((lo, mid))
+            if diff >= 0 or diff * diff <= r2:
+                stack.append((mid + 1, hi))
+        return sorted(found)
@@ -0,0 +1,266 @@
+"""
+Incremental local store of daily data. Rows already held locally are served from disk
+and only the missing date ranges are requested from the API.
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from ncei_access.cache import default_cache_dir
+from ncei_access.chunking import parse_date
+
+Interval = Tuple[date, date]
+ONE_DAY = timedelta(days=1)
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Merge overlapping or adjacent inclusive date intervals.
+
+    :param intervals: (start, end) date pairs in any order.
+    :return: Sorted, disjoint intervals.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(wanted: Interval, held: List[Interval]) -> List[Interval]:
+    """Parts of the inclusive interval wanted that are not covered by held.
+
+    :param wanted: (start, end) date pair.
+    :param held: Sorted, disjoint intervals, eg. from merge_intervals.
+    :return: Sorted list of gaps.
+    """
+    gaps = []
+    cursor, end = wanted
+    for held_start, held_end in held:
+        if held_end < cursor:
+            continue
+        if held_start > end:
+            break
+        if held_start > cursor:
+            gaps.append((cursor, held_start - ONE_DAY))
+        cursor = max(cursor, held_end + ONE_DAY)
+        if cursor > end:
+            return gaps
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class DailyStore:
+    """Local SQLite store of daily values keyed by (station, data type, date).
+
+    The store also records which date intervals have already been fetched for each
+    station and data type, so get_daily only asks the API for the gaps. The last
+    refresh_days days are always refetched because NCEI keeps adding and revising
+    recent observations.
+
+    .. code-block:: python
+
+        store = DailyStore("daily.sqlite", accessor=na.NceiAccessor())
+        rows = store.get_daily(["TMAX", "TMIN"], station_ids, "1970-01-01", "2025-06-01")
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = None,
+        accessor=None,
+        refresh_days: int = 7,
+        logger: logging.Logger = None,
+    ):
+        """
+        :param path: (optional) SQLite file. Defaults to daily.sqlite in ncei_access.cache.default_cache_dir()
+        :param accessor: (optional) NceiAccessor used to fetch missing data. Defaults to a new NceiAccessor
+        :param refresh_days: Number of most recent days that are always refetched, defaults to 7
+        :param logger: (optional) If your app has a logger, pass it in here. Defaults to None
+        """  # pylint: disable=line-too-long
+        if accessor is None:
+            # Importing here to avoid circular import issues
+            from ncei_access.ncei_accessor import NceiAccessor
+
+            accessor = NceiAccessor(logger=logger)
+        self.path = Path(path) if path else default_cache_dir() / "daily.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.accessor = accessor
+        self.refresh_days = refresh_days
+        self._logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS observations (
+                    station TEXT NOT NULL,
+                    data_type TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    value TEXT,
+                    PRIMARY KEY (station, data_type, date)
+                ) WITHOUT ROWID"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS coverage (
+                    station TEXT NOT NULL,
+                    data_type TEXT NOT NULL,
+                    start TEXT NOT NULL,
+                    end TEXT NOT NULL
+                )"""
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS coverage_key ON coverage (station, data_type)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def held(self, station: str, data_type: str) -> List[Interval]:
+        """Date intervals already fetched for a station and data type."""
+        rows = self._connect().execute(
+            "SELECT start, end FROM coverage WHERE station = ? AND data_type = ?",
+            (station, data_type),
+        )
+        return merge_intervals([(parse_date(s), parse_date(e)) for s, e in rows])
+
+    def missing(
+        self,
+        station: str,
+        data_type: str,
+        start: Union[str, date],
+        end: Union[str, date],
+    ) -> List[Interval]:
+        """Date intervals of start..end that have to be fetched for a station and data
+        type: the gaps in what is held, plus the last refresh_days days."""
+        stale_from = date.today() - timedelta(days=self.refresh_days)
+        trusted = [
+            (s, min(e, stale_from - ONE_DAY))
+            for s, e in self.held(station, data_type)
+            if s < stale_from
+        ]
+        return subtract_intervals((parse_date(start), parse_date(end)), trusted)
+
+    def _record(self, rows: List[Dict], stations, data_types, start, end):
+        """Store fetched rows and mark start..end as held for every requested station
+        and data type, including those with no rows in that period."""
+        values = [
+            (row["STATION"], data_type, row["DATE"][:10], row[data_type])
+            for row in rows
+            for data_type in data_types
+            if data_type in row
+        ]
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?)", values
+            )
+            for station in stations:
+                for data_type in data_types:
+                    intervals = self.held(station, data_type) + [(start, end)]
+                    conn.execute(
+                        "DELETE FROM coverage WHERE station = ? AND data_type = ?",
+                        (station, data_type),
+                    )
+                    conn.executemany(
+                        "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                        [
+                            (station, data_type, s.isoformat(), e.isoformat())
+                            for s, e in merge_intervals(intervals)
+                        ],
+                    )
+
+    def update(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str,
+        end: str,
+        **kwargs,
+    ) -> int:
+        """Fetch the missing parts of start..end for the stations and data types.
+        Stations and data types with the same gap are fetched in one get_daily call.
+
+        :param kwargs: Passed on to NceiAccessor.get_daily, eg. chunk or station_batch_size.
+        :return: Number of get_daily calls made.
+        """
+        data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+        stations = [stations] if isinstance(stations, str) else list(stations)
+
+        groups = defaultdict(lambda: (set(), set()))
+        for station in stations:
+            for data_type in data_types:
+                for gap in self.missing(station, data_type, start, end):
+                    groups[gap][0].add(station)
+                    groups[gap][1].add(data_type)
+
+        for (gap_start, gap_end), (gap_stations, gap_types) in sorted(groups.items()):
+            self._logger.debug(
+                f"Fetching {gap_start}..{gap_end} for {len(gap_stations)} stations."
+            )
+            rows = self.accessor.get_daily(
+                data_types=sorted(gap_types),
+                stations=sorted(gap_stations),
+                start=gap_start.isoformat(),
+                end=gap_end.isoformat(),
+                **kwargs,
+            )
+            self._record(rows, gap_stations, gap_types, gap_start, gap_end)
+
+        return len(groups)
+
+    def read(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str,
+        end: str,
+    ) -> List[Dict]:
+        """Rows held locally, in the same shape as NceiAccessor.get_daily."""
+        data_types = [data_types] if isinstance(data_types, str) else list(data_types)
+        stations = [stations] if isinstance(stations, str) else list(stations)
+
+        rows = {}
+        conn = self._connect()
+        for station in stations:
+            cursor = conn.execute(
+                f"""SELECT date, data_type, value FROM observations
+                WHERE station = ? AND date BETWEEN ? AND ?
+                AND data_type IN ({",".join("?" * len(data_types))})""",
+                [station, parse_date(start).isoformat(), parse_date(end).isoformat()]
+                + data_types,
+            )
+            for day, data_type, value in cursor:
+                row = rows.setdefault((station, day), {"DATE": day, "STATION": station})
+                row[data_type] = value
+        return [rows[key] for key in sorted(rows)]
+
+    def get_daily(
+        self,
+        data_types: Union[str, List[str]],
+        stations: Union[str, List[str]],
+        start: str = "2024-04-21",
+        end: str = "2025-04-21",
+        **kwargs,
+    ) -> List[Dict]:
+        """Obtain daily data like NceiAccessor.get_daily, fetching only what isn't
+        already held locally.
+
+        :param data_types: data type(s) of interest.
+        :param stations: station id(s).
+        :param start: beginning date of period of interest, defaults to "2024-04-21"
+        :param end: end date of period of interest, defaults to "2025-04-21"
+        :param kwargs: Passed on to NceiAccessor.get_daily for the missing ranges.
+        :return: List of daily rows, ordered by station and date.
+        """
+        self.update(data_types, stations, start, end, **kwargs)
+        return self.read(data_types, stations, start, end)
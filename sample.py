@@ -21,6 +21,7 @@ daily_test = fdsa.get_daily(
     stations=closest_test.station_id,
     start="1970-04-21",
     end="2025-04-21",
+    chunk="decade",
 )
 # hilow_test = fdsa.get_daily_hilow('USS0010J52S')
 
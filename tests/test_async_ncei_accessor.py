@@ -0,0 +1,223 @@
+"""Tests for the asyncio AsyncRestAdapter and AsyncNceiAccessor classes."""
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from ncei_access.exceptions import NceiAccessException
+
+if aiohttp is not None:
+    from ncei_access.async_ncei_accessor import AsyncNceiAccessor
+    from ncei_access.async_rest_adapter import AsyncRestAdapter, encode_params
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.reason = "OK" if status == 200 else "Service Unavailable"
+        self.headers = headers or {}
+        self._body = body
+
+    async def read(self):
+        return json.dumps(self._body).encode()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None):
+        self.calls.append((url, params))
+        return self.responses.pop(0)
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncRestAdapter(unittest.IsolatedAsyncioTestCase):
+    def test_encode_params(self):
+        pairs = encode_params({"dataTypes": ["TMAX", "TMIN"], "limit": 1000})
+        self.assertEqual(
+            pairs, [("dataTypes", "TMAX"), ("dataTypes", "TMIN"), ("limit", "1000")]
+        )
+
+    async def test_get_search_endpoint(self):
+        session = FakeSession([FakeResponse(200, {"results": [{"foo": "baz"}]})])
+        adapter = AsyncRestAdapter(session=session)
+        result = await adapter.get(endpoint="search/v1/data", ep_params={})
+        self.assertEqual(result.data, [{"foo": "baz"}])
+
+    @patch("ncei_access.async_rest_adapter.asyncio.sleep", new_callable=AsyncMock)
+    async def test_retry_then_success(self, mock_sleep):
+        session = FakeSession(
+            [
+                FakeResponse(503, headers={"Retry-After": "2"}),
+                FakeResponse(200, [{"foo": "bar"}]),
+            ]
+        )
+        adapter = AsyncRestAdapter(session=session)
+        result = await adapter.get(endpoint="data/v1/", ep_params={})
+        self.assertEqual(result.data, [{"foo": "bar"}])
+        mock_sleep.assert_awaited_once_with(2.0)
+        self.assertIn(("format", "json"), session.calls[0][1])
+
+    async def test_http_error(self):
+        session = FakeSession([FakeResponse(400, {})])
+        adapter = AsyncRestAdapter(session=session)
+        with self.assertRaises(NceiAccessException):
+            await adapter.get(endpoint="data/v1/", ep_params={})
+
+    async def test_cache_and_limiter_run_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def record(value):
+            def call(*args):  # pylint: disable=unused-argument
+                threads.append(threading.get_ident())
+                return value
+
+            return call
+
+        cache = MagicMock()
+        cache.get.side_effect = record(None)
+        cache.set.side_effect = record(None)
+        limiter = MagicMock()
+        limiter.reserve.side_effect = record(0.0)
+        limiter.feedback.side_effect = record(None)
+        adapter = AsyncRestAdapter(
+            session=FakeSession([FakeResponse(200, [])]),
+            cache=cache,
+            rate_limiter=limiter,
+        )
+        await adapter.get(ep_params={})
+        self.assertEqual(len(threads), 4)
+        self.assertNotIn(loop_thread, threads)
+
+    async def test_concurrency_is_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        async def slow_send(full_url, ep_params, event=None):  # pylint: disable=unused-argument
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 200, "OK", []
+
+        adapter = AsyncRestAdapter(session=FakeSession([]), max_concurrency=3)
+        adapter._send = slow_send  # pylint: disable=protected-access
+        await asyncio.gather(
+            *(adapter.get(ep_params={"stations": [str(i)]}) for i in range(10))
+        )
+        self.assertEqual(peak, 3)
+
+    async def test_identical_requests_are_coalesced(self):
+        sent = []
+
+        async def slow_send(full_url, ep_params, event=None):  # pylint: disable=unused-argument
+            sent.append((full_url, ep_params))
+            await asyncio.sleep(0.01)
+            return 200, "OK", [{"foo": "bar"}]
+
+        adapter = AsyncRestAdapter(session=FakeSession([]))
+        adapter._send = slow_send  # pylint: disable=protected-access
+        results = await asyncio.gather(
+            *(adapter.get(ep_params={"stations": ["A", "B"]}) for _ in range(4)),
+            adapter.get(ep_params={"stations": ["B", "A"]}),
+            adapter.get(ep_params={"stations": ["C"]}),
+        )
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(adapter.coalesced, 4)
+        self.assertTrue(all(r is results[0] for r in results[:5]))
+
+        # Once finished, the same request is sent again.
+        await adapter.get(ep_params={"stations": ["A", "B"]})
+        self.assertEqual(len(sent), 3)
+
+    async def test_coalesced_failure(self):
+        async def failing_send(full_url, ep_params, event=None):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.01)
+            return 500, "Server Error", None
+
+        adapter = AsyncRestAdapter(session=FakeSession([]), retries=0)
+        adapter._send = failing_send  # pylint: disable=protected-access
+        results = await asyncio.gather(
+            adapter.get(), adapter.get(), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, NceiAccessException) for r in results))
+        self.assertEqual(adapter.coalesced, 1)
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class TestAsyncNceiAccessor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.mock_adapter = MagicMock()
+        self.mock_adapter.get = AsyncMock()
+        self.accessor = AsyncNceiAccessor(rest_adapter=self.mock_adapter)
+
+    async def test_get_daily(self):
+        self.mock_adapter.get.return_value = MagicMock(data=[{"foo": "bar"}])
+        result = await self.accessor.get_daily("TMAX", "STATION1")
+        self.assertEqual(result, [{"foo": "bar"}])
+        params = self.mock_adapter.get.call_args.kwargs["ep_params"]
+        self.assertEqual(params["stations"], ["STATION1"])
+
+    async def test_find_closest_station(self):
+        self.mock_adapter.get.return_value = MagicMock(
+            data=[
+                {
+                    "stations": [{"name": "Far", "id": "ID1", "dataTypes": []}],
+                    "location": {"coordinates": [-110.4, 40.4]},
+                },
+                {
+                    "stations": [{"name": "Near", "id": "ID2", "dataTypes": []}],
+                    "location": {"coordinates": [-110.0, 40.1]},
+                },
+            ]
+        )
+        station = await self.accessor.find_closest_station(40.0, -110.0)
+        self.assertEqual(station.station_id, "ID2")
+
+    async def test_stations_in_boundary_splits_full_searches(self):
+        def result(i):
+            return {
+                "stations": [{"name": f"S{i}", "id": f"S{i}", "dataTypes": []}],
+                "location": {"coordinates": [float(i), float(i)]},
+            }
+
+        # The whole box is full, each quadrant is not; S0 shows up twice.
+        self.mock_adapter.get.side_effect = [
+            MagicMock(data=[result(0), result(1), result(2)]),
+            MagicMock(data=[result(0), result(1)]),
+            MagicMock(data=[result(0), result(3)]),
+            MagicMock(data=[]),
+            MagicMock(data=[result(4)]),
+        ]
+        with patch("ncei_access.ncei_accessor.SEARCH_LIMIT", 3):
+            stations = await self.accessor.stations_in_boundary(4, 0, 0, 4)
+        self.assertEqual(
+            sorted(s.station_id for s in stations), ["S0", "S1", "S2", "S3", "S4"]
+        )
+        self.assertEqual(self.mock_adapter.get.call_count, 5)
+
+    async def test_find_station_missing(self):
+        self.mock_adapter.get.return_value = MagicMock(data=[])
+        self.assertIsNone(await self.accessor.find_station("NOPE"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for the stand-in NCEI server and the helpers of the benchmark suite."""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from benchmarks.run import main, regressions
+from benchmarks.stub_server import StubConfig, StubServer, station_grid
+from ncei_access.models import filter_stations
+from ncei_access.ncei_accessor import NceiAccessor
+
+
+class TestStubServer(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(
+            StubConfig(), stations=station_grid(spacing=1.0, north=40.0, south=35.0)
+        )
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+
+    def test_get_daily(self):
+        ncei_db = NceiAccessor(rest_adapter=self.server.rest_adapter())
+        rows = ncei_db.get_daily(
+            ["TMAX", "PRCP"], ["A", "B"], "2020-12-01", "2021-01-31", chunk="year"
+        )
+        self.assertEqual(len(rows), 62 * 2)
+        self.assertEqual(set(rows[0]), {"DATE", "STATION", "TMAX", "PRCP"})
+        self.assertEqual(self.server.config.requests, 2)
+
+    def test_find_closest_station(self):
+        ncei_db = NceiAccessor(rest_adapter=self.server.rest_adapter())
+        station = ncei_db.find_closest_station(37.1, -100.9, data_type="TMAX")
+        self.assertEqual(station.station_id, "USC00020024")
+
+    def test_fixture_coverage_is_in_percent(self):
+        ncei_db = NceiAccessor(rest_adapter=self.server.rest_adapter())
+        stations = ncei_db.stations_in_boundary(40.0, -101.0, 39.0, -100.0)
+        self.assertTrue(stations)
+        self.assertEqual(
+            filter_stations(stations, ["TMAX", "TMIN"], min_coverage=90), stations
+        )
+
+    def test_throttled_requests_are_retried(self):
+        self.server.config.error_rate = 0.5
+        ncei_db = NceiAccessor(
+            rest_adapter=self.server.rest_adapter(retries=10, backoff_factor=0)
+        )
+        rows = ncei_db.get_daily("TMAX", "A", "2000-01-01", "2004-12-31", chunk="year")
+        self.assertEqual(len(rows), 366 * 2 + 365 * 3)
+        self.assertGreater(self.server.config.throttled, 0)
+
+
+class TestRegressions(unittest.TestCase):
+    def test_direction_and_tolerance(self):
+        baseline = {"a_s": 1.0, "b_rows_per_s": 100.0, "c_ms": 10.0, "count": 3}
+        current = {"a_s": 1.2, "b_rows_per_s": 70.0, "c_ms": 5.0, "count": 9}
+        worse = regressions(current, baseline, tolerance=0.25)
+        self.assertEqual(len(worse), 1)
+        self.assertTrue(worse[0].startswith("b_rows_per_s"))
+
+    def test_only_compares_on_same_machine(self):
+        current = {"machine": {"cpu": "A", "cpu_count": 8}, "results": {"a_s": 2.0}}
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = Path(tmp) / "baseline.json"
+            with patch("benchmarks.run.run", return_value=current), patch(
+                "builtins.print"
+            ):
+                for machine, force, status in (
+                    ({"cpu": "A", "cpu_count": 8}, False, 1),
+                    ({"cpu": "B", "cpu_count": 8}, False, 0),
+                    ({"cpu": "B", "cpu_count": 8}, True, 1),
+                    (None, False, 0),
+                ):
+                    document = {"results": {"a_s": 1.0}}
+                    if machine is not None:
+                        document["machine"] = machine
+                    baseline.write_text(json.dumps(document), encoding="utf-8")
+                    args = ["--compare", str(baseline)] + (["--force"] if force else [])
+                    self.assertEqual(main(args), status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for the ncei_access.cache module."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from ncei_access.cache import ResponseCache, request_key
+from ncei_access.models import Result
+from ncei_access.rest_adapter import RestAdapter
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache = ResponseCache(path=Path(self.tmp.name) / "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_request_key_is_normalized(self):
+        self.assertEqual(
+            request_key("data/v1/", {"stations": ["B", "A"], "limit": 1}),
+            request_key("data/v1", {"limit": "1", "stations": ["A", "B"]}),
+        )
+        self.assertNotEqual(
+            request_key("data/v1/", {"stations": ["A"]}),
+            request_key("data/v1/", {"stations": ["B"]}),
+        )
+
+    def test_round_trip(self):
+        params = {"stations": ["A"], "endDate": "2000-01-01"}
+        self.assertIsNone(self.cache.get("data/v1/", params))
+        self.cache.set("data/v1/", params, Result(200, "OK", [{"DATE": "2000-01-01"}]))
+        cached = self.cache.get("data/v1/", params)
+        self.assertEqual(cached.data, [{"DATE": "2000-01-01"}])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_ttls(self):
+        self.assertIsNone(self.cache.ttl_for("data/v1/", {"endDate": "1990-12-31"}))
+        self.assertEqual(self.cache.ttl_for("data/v1/", {"endDate": "2999-12-31"}), 7 * 86400)
+        self.assertEqual(self.cache.ttl_for("search/v1/data", {}), 86400)
+
+    def test_expired_entry_is_a_miss(self):
+        params = {"bbox": "1,2,3,4"}
+        with patch("ncei_access.cache.time.time", return_value=0):
+            self.cache.set("search/v1/data", params, Result(200, "OK", []))
+        self.assertIsNone(self.cache.get("search/v1/data", params))
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 0
+        self.cache.set("data/v1/", {"endDate": "1990-01-01"}, Result(200, "OK", [{}]))
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_running_size_total(self):
+        def table_size():
+            conn = self.cache._connect()  # pylint: disable=protected-access
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]  # fmt: skip
+
+        for i in range(3):
+            self.cache.set("data/v1/", {"stations": [str(i)]}, Result(200, "OK", [{}]))
+        # Replacing an entry swaps its size in the total instead of adding to it.
+        bigger = Result(200, "OK", [{"a": 1}] * 50)
+        self.cache.set("data/v1/", {"stations": ["0"]}, bigger)
+        self.assertEqual(self.cache.size(), table_size())
+        self.assertGreater(self.cache.size(), 0)
+
+        reopened = ResponseCache(path=self.cache.path)
+        self.assertEqual(reopened.size(), table_size())
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_rest_adapter_uses_cache(self):
+        adapter = RestAdapter(cache=self.cache)
+        response = MagicMock(status_code=200, reason="OK")
+        response.content = b'[{"foo": "bar"}]'
+        with patch.object(adapter._session, "get", return_value=response) as mock_get:  # pylint: disable=protected-access
+            params = {"stations": ["A"], "endDate": "1990-01-01"}
+            first = adapter.get(endpoint="data/v1/", ep_params=dict(params))
+            second = adapter.get(endpoint="data/v1/", ep_params=dict(params))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first.data, second.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for the ncei_access.catalog and ncei_access.spatial modules."""
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+from ncei_access.catalog import StationCatalog
+from ncei_access.models import Station
+from ncei_access.ncei_accessor import NceiAccessor
+from ncei_access.spatial import SphereIndex
+
+TYPES = [{"id": "TMAX", "startDate": "2000-01-01T00:00:00", "endDate": "2025-01-01T23:59:59"}]
+
+
+class TestSphereIndex(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        coords = [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(2000)]
+        index = SphereIndex(coords)
+        stations = [Station(lat=lat, lon=lon) for lat, lon in coords]
+        for _ in range(20):
+            lat, lon = rng.uniform(-80, 80), rng.uniform(-180, 180)
+            brute = sorted((s.distance_to(lat, lon), i) for i, s in enumerate(stations))
+            found = index.nearest(lat, lon, k=5)
+            self.assertEqual([i for _, i in found], [i for _, i in brute[:5]])
+            self.assertAlmostEqual(found[0][0], brute[0][0], places=6)
+            within = index.within(lat, lon, 500)
+            self.assertEqual([i for _, i in within], [i for d, i in brute if d <= 500])
+
+    def test_antimeridian(self):
+        index = SphereIndex([(0.0, 179.9), (0.0, 170.0)])
+        self.assertEqual(index.nearest(0.0, -179.9)[0][1], 0)
+
+
+class TestStationCatalog(unittest.TestCase):
+    def setUp(self):
+        self.stations = [
+            Station("Near", "ID1", 40.1, -110.0, []),
+            Station("Mid", "ID2", 40.3, -110.0, TYPES),
+            Station("Far", "ID3", 42.0, -110.0, TYPES),
+        ]
+        self.catalog = StationCatalog(self.stations, bounds=[(43, -111, 39, -109)])
+
+    def test_queries(self):
+        self.assertEqual(self.catalog.closest(40.0, -110.0).station_id, "ID1")
+        self.assertEqual(
+            self.catalog.closest(40.0, -110.0, data_type="TMAX").station_id, "ID2"
+        )
+        self.assertIsNone(
+            self.catalog.closest(40.0, -110.0, data_type="TMAX", start_date="1990-01-01")
+        )
+        self.assertEqual(len(self.catalog.nearest(40.0, -110.0, k=2)), 2)
+        self.assertEqual(
+            [s.station_id for s, _ in self.catalog.within(40.0, -110.0, 50)],
+            ["ID1", "ID2"],
+        )
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "catalog.json.gz"
+            self.catalog.save(path)
+            loaded = StationCatalog.load(path)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.get("ID2").data_types, TYPES)
+        self.assertEqual(loaded.bounds, [(43, -111, 39, -109)])
+        self.assertFalse(loaded.is_stale())
+
+    def test_refresh(self):
+        accessor = MagicMock()
+        accessor.stations_in_boundary.return_value = self.stations[:1]
+        self.catalog.refresh(accessor)
+        accessor.stations_in_boundary.assert_called_once_with(43, -111, 39, -109)
+        self.assertEqual(len(self.catalog), 1)
+
+    def test_accessor_uses_catalog(self):
+        accessor = NceiAccessor(catalog=self.catalog)
+        accessor._rest_adapter = MagicMock()  # pylint: disable=protected-access
+        station = accessor.find_closest_station(42.1, -110.0)
+        self.assertEqual(station.station_id, "ID3")
+        accessor._rest_adapter.get.assert_not_called()  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+    unittest.main()
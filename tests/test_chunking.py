@@ -0,0 +1,98 @@
+"""Tests for the ncei_access.chunking module."""
+import unittest
+from ncei_access.chunking import (
+    batch_stations,
+    merge_daily_rows,
+    shard_stations,
+    split_date_range,
+)
+
+
+class TestSplitDateRange(unittest.TestCase):
+    def test_year_chunks(self):
+        self.assertEqual(
+            split_date_range("1999-06-15", "2001-02-01", "year"),
+            [
+                ("1999-06-15", "1999-12-31"),
+                ("2000-01-01", "2000-12-31"),
+                ("2001-01-01", "2001-02-01"),
+            ],
+        )
+
+    def test_decade_chunks(self):
+        chunks = split_date_range("1970-04-21", "2025-04-21", "decade")
+        self.assertEqual(chunks[0], ("1970-04-21", "1979-12-31"))
+        self.assertEqual(chunks[-1], ("2020-01-01", "2025-04-21"))
+        self.assertEqual(len(chunks), 6)
+
+    def test_month_and_day_chunks(self):
+        self.assertEqual(
+            split_date_range("2024-12-20", "2025-01-10", "month"),
+            [("2024-12-20", "2024-12-31"), ("2025-01-01", "2025-01-10")],
+        )
+        self.assertEqual(
+            split_date_range("2024-01-01T00:00:00", "2024-01-05", 2),
+            [
+                ("2024-01-01", "2024-01-02"),
+                ("2024-01-03", "2024-01-04"),
+                ("2024-01-05", "2024-01-05"),
+            ],
+        )
+
+    def test_bad_chunk(self):
+        with self.assertRaises(ValueError):
+            split_date_range("2024-01-01", "2024-02-01", "fortnight")
+        self.assertEqual(split_date_range("2024-02-01", "2024-01-01", "year"), [])
+
+
+class TestBatchStations(unittest.TestCase):
+    def test_single_station(self):
+        self.assertEqual(batch_stations("USS0010J52S"), [["USS0010J52S"]])
+
+    def test_batch_size(self):
+        stations = [f"US{i:09d}" for i in range(10)]
+        batches = batch_stations(stations, batch_size=4)
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+        self.assertEqual(sum(batches, []), stations)
+
+    def test_url_budget(self):
+        stations = [f"US{i:09d}" for i in range(5000)]
+        batches = batch_stations(stations, max_chars=2100)
+        self.assertTrue(all(len(b) * 21 <= 2100 for b in batches))
+        self.assertEqual(sum(batches, []), stations)
+
+
+class TestShardStations(unittest.TestCase):
+    def test_shards_partition_stations(self):
+        stations = [f"USC{i:08d}" for i in range(200)]
+        shards = [shard_stations(stations, i, 3) for i in (1, 2, 3)]
+        self.assertEqual(sorted(sum(shards, [])), stations)
+        self.assertTrue(all(shards))
+        # A station's shard doesn't depend on the order or the other stations.
+        self.assertEqual(shard_stations(stations[::-1], 2, 3), shards[1][::-1])
+        self.assertEqual(shard_stations(stations, 1, 1), stations)
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            shard_stations(["A"], 0, 2)
+        with self.assertRaises(ValueError):
+            shard_stations(["A"], 3, 2)
+
+
+class TestMergeDailyRows(unittest.TestCase):
+    def test_merge_orders_and_dedupes(self):
+        parts = [
+            [{"STATION": "B", "DATE": "2001-01-01"}, {"STATION": "A", "DATE": "2001-01-01"}],
+            [{"STATION": "A", "DATE": "2000-01-01", "TMAX": "1"}],
+            [{"STATION": "A", "DATE": "2000-01-01", "TMIN": "0"}],
+        ]
+        rows = merge_daily_rows(parts)
+        self.assertEqual(
+            [(r["STATION"], r["DATE"]) for r in rows],
+            [("A", "2000-01-01"), ("A", "2001-01-01"), ("B", "2001-01-01")],
+        )
+        self.assertEqual(rows[0], {"STATION": "A", "DATE": "2000-01-01", "TMAX": "1", "TMIN": "0"})
+
+
+if __name__ == "__main__":
+    unittest.main()
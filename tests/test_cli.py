@@ -0,0 +1,194 @@
+"""Tests for the ncei_access.cli module."""
+import csv
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from ncei_access.cli import load_job, main, parse_shard
+from ncei_access.exceptions import NceiAccessException
+
+STATIONS = ["USC00000001", "USC00000002", "USC00000003", "USC00000004"]
+
+
+def _fake_get(endpoint="data/v1/", ep_params=None):
+    """A daily row for every requested station and day."""
+    day = date.fromisoformat(ep_params["startDate"])
+    end = date.fromisoformat(ep_params["endDate"])
+    rows = []
+    while day <= end:
+        for station in ep_params["stations"]:
+            rows.append({"DATE": day.isoformat(), "STATION": station, "TMAX": "100"})
+        day += timedelta(days=1)
+    return MagicMock(data=rows)
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = Path(tmp.name) / "out"
+        self.job = Path(tmp.name) / "job.json"
+        self.job.write_text(
+            json.dumps(
+                {
+                    "stations": STATIONS,
+                    "data_types": ["TMAX"],
+                    "start": "2020-12-31",
+                    "end": "2021-01-01",
+                    "format": "csv",
+                }
+            )
+        )
+        self.adapter = MagicMock()
+        self.adapter.get.side_effect = _fake_get
+        patcher = patch(
+            "ncei_access.ncei_accessor.RestAdapter", return_value=self.adapter
+        )
+        self.rest_adapter = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _main(self, *args):
+        with patch("sys.stdout"):
+            return main(["download", "--job", str(self.job), "--out", str(self.out)] + list(args))  # fmt: skip
+
+    def test_shards_and_resume(self):
+        self.assertEqual(self._main("--shard", "1/2"), 0)
+        first = self.adapter.get.call_count
+        self.assertEqual(self._main("--shard", "2/2"), 0)
+        self.assertEqual(self.adapter.get.call_count, 4)
+        self.assertGreater(first, 0)
+
+        for station in STATIONS:
+            path = self.out / f"STATION={station}" / "YEAR=2021" / "data.csv"
+            with open(path, newline="", encoding="utf-8") as f:
+                self.assertEqual(
+                    list(csv.DictReader(f)), [{"DATE": "2021-01-01", "TMAX": "100"}]
+                )
+        self.assertTrue((self.out / "_job.json").exists())
+        self.assertEqual(len(list(self.out.glob("_manifest.shard-*-of-2.jsonl"))), 2)
+
+        # Every chunk is in a manifest, so running again fetches nothing.
+        self.adapter.get.reset_mock()
+        self.assertEqual(self._main("--shard", "1/2"), 0)
+        self.assertEqual(self._main("--shard", "2/2"), 0)
+        self.adapter.get.assert_not_called()
+
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(main(["status", str(self.out)]), 0)
+        self.assertEqual(
+            json.loads(mock_print.call_args[0][0]),
+            {"manifests": 2, "station_years": 8, "rows": 8},
+        )
+
+    def test_status_counts_chunks_once(self):
+        self.assertEqual(self._main("--shard", "1/2"), 0)
+        self.assertEqual(self._main("--shard", "2/2"), 0)
+        # Running again with another shard count writes the chunks to new manifests.
+        self.assertEqual(self._main("--shard", "1/1"), 0)
+        with patch("builtins.print") as mock_print:
+            self.assertEqual(main(["status", str(self.out)]), 0)
+        self.assertEqual(
+            json.loads(mock_print.call_args[0][0]),
+            {"manifests": 3, "station_years": 8, "rows": 8},
+        )
+
+    def test_bbox_is_resolved_once(self):
+        def search_get(endpoint="data/v1/", ep_params=None):
+            if endpoint != "search/v1/data":
+                return _fake_get(endpoint, ep_params)
+            return MagicMock(
+                data=[
+                    {
+                        "stations": [{"name": station_id, "id": station_id, "dataTypes": [{"id": "TMAX", "startDate": "1990-01-01T00:00:00", "endDate": end}]}],  # fmt: skip
+                        "location": {"coordinates": [-110.7, 40.7]},
+                    }
+                    for station_id, end in found
+                ]
+            )
+
+        found = [("OPEN", "2021-06-30T23:59:59"), ("CLOSED", "2000-12-31T23:59:59")]
+        self.adapter.get.side_effect = search_get
+        self.job.write_text(
+            json.dumps(
+                {
+                    "bbox": [41, -111, 40.5, -110.5],
+                    "data_types": ["TMAX"],
+                    "start": "2020-12-31",
+                    "end": "2021-01-01",
+                    "format": "csv",
+                }
+            )
+        )
+        self.assertEqual(self._main("--shard", "1/2", "--dry-run"), 0)
+        search = [
+            c.kwargs["ep_params"]
+            for c in self.adapter.get.call_args_list
+            if c.kwargs["endpoint"] == "search/v1/data"
+        ]
+        self.assertEqual(
+            (search[0]["startDate"], search[0]["endDate"]), ("2020-12-31", "2021-01-01")
+        )
+        saved = json.loads((self.out / "_job.json").read_text())
+        self.assertEqual(saved["resolved_stations"], ["OPEN"])
+
+        # Later runs take the saved stations whatever a search would find now.
+        found = [("NEW", "2021-06-30T23:59:59")]
+        self.adapter.get.reset_mock()
+        self.assertEqual(self._main(), 0)
+        self.assertEqual(
+            {c.kwargs["endpoint"] for c in self.adapter.get.call_args_list}, {"data/v1/"}
+        )
+        self.assertTrue((self.out / "STATION=OPEN").exists())
+        self.assertFalse((self.out / "STATION=NEW").exists())
+
+    def test_workers_size_the_connection_pool(self):
+        self.assertEqual(self._main("--workers", "16"), 0)
+        self.assertEqual(self.rest_adapter.call_args.kwargs["pool_maxsize"], 16)
+
+    def test_flags_override_job(self):
+        self.assertEqual(self._main("--format", "jsonl", "--stations", "X"), 0)
+        lines = (self.out / "STATION=X" / "YEAR=2020" / "data.jsonl").read_text()
+        self.assertEqual(
+            [json.loads(line) for line in lines.splitlines()],
+            [{"DATE": "2020-12-31", "TMAX": "100"}],
+        )
+
+    def test_different_job_in_same_directory(self):
+        self.assertEqual(self._main(), 0)
+        with self.assertLogs("ncei_access.cli", "ERROR"):
+            self.assertEqual(self._main("--end", "2021-12-31"), 1)
+
+
+class TestJobSpec(unittest.TestCase):
+    def test_load_job(self):
+        job = load_job(
+            None,
+            {"bbox": [41, -111, 40.5, -110.5], "data_types": "TMAX", "start": "2020-01-01", "end": "2020-12-31"},  # fmt: skip
+        )
+        self.assertEqual(job["data_types"], ["TMAX"])
+        self.assertEqual((job["format"], job["station_batch_size"]), ("parquet", 10))
+
+    def test_invalid_jobs(self):
+        dates = {"data_types": ["TMAX"], "start": "2020-01-01", "end": "2020-12-31"}
+        for overrides in (
+            dates,
+            dict(dates, stations=["A"], bbox=[1, 2, 3, 4]),
+            dict(dates, bbox=[1, 2, 3]),
+            dict(dates, stations=["A"], format="xlsx"),
+            {"stations": ["A"], "data_types": ["TMAX"]},
+        ):
+            with self.assertRaises(NceiAccessException):
+                load_job(None, overrides)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+
+if __name__ == "__main__":
+    unittest.main()
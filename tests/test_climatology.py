@@ -0,0 +1,166 @@
+"""Tests for the ncei_access.climatology module."""
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _daily(stations, start, end, values):
+    """DailyColumns with every day from start to end (inclusive) for each station and
+    values(station index, dates) giving each data type's scaled values."""
+    from ncei_access.columnar import DailyColumns  # pylint: disable=import-outside-toplevel
+
+    days = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    date = np.tile(days, len(stations))
+    codes = np.repeat(np.arange(len(stations), dtype=np.int32), len(days))
+    columns = {}
+    for data_type, func in values.items():
+        columns[data_type] = np.concatenate(
+            [func(i, days) for i in range(len(stations))]
+        ).astype(np.float64)
+    units = {"TMAX": "celsius", "TMIN": "celsius", "PRCP": "millimeters"}
+    return DailyColumns(date, codes, np.array(stations), columns, units=units)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestAggregate(unittest.TestCase):
+    def setUp(self):
+        self.daily = _daily(
+            ["S1", "S2"],
+            "2000-01-01",
+            "2001-12-31",
+            {
+                "TMIN": lambda i, d: np.where(
+                    d.astype("datetime64[M]").astype(int) % 12 == 0, -5.0, 5.0
+                )
+                + i,
+                "PRCP": lambda i, d: np.ones(len(d)),
+            },
+        )
+
+    def test_monthly_defaults(self):
+        from ncei_access.climatology import aggregate  # pylint: disable=import-outside-toplevel
+
+        monthly = aggregate(self.daily)
+        self.assertEqual(len(monthly), 2 * 24)
+        self.assertEqual(
+            set(monthly.values),
+            {"TMIN_count", "TMIN_mean", "TMIN_min", "TMIN_max", "TMIN_freeze_days",
+             "PRCP_count", "PRCP_sum"},
+        )  # fmt: skip
+        first = (monthly.station == "S1") & (monthly.year == 2000)
+        np.testing.assert_array_equal(monthly.subperiod[first], np.arange(1, 13))
+        february = first & (monthly.subperiod == 2)
+        self.assertEqual(monthly.days[february][0], 29)
+        self.assertEqual(monthly.values["PRCP_sum"][february][0], 29.0)
+        january = first & (monthly.subperiod == 1)
+        self.assertEqual(monthly.values["TMIN_freeze_days"][january][0], 31)
+        self.assertEqual(monthly.values["TMIN_mean"][january][0], -5.0)
+        self.assertEqual(monthly.units["TMIN_freeze_days"], "days")
+        self.assertEqual(monthly.units["PRCP_sum"], "millimeters")
+
+    def test_default_statistics(self):
+        from ncei_access.climatology import default_statistics  # pylint: disable=import-outside-toplevel
+
+        for data_type in ("SNWD", "WESD", "THIC"):
+            self.assertEqual(default_statistics(data_type), ["max"])
+        for data_type in ("PRCP", "SNOW", "WESF"):
+            self.assertEqual(default_statistics(data_type), ["sum"])
+        self.assertEqual(default_statistics("AWND"), ["mean"])
+
+    def test_missing_data_threshold(self):
+        from ncei_access.climatology import aggregate  # pylint: disable=import-outside-toplevel
+
+        values = self.daily.values["PRCP"]
+        values[:20] = np.nan  # S1, January 2000: 11 of 31 days left
+        yearly = aggregate(self.daily, period="year", min_coverage=0.9)
+        monthly = aggregate(self.daily, period="month", min_coverage=0.9)
+        self.assertEqual(yearly.values["PRCP_sum"][0], 366 - 20)
+        self.assertTrue(np.isnan(monthly.values["PRCP_sum"][0]))
+        self.assertEqual(monthly.values["PRCP_count"][0], 11)
+
+    def test_season_and_water_year_labels(self):
+        from ncei_access.climatology import aggregate  # pylint: disable=import-outside-toplevel
+
+        seasons = aggregate(self.daily, period="season", statistics={"PRCP": ["sum"]})
+        s1 = seasons.station == "S1"
+        # January and February 2000 only: DJF 2000 is incomplete, DJF 2001 is whole.
+        self.assertEqual(list(seasons.year[s1][:2]), [2000, 2000])
+        self.assertEqual(list(seasons.subperiod[s1][:2]), [1, 2])
+        self.assertTrue(np.isnan(seasons.values["PRCP_sum"][s1][0]))
+        djf_2001 = s1 & (seasons.year == 2001) & (seasons.subperiod == 1)
+        self.assertEqual(seasons.days[djf_2001][0], 31 + 31 + 28)
+
+        water = aggregate(self.daily, period="water_year")
+        self.assertEqual(sorted(set(water.year)), [2000, 2001, 2002])
+        self.assertEqual(water.days[water.year == 2001][0], 365)
+
+    def test_unscaled_values_are_converted(self):
+        from ncei_access.climatology import aggregate  # pylint: disable=import-outside-toplevel
+        from ncei_access.columnar import DailyColumns  # pylint: disable=import-outside-toplevel
+
+        rows = [
+            {"DATE": f"2000-01-{d:02d}", "STATION": "S1", "TMAX": "105"}
+            for d in range(1, 32)
+        ]
+        monthly = aggregate(DailyColumns.from_rows(rows, scale=False))
+        self.assertAlmostEqual(monthly.values["TMAX_mean"][0], 10.5)
+        self.assertEqual(monthly.units["TMAX_mean"], "celsius")
+
+    def test_unknown_statistic(self):
+        from ncei_access.climatology import aggregate  # pylint: disable=import-outside-toplevel
+
+        with self.assertRaises(ValueError):
+            aggregate(self.daily, statistics={"PRCP": ["median"]})
+        with self.assertRaises(ValueError):
+            aggregate(self.daily, period="decade")
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestRollingNormals(unittest.TestCase):
+    def test_normals(self):
+        from ncei_access.climatology import Aggregates, rolling_normals  # pylint: disable=import-outside-toplevel
+
+        years = np.arange(1990, 2000)
+        values = (years - 1990).astype(np.float64)
+        values[3] = np.nan
+        annual = Aggregates(
+            "year",
+            np.array(["S1"]),
+            np.zeros(10, dtype=np.int32),
+            years,
+            np.zeros(10, dtype=np.int64),
+            {"PRCP_sum": values, "PRCP_count": np.full(10, 365.0)},
+            units={"PRCP_sum": "millimeters"},
+        )
+        normals = rolling_normals(annual, window=5, min_fraction=0.8)
+        self.assertEqual(list(normals.year), list(range(1994, 2000)))
+        self.assertEqual(set(normals.values), {"PRCP_sum"})
+        # 1990-1994 without 1993: (0 + 1 + 2 + 4) / 4
+        self.assertEqual(normals.values["PRCP_sum"][0], 7 / 4)
+        self.assertEqual(normals.values["PRCP_sum"][-1], 7.0)
+        self.assertEqual(normals.units["PRCP_sum"], "millimeters")
+
+        self.assertEqual(len(rolling_normals(annual, window=30)), 0)
+
+    def test_monthly_normals(self):
+        from ncei_access.climatology import aggregate, rolling_normals  # pylint: disable=import-outside-toplevel
+
+        daily = _daily(
+            ["S1", "S2", "S3"],
+            "1990-01-01",
+            "2019-12-31",
+            {"TMAX": lambda i, d: np.full(len(d), float(i))},
+        )
+        normals = rolling_normals(aggregate(daily), window=30)
+        self.assertEqual(len(normals), 3 * 12)
+        np.testing.assert_array_equal(normals.year, 2019)
+        np.testing.assert_array_equal(
+            normals.values["TMAX_mean"], np.repeat([0.0, 1.0, 2.0], 12)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
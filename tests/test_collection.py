@@ -0,0 +1,92 @@
+"""Tests for the ncei_access.collection module."""
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ncei_access.models import Station
+
+
+def make_stations():
+    return [
+        Station("A", "ID1", 40.1, -110.0, [
+            {"id": "TMAX", "startDate": "2000-01-01T00:00:00", "endDate": "2025-01-01T23:59:59", "coverage": 99.0},
+        ]),
+        Station("B", "ID2", 40.3, -110.0, [
+            {"id": "TMIN", "startDate": "1990-01-01T00:00:00", "endDate": "2025-01-01T23:59:59", "coverage": 80.0},
+            {"id": "TMAX", "startDate": "1990-01-01T00:00:00", "endDate": "2025-01-01T23:59:59", "coverage": 90.0},
+        ]),
+        Station("C", "ID3", 42.0, -110.0, []),
+    ]  # pylint: disable=line-too-long
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestStationCollection(unittest.TestCase):
+    def setUp(self):
+        from ncei_access.collection import StationCollection  # pylint: disable=import-outside-toplevel
+
+        self.stations = make_stations()
+        self.collection = StationCollection.from_stations(self.stations)
+
+    def test_distances_match_station(self):
+        distances = self.collection.distances(40.0, -110.5)
+        for station, distance in zip(self.stations, distances):
+            self.assertAlmostEqual(station.distance_to(40.0, -110.5), distance, places=6)
+
+    def test_distance_matrix(self):
+        matrix = self.collection.distance_matrix([40.0, 42.0], [-110.0, -110.0])
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertEqual(list(matrix.argmin(axis=1)), [0, 2])
+
+    def test_nearest_and_sort(self):
+        self.assertEqual(list(self.collection.nearest(42.1, -110.0, k=2)), [2, 1])
+        ordered = self.collection.sort_by_distance(42.1, -110.0)
+        self.assertEqual(list(ordered.ids), ["ID3", "ID2", "ID1"])
+
+    def test_has_data_type_mask(self):
+        for station, flag in zip(self.stations, self.collection.has_data_type("TMAX")):
+            self.assertEqual(station.has_data_type("TMAX"), flag)
+        self.assertEqual(
+            list(self.collection.has_data_type("TMAX", start_date="1995-01-01")),
+            [False, True, False],
+        )
+        self.assertEqual(
+            list(self.collection.has_data_type("TMAX", min_coverage=95)),
+            [True, False, False],
+        )
+        self.assertFalse(self.collection.has_data_type("PRCP").any())
+
+    def test_data_type_without_dates(self):
+        from ncei_access.collection import StationCollection  # pylint: disable=import-outside-toplevel
+
+        station = Station("D", "ID4", 40.0, -110.0, [
+            {"id": "TMAX", "startDate": None, "endDate": None},
+            {"id": "TMIN"},
+        ])  # fmt: skip
+        rebuilt = StationCollection.from_stations([station])[0]
+        self.assertEqual(
+            rebuilt.data_types,
+            [
+                {"id": "TMAX", "startDate": None, "endDate": None, "coverage": None},
+                {"id": "TMIN", "startDate": None, "endDate": None, "coverage": None},
+            ],
+        )
+        self.assertTrue(rebuilt.has_data_type("TMAX"))
+        self.assertIsNone(rebuilt.coverage["TMIN"].start)
+
+    def test_slicing(self):
+        subset = self.collection[np.array([False, True, True])]
+        self.assertEqual(list(subset.ids), ["ID2", "ID3"])
+        self.assertEqual(list(subset.has_data_type("TMIN")), [True, False])
+        station = subset[0]
+        self.assertIsInstance(station, Station)
+        self.assertEqual([d["id"] for d in station.data_types], ["TMIN", "TMAX"])
+        self.assertTrue(station.has_data_type("TMAX", "1990-01-01", "2025-01-01"))
+        self.assertEqual(len(self.collection[1:]), 2)
+        self.assertEqual(len(self.collection.to_stations()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests for the ncei_access.columnar module."""
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROWS = [
+    {"DATE": "2023-01-01", "STATION": "S2", "TMAX": "  -1", "SNWD": "1829"},
+    {"DATE": "2023-01-02", "STATION": "S2", "TMAX": "-53"},
+    {"DATE": "2023-01-01", "STATION": "S1", "TMAX": "", "SNWD": "10"},
+]
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestDailyColumns(unittest.TestCase):
+    def setUp(self):
+        from ncei_access.columnar import DailyColumns  # pylint: disable=import-outside-toplevel
+
+        self.columns = DailyColumns.from_rows(ROWS, ["TMAX", "SNWD"])
+
+    def test_types_and_scaling(self):
+        self.assertEqual(self.columns.date.dtype, np.dtype("datetime64[D]"))
+        np.testing.assert_allclose(self.columns.values["TMAX"][:2], [-0.1, -5.3])
+        self.assertTrue(np.isnan(self.columns.values["TMAX"][2]))
+        np.testing.assert_array_equal(self.columns.values["SNWD"][:2], [1829.0, np.nan])
+        self.assertEqual(self.columns.units["TMAX"], "celsius")
+
+    def test_station_categories(self):
+        self.assertEqual(list(self.columns.stations), ["S1", "S2"])
+        self.assertEqual(list(self.columns.station), ["S2", "S2", "S1"])
+
+    def test_unscaled_and_inferred_types(self):
+        from ncei_access.columnar import DailyColumns  # pylint: disable=import-outside-toplevel
+
+        columns = DailyColumns.from_rows(ROWS, scale=False)
+        self.assertEqual(list(columns.values), ["TMAX", "SNWD"])
+        self.assertEqual(columns.values["TMAX"][1], -53.0)
+
+    def test_to_pandas(self):
+        try:
+            import pandas as pd  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            self.skipTest("pandas is not installed")
+        frame = self.columns.to_pandas()
+        self.assertIsInstance(frame["STATION"].dtype, pd.CategoricalDtype)
+        self.assertEqual(len(frame), 3)
+
+    def test_to_arrow(self):
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            self.skipTest("pyarrow is not installed")
+        table = self.columns.to_arrow()
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.schema.field("TMAX").metadata, {b"units": b"celsius"})
+
+
+if __name__ == "__main__":
+    unittest.main()
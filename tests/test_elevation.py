@@ -0,0 +1,128 @@
+"""Tests for the ncei_access.elevation module."""
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+from ncei_access.catalog import StationCatalog
+from ncei_access.elevation import ElevationService
+from ncei_access.models import Station
+
+
+class TestElevationService(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.accessor = MagicMock(backend=None, catalog=None)
+        self.accessor.get_many.side_effect = self.fake_get_many
+        self.service = ElevationService(
+            accessor=self.accessor,
+            path=Path(self.tmp.name) / "elevations.sqlite",
+            station_batch_size=2,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def fake_get_many(param_list):
+        return [
+            [
+                {"STATION": s, "DATE": "2020-01-01", "ELEVATION": "100.0"}
+                for s in params["stations"]
+                if s != "NONE"
+            ]
+            + [
+                {"STATION": s, "DATE": "2020-01-02", "ELEVATION": "101.5"}
+                for s in params["stations"]
+                if s != "NONE"
+            ]
+            for params in param_list
+        ]
+
+    def test_batched_and_memoized(self):
+        elevations = self.service.get_many(["A", "B", "C", "NONE"])
+        self.assertEqual(
+            elevations, {"A": 101.5, "B": 101.5, "C": 101.5, "NONE": None}
+        )
+        calls = [c.args[0] for c in self.accessor.get_many.call_args_list]
+        self.assertEqual([p["stations"] for p in calls[0]], [["A", "B"], ["C", "NONE"]])
+        # Only the station without a record is asked again, over longer windows.
+        self.assertEqual(
+            [[p["stations"] for p in c] for c in calls[1:]], [[["NONE"]]] * 2
+        )
+        days = [
+            date.fromisoformat(c[0]["endDate"]) - date.fromisoformat(c[0]["startDate"])
+            for c in calls
+        ]
+        self.assertEqual([d.days + 1 for d in days], [31, 366, 3653])
+
+        self.accessor.get_many.reset_mock()
+        self.assertEqual(self.service.get("A"), 101.5)
+        self.assertIsNone(self.service.get("NONE"))
+        self.accessor.get_many.assert_not_called()
+
+    def test_window_ends_at_last_record(self):
+        station = Station(
+            station_id="OLD",
+            data_types=[
+                {"id": "ELEVATION", "startDate": "1990-01-01", "endDate": "2001-03-31"}
+            ],
+        )
+        self.assertEqual(self.service.get(station), 101.5)
+        (param_list,), _ = self.accessor.get_many.call_args
+        self.assertEqual(param_list[0]["startDate"], "2001-03-01")
+        self.assertEqual(param_list[0]["endDate"], "2001-03-31")
+
+    def test_old_record_found_by_wider_window(self):
+        def fake_get_many(param_list):
+            start = param_list[0]["startDate"]
+            if date.fromisoformat(start) > date.today() - timedelta(days=1000):
+                return [[] for _ in param_list]
+            return [[{"STATION": "OLD", "DATE": start, "ELEVATION": "7.5"}]]
+
+        self.accessor.get_many.side_effect = fake_get_many
+        self.assertEqual(self.service.get("OLD"), 7.5)
+        self.assertEqual(self.accessor.get_many.call_count, 3)
+
+    def test_window_from_catalog(self):
+        self.accessor.catalog = StationCatalog(
+            [
+                Station(
+                    station_id="OLD",
+                    data_types=[
+                        {"id": "ELEVATION", "startDate": "1990-01-01", "endDate": "2001-03-31"}  # fmt: skip
+                    ],
+                )
+            ]
+        )
+        self.assertEqual(self.service.get("OLD"), 101.5)
+        (param_list,), _ = self.accessor.get_many.call_args
+        self.assertEqual(param_list[0]["endDate"], "2001-03-31")
+        self.accessor.get_many.assert_called_once()
+
+    def test_station_elevation_uses_service(self):
+        station = Station(station_id="A")
+        self.assertEqual(station.elevation(service=self.service), 101.5)
+
+    def test_backend_elevations(self):
+        self.accessor.backend = MagicMock()
+        self.accessor.backend.elevations.return_value = {"A": 1509.0, "B": None}
+        self.assertEqual(
+            self.service.get_many(["A", "B", "C"]), {"A": 1509.0, "B": None, "C": None}
+        )
+        self.accessor.get_many.assert_not_called()
+
+    def test_backend_daily_data(self):
+        self.accessor.backend = MagicMock(spec=["get_daily"])
+        self.accessor.backend.get_daily.side_effect = (
+            lambda data_types, stations, start, end: self.fake_get_many(
+                [{"stations": stations}]
+            )[0]
+        )
+        self.assertEqual(self.service.get_many(["A", "B", "C"])["C"], 101.5)
+        self.assertEqual(self.accessor.backend.get_daily.call_count, 2)
+        self.accessor.get_many.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""Tests for the ncei_access.export module."""
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+try:
+    import numpy  # pylint: disable=unused-import
+    import pyarrow.dataset as ds
+except ImportError:
+    ds = None
+
+from ncei_access.ncei_accessor import NceiAccessor
+
+
+def _fake_get(endpoint="data/v1/", ep_params=None):
+    """Daily rows for every requested station and day, except station "EMPTY"."""
+    day = date.fromisoformat(ep_params["startDate"])
+    end = date.fromisoformat(ep_params["endDate"])
+    rows = []
+    while day <= end:
+        for station in ep_params["stations"]:
+            if station != "EMPTY":
+                rows.append({"DATE": day.isoformat(), "STATION": station, "TMAX": "100"})
+        day += timedelta(days=1)
+    return MagicMock(data=rows)
+
+
+@unittest.skipIf(ds is None, "pyarrow is not installed")
+class TestExportDaily(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "export"
+        self.adapter = MagicMock()
+        self.adapter.get.side_effect = _fake_get
+        self.ncei_db = NceiAccessor(rest_adapter=self.adapter, max_workers=2)
+
+    def _export(self, **kwargs):
+        return self.ncei_db.export_daily(
+            ["TMAX", "PRCP"],
+            ["A", "B", "EMPTY"],
+            "2020-12-30",
+            "2021-01-02",
+            self.path,
+            station_batch_size=2,
+            **kwargs,
+        )
+
+    def test_partitioned_dataset(self):
+        progress = []
+        counts = self._export(progress=lambda done, total: progress.append(done))
+        self.assertEqual(counts, {"rows": 8, "files": 4, "skipped": 0})
+        self.assertEqual(self.adapter.get.call_count, 4)
+        self.assertEqual(progress, [2, 4])
+        self.assertTrue((self.path / "STATION=A" / "YEAR=2021" / "data.parquet").exists())
+        self.assertFalse((self.path / "STATION=EMPTY").exists())
+
+        table = ds.dataset(self.path, format="parquet", partitioning="hive").to_table()
+        self.assertEqual(table.num_rows, 8)
+        self.assertEqual(
+            set(table.column_names), {"DATE", "TMAX", "PRCP", "STATION", "YEAR"}
+        )
+        self.assertEqual(str(table.schema.field("DATE").type), "date32[day]")
+        self.assertEqual(table.schema.field("TMAX").metadata, {b"units": b"celsius"})
+        self.assertEqual(set(table.column("TMAX").to_pylist()), {10.0})
+        self.assertEqual(table.column("PRCP").null_count, 8)
+
+    def test_resume(self):
+        self._export()
+        manifest = self.path / "_manifest.jsonl"
+        lines = manifest.read_text().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[0])["rows"], 2)
+
+        # Simulate a crash after the first two units, mid-way through a line.
+        manifest.write_text("\n".join(lines[:3]) + "\n" + lines[3][:10])
+        self.adapter.get.reset_mock()
+        counts = self._export()
+        self.assertEqual(counts, {"rows": 4, "files": 2, "skipped": 3})
+        self.assertEqual(self.adapter.get.call_count, 2)
+
+        self.adapter.get.reset_mock()
+        counts = self._export()
+        self.assertEqual(counts, {"rows": 0, "files": 0, "skipped": 6})
+        self.adapter.get.assert_not_called()
+
+    def test_overlapping_exports_are_merged(self):
+        for start, end in (
+            ("2024-01-01", "2024-06-30"),
+            ("2024-04-01", "2024-09-30"),
+            ("2024-01-01", "2024-12-31"),
+        ):
+            self.ncei_db.export_daily("TMAX", "A", start, end, self.path, fmt="csv")
+        partition = self.path / "STATION=A" / "YEAR=2024"
+        self.assertEqual([p.name for p in partition.iterdir()], ["data.csv"])
+        table = ds.dataset(self.path, format="csv", partitioning="hive").to_table()
+        self.assertEqual(table.num_rows, 366)
+        self.assertEqual(len(set(table.column("DATE").to_pylist())), 366)
+
+    def test_merge_keeps_other_data_types(self):
+        def answer(*rows):
+            self.adapter.get.side_effect = None
+            self.adapter.get.return_value = MagicMock(
+                data=[dict(row, STATION="A") for row in rows]
+            )
+
+        answer(*({"DATE": f"2024-01-0{d}", "PRCP": "5"} for d in (1, 2, 3)))
+        self.ncei_db.export_daily("PRCP", "A", "2024-01-01", "2024-01-03", self.path)
+        answer({"DATE": "2024-01-02", "TMAX": "250"})
+        self.ncei_db.export_daily("TMAX", "A", "2024-01-02", "2024-01-05", self.path)
+
+        table = ds.dataset(self.path, format="parquet", partitioning="hive").to_table()
+        self.assertEqual(
+            list(zip(*(table.column(n).to_pylist() for n in ("PRCP", "TMAX")))),
+            [(0.5, None), (0.5, 25.0), (0.5, None)],
+        )
+        self.assertEqual(table.schema.field("TMAX").metadata, {b"units": b"celsius"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Tests for the ncei_access.ghcnd module."""
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STATIONS = (
+    "USC00000001  40.6167 -111.7833 1509.0 UT COTTONWOOD WEIR                                 \n"
+    "USC00000002  41.0000 -112.0000 1300.0 UT SECOND                                          \n"
+    "AE000041196  25.3330   55.5170   34.0    SHARJAH INTER. AIRP            GSN     41196\n"
+)  # fmt: skip
+INVENTORY = (
+    "USC00000001  40.6167 -111.7833 TMAX 1948 2020\n"
+    "USC00000001  40.6167 -111.7833 PRCP 1950 2020\n"
+)
+
+
+def _dly_line(station, year, month, element, values):
+    """A .dly line with values for the first days of the month, -9999 after that."""
+    days = "".join(
+        f"{v:5d}{'  ' if q is None else ' ' + q} " if v is not None else "-9999   "
+        for v, q in (values + [(None, None)] * (31 - len(values)))
+    )
+    return f"{station}{year:04d}{month:02d}{element}{days}\n"
+
+
+def _mirror(root):
+    root = Path(root)
+    root.mkdir()
+    (root / "ghcnd-stations.txt").write_text(STATIONS)
+    (root / "ghcnd-inventory.txt").write_text(INVENTORY)
+    (root / "all").mkdir()
+    (root / "all" / "USC00000001.dly").write_text(
+        _dly_line("USC00000001", 2019, 12, "TMAX", [(10, None)] * 31)
+        + _dly_line("USC00000001", 2020, 1, "TMAX", [(-5, None), (12, "X"), (7, None)])
+        + _dly_line("USC00000001", 2020, 1, "PRCP", [(0, None), (None, None), (25, None)])
+        + _dly_line("USC00000001", 2020, 2, "TMAX", [(1, None)] * 31)
+    )  # fmt: skip
+    (root / "by_year").mkdir()
+    (root / "by_year" / "2020.csv").write_text(
+        "USC00000002,20200101,TMAX,-12,,,7,0700\n"
+        "USC00000002,20200102,TMAX,3,,X,7,\n"
+        "USC00000003,20200101,TMAX,99,,,7,\n"
+        "USC00000002,20200101,PRCP,5,T,,7,\n"
+    )
+    return root
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestGhcndMirror(unittest.TestCase):
+    def setUp(self):
+        from ncei_access.ghcnd import GhcndMirror  # pylint: disable=import-outside-toplevel
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        root = _mirror(Path(tmp.name) / "mirror")
+        self.index_dir = Path(tmp.name) / "index"
+        self.mirror = GhcndMirror(root, index_dir=self.index_dir)
+        self.addCleanup(self.mirror.close)
+
+    def test_dly_rows(self):
+        rows = self.mirror.get_daily(
+            ["TMAX", "PRCP"], "USC00000001", "2019-12-31", "2020-02-29"
+        )
+        self.assertEqual(
+            rows[:4],
+            [
+                {"DATE": "2019-12-31", "STATION": "USC00000001", "TMAX": "10"},
+                {"DATE": "2020-01-01", "STATION": "USC00000001", "TMAX": "-5", "PRCP": "0"},
+                {"DATE": "2020-01-02", "STATION": "USC00000001", "TMAX": "12"},
+                {"DATE": "2020-01-03", "STATION": "USC00000001", "TMAX": "7", "PRCP": "25"},
+            ],
+        )  # fmt: skip
+        # February 2020 has 29 days; the placeholders for the 30th and 31st are dropped.
+        self.assertEqual(len(rows), 4 + 29)
+        self.assertEqual(rows[-1]["DATE"], "2020-02-29")
+
+    def test_by_year_rows_and_flags(self):
+        rows = self.mirror.get_daily(
+            ["TMAX", "PRCP"], ["USC00000002", "USC00000001"], "2020-01-01", "2020-01-02"
+        )
+        second = [r for r in rows if r["STATION"] == "USC00000002"]
+        self.assertEqual(
+            second,
+            [
+                {"DATE": "2020-01-01", "STATION": "USC00000002", "TMAX": "-12", "PRCP": "5"},
+                {"DATE": "2020-01-02", "STATION": "USC00000002", "TMAX": "3"},
+            ],
+        )  # fmt: skip
+        self.assertEqual(rows[0]["STATION"], "USC00000001")
+        self.assertTrue(list(self.index_dir.glob("2020-*.npz")))
+
+        self.mirror.drop_flagged = True
+        rows = self.mirror.get_daily(
+            "TMAX", ["USC00000001", "USC00000002"], "2020-01-02", "2020-01-02"
+        )
+        self.assertEqual(rows, [])
+
+    def test_columns(self):
+        columns = self.mirror.get_daily_columns(
+            "TMAX", ["USC00000001", "USC00000002", "NOPE"], "2020-01-01", "2020-01-03"
+        )
+        self.assertEqual(list(columns.stations), ["USC00000001", "USC00000002"])
+        np.testing.assert_allclose(columns.values["TMAX"], [-0.5, 1.2, 0.7, -1.2, 0.3])
+        self.assertEqual(columns.units["TMAX"], "celsius")
+
+    def test_stations(self):
+        station = self.mirror.find_station("USC00000001")
+        self.assertEqual(station.name, "COTTONWOOD WEIR, UT US")
+        self.assertEqual((station.lat, station.lon), (40.6167, -111.7833))
+        self.assertTrue(station.has_data_type("TMAX", "1950-01-01", "2020-12-31"))
+        sharjah = self.mirror.find_station("AE000041196")
+        self.assertEqual(sharjah.name, "SHARJAH INTER. AIRP, AE")
+        self.assertIsNone(self.mirror.find_station("NOPE"))
+        self.assertEqual(self.mirror.elevations()["USC00000001"], 1509.0)
+        closest = self.mirror.catalog().closest(41.1, -112.1)
+        self.assertEqual(closest.station_id, "USC00000002")
+
+    def test_accessor_backend(self):
+        from ncei_access.ncei_accessor import NceiAccessor  # pylint: disable=import-outside-toplevel
+
+        ncei_db = NceiAccessor(backend=self.mirror)
+        rows = ncei_db.get_daily(
+            "TMAX", "USC00000002", "2020-01-01", "2020-12-31", chunk="month"
+        )
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(ncei_db.find_station("USC00000002").lat, 41.0)
+        columns = ncei_db.get_daily_columns(
+            "TMAX", "USC00000002", "2020-01-01", "2020-01-31"
+        )
+        self.assertEqual(len(columns), 2)
+
+    def test_missing_root(self):
+        from ncei_access.exceptions import NceiAccessException  # pylint: disable=import-outside-toplevel
+        from ncei_access.ghcnd import GhcndMirror  # pylint: disable=import-outside-toplevel
+
+        with self.assertRaises(NceiAccessException):
+            GhcndMirror("/nonexistent/ghcnd")
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestParsing(unittest.TestCase):
+    def test_parse_int_fields(self):
+        from ncei_access.ghcnd import parse_int_fields  # pylint: disable=import-outside-toplevel
+
+        fields = np.frombuffer(b"  -12-9999   0,9123,     ", dtype=np.uint8)
+        values, present = parse_int_fields(fields.reshape(5, 5))
+        self.assertEqual(values.tolist(), [-12, -9999, 0, 9123, 0])
+        self.assertEqual(present.tolist(), [True, True, True, True, False])
+
+    def test_station_runs_across_blocks(self):
+        from ncei_access.ghcnd import scan_station_runs  # pylint: disable=import-outside-toplevel
+
+        a, b = b"A" * 11, b"B" * 11
+        buf = np.frombuffer(
+            b"".join([a + b",1\n", a + b",2\n", b + b",1\n", a + b",3\n"]),
+            dtype=np.uint8,
+        )
+        for block_size in (5, 14, 20, 1 << 20):
+            ids, starts, ends = scan_station_runs(buf, block_size=block_size)
+            self.assertEqual(ids.tolist(), [a, b, a])
+            self.assertEqual(starts.tolist(), [0, 28, 42])
+            self.assertEqual(ends.tolist(), [28, 42, 56])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Tests for the ncei_access.jsonlib module."""
+import os
+import unittest
+from unittest.mock import patch
+
+from ncei_access import jsonlib
+
+
+class TestJsonlib(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, jsonlib, "_selected", jsonlib._selected)  # pylint: disable=protected-access
+        jsonlib._selected = None  # pylint: disable=protected-access
+
+    def test_round_trip(self):
+        rows = [{"DATE": "2020-01-01", "STATION": "USC00421759", "TMAX": "-12"}]
+        body = jsonlib.dumps(rows)
+        self.assertIsInstance(body, bytes)
+        self.assertEqual(jsonlib.loads(body), rows)
+        self.assertEqual(jsonlib.loads(body.decode()), rows)
+        self.assertIn(jsonlib.backend(), jsonlib.BACKENDS)
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            jsonlib.loads(b"<html>Bad JSON</html>")
+
+    def test_forced_backend(self):
+        with patch.dict(os.environ, {"NCEI_ACCESS_JSON": "json"}):
+            self.assertEqual(jsonlib.backend(), "json")
+            self.assertEqual(jsonlib.dumps({"a": [1, 2]}), b'{"a":[1,2]}')
+            with self.assertRaises(ValueError):
+                jsonlib.loads(b"{")
+
+    def test_unknown_backend(self):
+        with patch.dict(os.environ, {"NCEI_ACCESS_JSON": "simdjson"}):
+            with self.assertRaises(ValueError):
+                jsonlib.backend()
+
+
+if __name__ == "__main__":
+    unittest.main()
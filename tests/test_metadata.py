@@ -0,0 +1,78 @@
+"""Tests for the lazily loaded metadata in the ncei_access package."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from ncei_access import DataSet, DataType, LazyRef, dataSet_ref, dataType_ref
+
+
+class TestLazyRef(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.env = patch.dict(os.environ, {"NCEI_ACCESS_CACHE_DIR": self.tmp.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def _ref(self):
+        return LazyRef(
+            "daily-summaries.json",
+            lambda data: {d["id"]: DataType(d) for d in data["dataTypes"]},
+        )
+
+    def test_loaded_on_first_access(self):
+        ref = self._ref()
+        self.assertIn("not loaded", repr(ref))
+        self.assertEqual(ref["TMAX"].scale_factor, 0.1)
+        self.assertIn("TMIN", ref)
+        self.assertIsNone(ref.get("NOPE"))
+        self.assertNotIn("not loaded", repr(ref))
+
+    def test_pickle_cache_is_reused(self):
+        self.assertEqual(len(self._ref()), len(dataType_ref))
+        cached = os.listdir(os.path.join(self.tmp.name, "metadata"))
+        self.assertEqual(len(cached), 1)
+
+        with patch("json.load") as json_load:
+            ref = self._ref()
+            self.assertEqual(ref["TMAX"].id, "TMAX")
+        json_load.assert_not_called()
+
+    def test_garbage_pickle_is_rebuilt(self):
+        import pickle  # pylint: disable=import-outside-toplevel
+
+        ref = self._ref()
+        cache_path = ref._cache_path()  # pylint: disable=protected-access
+        os.makedirs(os.path.dirname(cache_path))
+        for garbage in (
+            b"not a pickle at all",
+            # Refers to a module that doesn't exist, unpickling raises ImportError.
+            b"cno_such_module\nThing\n.",
+            pickle.dumps(["not", "a", "dict"]),
+        ):
+            with open(cache_path, "wb") as f:
+                f.write(garbage)
+            with self.assertLogs("ncei_access", "WARNING"):
+                self.assertEqual(self._ref()["TMAX"].id, "TMAX")
+            # The bad file was replaced by a good one.
+            with patch("json.load") as json_load:
+                self.assertEqual(self._ref()["TMAX"].id, "TMAX")
+            json_load.assert_not_called()
+
+    def test_unwritable_cache_dir(self):
+        blocker = os.path.join(self.tmp.name, "file")
+        with open(blocker, "w", encoding="utf-8"):
+            pass
+        with patch.dict(os.environ, {"NCEI_ACCESS_CACHE_DIR": blocker}):
+            self.assertEqual(self._ref()["TMAX"].id, "TMAX")
+
+    def test_module_refs(self):
+        self.assertIsInstance(dataType_ref["PRCP"], DataType)
+        self.assertTrue(all(isinstance(d, DataSet) for d in dataSet_ref.values()))
+        self.assertIn("daily-summaries", dataSet_ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for the ncei_access.metrics module and the instrumentation hooks."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from ncei_access.cache import ResponseCache
+from ncei_access.exceptions import NceiAccessException
+from ncei_access.metrics import Histogram, Metrics, RequestEvent, StageEvent
+from ncei_access.ncei_accessor import NceiAccessor
+from ncei_access.rest_adapter import RestAdapter
+
+
+def _response(status_code, body=b"[]"):
+    response = MagicMock()
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else "Service Unavailable"
+    response.headers = {}
+    response.content = body
+    return response
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram(self):
+        hist = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value)
+        self.assertEqual(hist.cumulative(), [(0.1, 1), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(hist.quantile(0.5), 1.0)
+        self.assertEqual(hist.quantile(1.0), float("inf"))
+        self.assertAlmostEqual(hist.sum, 6.05)
+
+    def test_aggregation_and_openmetrics(self):
+        metrics = Metrics(buckets=(0.1, 1.0))
+        event = RequestEvent("data/v1/", "abcdef")
+        event.status_code = 200
+        event.elapsed = 0.5
+        event.ttfb = 0.2
+        event.bytes = 1000
+        event.attempts = 3
+        event.cache = "miss"
+        metrics(event)
+        metrics(StageEvent("merge", 0.05, 10))
+
+        self.assertEqual(metrics.counter("requests", endpoint="data/v1", status=200), 1)
+        self.assertEqual(metrics.counter("retries", endpoint="data/v1"), 2)
+        self.assertEqual(metrics.counter("cache_misses", endpoint="data/v1"), 1)
+        self.assertEqual(metrics.histogram("ttfb_seconds", endpoint="data/v1").count, 1)
+        self.assertIsNone(metrics.histogram("decode_seconds", endpoint="data/v1"))
+
+        text = metrics.to_openmetrics()
+        self.assertIn("# TYPE ncei_requests counter", text)
+        self.assertIn('ncei_requests_total{endpoint="data/v1",status="200"} 1', text)
+        self.assertIn('ncei_request_seconds_bucket{endpoint="data/v1",le="1.0"} 1', text)
+        self.assertIn('ncei_stage_seconds_bucket{stage="merge",le="0.1"} 1', text)
+        self.assertTrue(text.endswith("# EOF\n"))
+
+
+@patch("ncei_access.rest_adapter.time.sleep")
+class TestInstrumentation(unittest.TestCase):
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_request_event(self, mock_get, _):
+        mock_get.side_effect = [
+            _response(503),
+            _response(200, b'[{"a": 1}]'),
+        ]
+        events = []
+        adapter = RestAdapter(listeners=[events.append])
+        adapter.get(endpoint="data/v1/", ep_params={"stations": ["A"]})
+
+        (event,) = events
+        self.assertEqual(event.endpoint, "data/v1")
+        self.assertEqual(event.status_code, 200)
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(event.bytes, 10)
+        for name in ("ttfb", "download", "decode"):
+            self.assertIsNotNone(getattr(event, name))
+        self.assertGreaterEqual(event.elapsed, event.ttfb)
+        self.assertIsNone(event.cache)
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_cache_hit_and_errors(self, mock_get, _):
+        mock_get.side_effect = [_response(200, b"[]"), _response(404)]
+        metrics = Metrics()
+        broken = MagicMock(side_effect=RuntimeError("listener bug"))
+        with tempfile.TemporaryDirectory() as tmp:
+            adapter = RestAdapter(
+                cache=ResponseCache(path=Path(tmp) / "cache.sqlite"),
+                listeners=[broken, metrics],
+            )
+            adapter.get(endpoint="search/v1/data", ep_params={"bbox": "1"})
+            adapter.get(endpoint="search/v1/data", ep_params={"bbox": "1"})
+            with self.assertRaises(NceiAccessException):
+                adapter.get(endpoint="search/v1/data", ep_params={"bbox": "2"})
+
+        labels = {"endpoint": "search/v1/data"}
+        self.assertEqual(metrics.counter("cache_hits", **labels), 1)
+        self.assertEqual(metrics.counter("cache_misses", **labels), 2)
+        self.assertEqual(metrics.counter("requests", status=200, **labels), 2)
+        self.assertEqual(metrics.counter("requests", status=404, **labels), 1)
+        self.assertEqual(broken.call_count, 3)
+
+    def test_stage_events(self, _):
+        events = []
+        adapter = MagicMock()
+        adapter.get.return_value = MagicMock(
+            data=[{"DATE": "2000-01-01", "STATION": "A", "TMAX": "1"}]
+        )
+        accessor = NceiAccessor(rest_adapter=adapter, listeners=[events.append])
+        accessor.get_daily("TMAX", "A", "2000-01-01", "2001-12-31", chunk="year")
+        self.assertEqual([e.stage for e in events], ["merge"])
+        self.assertEqual(events[0].items, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
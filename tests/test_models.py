@@ -1,7 +1,7 @@
 """Tets for the ncei_access.models module."""
 # from datetime import datetime # do I need this?
 import unittest
-from ncei_access.models import Station, Result
+from ncei_access.models import Station, Result, filter_stations
 
 class TestStation(unittest.TestCase):
     def setUp(self):
@@ -33,6 +33,40 @@ class TestStation(unittest.TestCase):
         # Should be positive for different point
         self.assertGreater(self.station.distance_to(41.0, -110.0), 0.0)
 
+    def test_coverage_index(self):
+        coverage = self.station.coverage
+        self.assertEqual(set(coverage), {"TMAX", "TMIN"})
+        self.assertEqual(coverage["TMIN"].start.year, 2010)
+        self.assertIs(self.station.coverage, coverage)
+        self.station.data_types = []
+        self.assertFalse(self.station.has_data_type("TMAX"))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.station.elevation_m = 1500
+
+
+class TestFilterStations(unittest.TestCase):
+    def test_filter_stations(self):
+        full = Station(station_id="FULL", data_types=[
+            {"id": "TMAX", "startDate": "1980-01-01", "endDate": "2025-01-01", "coverage": 99.0},
+            {"id": "SNWD", "startDate": "1985-01-01", "endDate": "2025-01-01", "coverage": 96.0},
+        ])
+        sparse = Station(station_id="SPARSE", data_types=[
+            {"id": "TMAX", "startDate": "1980-01-01", "endDate": "2025-01-01", "coverage": 99.0},
+            {"id": "SNWD", "startDate": "1985-01-01", "endDate": "2025-01-01", "coverage": 50.0},
+        ])
+        short = Station(station_id="SHORT", data_types=[
+            {"id": "TMAX", "startDate": "2000-01-01", "endDate": "2025-01-01", "coverage": 99.0},
+            {"id": "SNWD", "startDate": "2000-01-01", "endDate": "2025-01-01", "coverage": 99.0},
+        ])
+        stations = [full, sparse, short]
+        found = filter_stations(stations, ["TMAX", "SNWD"], "1990-01-01", "2020-12-31", 95)
+        self.assertEqual([s.station_id for s in found], ["FULL"])
+        found = filter_stations(stations, "TMAX", "1990-01-01")
+        self.assertEqual([s.station_id for s in found], ["FULL", "SPARSE"])
+
+
 class TestResult(unittest.TestCase):
     def test_result_init(self):
         r = Result(200, message="ok", data=[{"foo": "bar"}])
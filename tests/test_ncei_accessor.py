@@ -2,6 +2,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from ncei_access.ncei_accessor import NceiAccessor
+from ncei_access.exceptions import NceiAccessException
 # from ncei_access.models import Station, Result # Do i need these imports?
 
 class TestNceiAccessor(unittest.TestCase):
@@ -20,11 +21,75 @@ class TestNceiAccessor(unittest.TestCase):
         result = self.accessor.get_daily(["TMAX", "TMIN"], ["STATION1", "STATION2"])
         self.assertEqual(result, [{"foo": "bar"}])
 
+    def test_pool_fits_workers(self):
+        for workers, pool in ((4, 10), (16, 16)):
+            accessor = NceiAccessor(max_workers=workers)
+            session = accessor._rest_adapter._session  # pylint: disable=protected-access
+            self.assertEqual(session.get_adapter("https://x")._pool_maxsize, pool)  # pylint: disable=protected-access
+
     def test_get_daily_hilow(self):
         self.mock_adapter.get.return_value = MagicMock(data=[{"foo": "baz"}])
         result = self.accessor.get_daily_hilow("STATION1")
         self.assertEqual(result, [{"foo": "baz"}])
 
+    def test_get_daily_chunked(self):
+        def fake_get(endpoint, ep_params):  # pylint: disable=unused-argument
+            year = ep_params["startDate"][:4]
+            return MagicMock(data=[{"STATION": "S1", "DATE": f"{year}-06-01"}])
+
+        self.mock_adapter.get.side_effect = fake_get
+        result = self.accessor.get_daily("TMAX", "S1", "2000-03-01", "2002-02-01", chunk="year")
+        self.assertEqual(self.mock_adapter.get.call_count, 3)
+        self.assertEqual(
+            [r["DATE"] for r in result], ["2000-06-01", "2001-06-01", "2002-06-01"]
+        )
+
+    def test_get_daily_chunk_retried_alone(self):
+        calls = []
+
+        def fake_get(endpoint, ep_params):  # pylint: disable=unused-argument
+            calls.append(ep_params["startDate"])
+            if ep_params["startDate"] == "2001-01-01" and calls.count("2001-01-01") == 1:
+                raise NceiAccessException("503: Service Unavailable")
+            return MagicMock(data=[{"STATION": "S1", "DATE": ep_params["startDate"]}])
+
+        self.mock_adapter.get.side_effect = fake_get
+        result = self.accessor.get_daily("TMAX", "S1", "2000-01-01", "2002-12-31", chunk="year")
+        self.assertEqual(len(result), 3)
+        self.assertEqual(sorted(calls), ["2000-01-01", "2001-01-01", "2001-01-01", "2002-01-01"])
+
+    def test_get_daily_station_batches(self):
+        def fake_get(endpoint, ep_params):  # pylint: disable=unused-argument
+            return MagicMock(
+                data=[{"STATION": s, "DATE": "2024-01-01"} for s in ep_params["stations"]]
+            )
+
+        self.mock_adapter.get.side_effect = fake_get
+        stations = [f"US{i:09d}" for i in range(25)]
+        progress = MagicMock()
+        result = self.accessor.get_daily(
+            "TMAX", stations, station_batch_size=10, progress=progress
+        )
+        self.assertEqual(self.mock_adapter.get.call_count, 3)
+        self.assertEqual([r["STATION"] for r in result], stations)
+        self.assertEqual(progress.call_args_list[-1].args, (3, 3))
+
+    def test_get_daily_chunk_fails(self):
+        self.mock_adapter.get.side_effect = NceiAccessException("503: Service Unavailable")
+        with self.assertRaises(NceiAccessException):
+            self.accessor.get_daily("TMAX", "S1", "2000-01-01", "2002-12-31", chunk="year")
+
+    def test_iter_daily_batches(self):
+        self.mock_adapter.iter_csv.side_effect = lambda ep_params: iter(
+            {"STATION": "S1", "DATE": f"{ep_params['startDate'][:4]}-01-0{i}"}
+            for i in range(1, 4)
+        )
+        batches = list(
+            self.accessor.iter_daily("TMAX", "S1", "2000-01-01", "2001-12-31", batch_size=4, chunk="year")
+        )
+        self.assertEqual([len(b) for b in batches], [4, 2])
+        self.assertEqual(batches[0][3]["DATE"], "2001-01-01")
+
     @patch('ncei_access.ncei_accessor.Station')
     def test_stations_in_boundary(self, MockStation):
         # Simulate API response
@@ -37,5 +102,43 @@ class TestNceiAccessor(unittest.TestCase):
         stations = self.accessor.stations_in_boundary(2, 1, 0, 3)
         self.assertEqual(stations, ["station_obj"])
 
+    @patch("ncei_access.ncei_accessor.ThreadPoolExecutor")
+    def test_single_search_runs_inline_without_extra_retries(self, executor):
+        self.mock_adapter.get.side_effect = NceiAccessException("503: Unavailable")
+        with self.assertRaises(NceiAccessException):
+            self.accessor.stations_in_boundary(2, 1, 0, 3)
+        # The adapter already retried; the accessor doesn't search again.
+        self.mock_adapter.get.assert_called_once()
+        executor.assert_not_called()
+
+    @patch("ncei_access.ncei_accessor.SEARCH_LIMIT", 3)
+    def test_stations_in_boundary_splits_full_searches(self):
+        # Ten stations on a diagonal, one exactly on the first split line.
+        points = [(i, i) for i in range(10)] + [(4.5, 4.5)]
+
+        def fake_get(endpoint, ep_params):  # pylint: disable=unused-argument
+            north, west, south, east = map(float, ep_params["bbox"].split(","))
+            inside = [
+                {
+                    "stations": [{"name": f"S{lat}", "id": f"S{lat}", "dataTypes": []}],
+                    "location": {"coordinates": [lon, lat]},
+                }
+                for lat, lon in points
+                if south <= lat <= north and west <= lon <= east
+            ]
+            return MagicMock(data=inside[: ep_params["limit"]])
+
+        self.mock_adapter.get.side_effect = fake_get
+        with patch("ncei_access.ncei_accessor.boundary_params") as params:
+            params.side_effect = lambda n, w, s, e, start=None, end=None: {
+                "bbox": f"{n},{w},{s},{e}",
+                "limit": 3,
+            }
+            stations = self.accessor.stations_in_boundary(9, 0, 0, 9)
+        self.assertEqual(
+            sorted(s.station_id for s in stations), sorted(f"S{p[0]}" for p in points)
+        )
+        self.assertGreater(self.mock_adapter.get.call_count, 5)
+
 if __name__ == "__main__":
     unittest.main()
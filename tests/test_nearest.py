@@ -0,0 +1,94 @@
+"""Tests for the ncei_access.nearest module."""
+import random
+import unittest
+from unittest.mock import MagicMock, patch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ncei_access.ncei_accessor import NceiAccessor
+from ncei_access.models import Station
+
+TYPES = [{"id": "TMAX", "startDate": "2000-01-01T00:00:00", "endDate": "2025-01-01T23:59:59"}]
+
+
+def search_result(station_id, lat, lon, data_types=None):
+    return {
+        "stations": [{"name": station_id, "id": station_id, "dataTypes": data_types or []}],
+        "location": {"coordinates": [lon, lat]},
+    }
+
+
+class FakeSearch:
+    """Answers bbox searches from a fixed list of stations, like the search endpoint."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def get(self, endpoint, ep_params):  # pylint: disable=unused-argument
+        self.calls += 1
+        north, west, south, east = (float(x) for x in ep_params["bbox"].split(","))
+        found = [
+            r
+            for r in self.results
+            if south <= r["location"]["coordinates"][1] <= north
+            and west <= r["location"]["coordinates"][0] <= east
+        ]
+        return MagicMock(data=found[: ep_params["limit"]])
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFindClosestStations(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.results = [
+            search_result(f"ID{i}", rng.uniform(38, 42), rng.uniform(-113, -108), TYPES if i % 3 else [])
+            for i in range(300)
+        ]
+        self.search = FakeSearch(self.results)
+        self.accessor = NceiAccessor()
+        self.accessor._rest_adapter = self.search  # pylint: disable=protected-access
+        self.points = [(rng.uniform(38.5, 41.5), rng.uniform(-112.5, -108.5)) for _ in range(200)]
+
+    def brute_force(self, lat, lon, data_type=""):
+        stations = [
+            Station(r["stations"][0]["name"], r["stations"][0]["id"],
+                    r["location"]["coordinates"][1], r["location"]["coordinates"][0],
+                    r["stations"][0]["dataTypes"])
+            for r in self.results
+        ]
+        if data_type:
+            stations = [s for s in stations if s.has_data_type(data_type)]
+        return min(stations, key=lambda s: s.distance_to(lat, lon)).station_id
+
+    def test_matches_brute_force(self):
+        found = self.accessor.find_closest_stations(self.points, data_type="TMAX")
+        for (lat, lon), station in zip(self.points, found):
+            self.assertEqual(station.station_id, self.brute_force(lat, lon, "TMAX"))
+        # Far fewer searches than one widening series per point.
+        self.assertLess(self.search.calls, len(self.points))
+
+    def test_widening_and_missing(self):
+        accessor = NceiAccessor()
+        accessor._rest_adapter = FakeSearch([search_result("FAR", 45.0, -110.0)])  # pylint: disable=protected-access
+        found = accessor.find_closest_stations([(40.0, -110.0)])
+        self.assertEqual(found[0].station_id, "FAR")
+        accessor._rest_adapter = FakeSearch([])  # pylint: disable=protected-access
+        self.assertEqual(accessor.find_closest_stations([(40.0, -110.0)], attempts=3), [None])
+
+    @patch("ncei_access.ncei_accessor.SEARCH_LIMIT", 5)
+    def test_full_search_is_split(self):
+        # The box search returns exactly SEARCH_LIMIT decoys and leaves out the true
+        # nearest station, which is listed last.
+        decoys = [search_result(f"D{i}", 40.2, -110.0 + i * 0.01) for i in range(5)]
+        accessor = NceiAccessor()
+        accessor._rest_adapter = FakeSearch(decoys + [search_result("NEAR", 40.01, -110.0)])  # pylint: disable=protected-access
+        found = accessor.find_closest_stations([(40.0, -110.0)])
+        self.assertEqual(found[0].station_id, "NEAR")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Tests for the ncei_access.planner module."""
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from ncei_access.catalog import StationCatalog
+from ncei_access.models import Station
+from ncei_access.ncei_accessor import NceiAccessor
+from ncei_access.planner import plan_daily
+
+
+def _station(station_id, **periods):
+    """Station recording each data type over a (start, end) period."""
+    return Station(
+        name=station_id,
+        station_id=station_id,
+        data_types=[
+            {
+                "id": data_type,
+                "startDate": f"{start}T00:00:00",
+                "endDate": f"{end}T23:59:59",
+                "coverage": 95.0,
+            }
+            for data_type, (start, end) in periods.items()
+        ],
+    )
+
+
+OLD = _station("OLD", TMAX=("1950-01-01", "1979-06-30"))
+MIXED = _station(
+    "MIXED", TMAX=("1970-01-01", "1999-12-31"), SNWD=("1990-01-01", "1999-12-31")
+)
+NEWER = _station("NEWER", TMAX=("1970-09-01", "1999-06-30"))
+CLOSED = _station("CLOSED", TMAX=("1900-01-01", "1920-12-31"))
+
+
+class TestPlanDaily(unittest.TestCase):
+    def test_clip_and_drop(self):
+        plan = plan_daily(
+            ["TMAX", "SNWD"], [OLD, MIXED, NEWER, CLOSED], "1960-01-01", "2020-12-31",
+            station_batch_size=2,
+        )  # fmt: skip
+        self.assertEqual(
+            [(r.data_types, r.stations, r.start, r.end) for r in plan],
+            [
+                (["TMAX"], ["OLD", "NEWER"], "1960-01-01", "1999-06-30"),
+                (["TMAX", "SNWD"], ["MIXED"], "1970-01-01", "1999-12-31"),
+            ],
+        )
+        self.assertEqual(
+            sorted(plan.dropped),
+            [
+                ("CLOSED", "SNWD"),
+                ("CLOSED", "TMAX"),
+                ("NEWER", "SNWD"),
+                ("OLD", "SNWD"),
+            ],
+        )
+        self.assertEqual(plan.unknown, [])
+
+    def test_chunks_only_ask_active_stations(self):
+        plan = plan_daily(
+            "TMAX", [NEWER, MIXED, OLD], "1960-01-01", "2020-12-31", chunk="decade"
+        )
+        self.assertEqual(
+            [(r.stations, r.start, r.end) for r in plan],
+            [
+                (["OLD"], "1960-01-01", "1969-12-31"),
+                (["OLD", "MIXED", "NEWER"], "1970-01-01", "1979-12-31"),
+                (["MIXED", "NEWER"], "1980-01-01", "1989-12-31"),
+                (["MIXED", "NEWER"], "1990-01-01", "1999-12-31"),
+            ],
+        )
+        plan = plan_daily("TMAX", NEWER, "1960-01-01", "2020-12-31", chunk="decade")
+        self.assertEqual(
+            [(r.start, r.end) for r in plan],
+            [
+                ("1970-09-01", "1979-12-31"),
+                ("1980-01-01", "1989-12-31"),
+                ("1990-01-01", "1999-06-30"),
+            ],
+        )
+
+    def test_catalog_unknown_and_coverage(self):
+        catalog = StationCatalog([OLD, CLOSED])
+        plan = plan_daily(
+            "TMAX", ["OLD", "CLOSED", "NOPE", "OLD"], "1970-01-01", "1970-12-31",
+            catalog=catalog,
+        )  # fmt: skip
+        self.assertEqual([r.stations for r in plan], [["NOPE", "OLD"]])
+        self.assertEqual(plan.unknown, ["NOPE"])
+        self.assertEqual(plan.dropped, [("CLOSED", "TMAX")])
+
+        plan = plan_daily("TMAX", OLD, "1970-01-01", "1970-12-31", min_coverage=99)
+        self.assertEqual(len(plan), 0)
+
+    def test_pruned_pairs_are_not_requested(self):
+        sparse = Station(
+            name="SPARSE",
+            station_id="SPARSE",
+            data_types=[
+                {"id": "TMAX", "startDate": "1970-01-01T00:00:00", "endDate": "1999-12-31T23:59:59", "coverage": 95.0},  # fmt: skip
+                {"id": "SNWD", "startDate": "1970-01-01T00:00:00", "endDate": "1999-12-31T23:59:59", "coverage": 10.0},  # fmt: skip
+            ],
+        )
+        plan = plan_daily(
+            ["TMAX", "SNWD"], [MIXED, sparse], "1990-01-01", "1999-12-31",
+            min_coverage=50,
+        )  # fmt: skip
+        self.assertEqual(plan.dropped, [("SPARSE", "SNWD")])
+        requested = {
+            (station, data_type)
+            for r in plan
+            for station in r.stations
+            for data_type in r.data_types
+        }
+        self.assertEqual(
+            requested, {("MIXED", "TMAX"), ("MIXED", "SNWD"), ("SPARSE", "TMAX")}
+        )
+
+    def test_recent_period_of_record_is_ongoing(self):
+        recent = (date.today() - timedelta(days=10)).isoformat()
+        active = _station("ACTIVE", TMAX=("2000-01-01", recent))
+        plan = plan_daily("TMAX", active, "2020-01-01", "2100-12-31")
+        self.assertEqual(plan.requests[0].end, "2100-12-31")
+        plan = plan_daily("TMAX", active, "2020-01-01", "2100-12-31", recent_days=5)
+        self.assertEqual(plan.requests[0].end, recent)
+
+
+class TestGetDailyPrune(unittest.TestCase):
+    def test_get_daily_prune(self):
+        adapter = MagicMock()
+        adapter.get.side_effect = lambda endpoint="data/v1/", ep_params=None: MagicMock(
+            data=[{"DATE": ep_params["startDate"], "STATION": s} for s in ep_params["stations"]]  # fmt: skip
+        )
+        ncei_db = NceiAccessor(rest_adapter=adapter, catalog=StationCatalog([NEWER]))
+        rows = ncei_db.get_daily(
+            ["TMAX", "SNWD"], [OLD, "NEWER", CLOSED], "1960-01-01", "2020-12-31",
+            prune=True,
+        )  # fmt: skip
+        adapter.get.assert_called_once()
+        self.assertEqual(
+            adapter.get.call_args.kwargs["ep_params"],
+            {
+                "dataset": "daily-summaries",
+                "dataTypes": ["TMAX"],
+                "stations": ["OLD", "NEWER"],
+                "startDate": "1960-01-01",
+                "endDate": "1999-06-30",
+            },
+        )
+        self.assertEqual([r["STATION"] for r in rows], ["NEWER", "OLD"])
+
+        adapter.get.reset_mock()
+        self.assertEqual(
+            ncei_db.get_daily("TMAX", CLOSED, "1960-01-01", "2020-12-31", prune=True),
+            [],
+        )
+        adapter.get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
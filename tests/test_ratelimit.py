@@ -0,0 +1,96 @@
+"""Tests for the ncei_access.ratelimit module."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from ncei_access.ratelimit import RateLimiter, fcntl
+from ncei_access.rest_adapter import RestAdapter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_token_bucket(self):
+        limiter = RateLimiter(rate=10, burst=1)
+        self.assertEqual(limiter.reserve(), 0.0)
+        self.assertAlmostEqual(limiter.reserve(), 0.1, places=2)
+        self.assertAlmostEqual(limiter.reserve(), 0.2, places=2)
+
+    def test_aimd(self):
+        limiter = RateLimiter(rate=8, increase=1.0)
+        limiter.feedback(429)
+        self.assertEqual(limiter.rate, 4)
+        # A burst of rejections within a second only counts once.
+        limiter.feedback(503)
+        self.assertEqual(limiter.rate, 4)
+        limiter.feedback(200)
+        self.assertAlmostEqual(limiter.rate, 4.25)
+        limiter.feedback(404)
+        self.assertAlmostEqual(limiter.rate, 4.25)
+        for _ in range(100):
+            limiter.feedback(200)
+        self.assertEqual(limiter.rate, 8)
+
+    def test_retry_after_pauses_everyone(self):
+        limiter = RateLimiter(rate=10, min_rate=10)
+        limiter.feedback(429, retry_after=2)
+        self.assertGreaterEqual(limiter.reserve(), 2.0)
+
+    def test_concurrency_slots(self):
+        limiter = RateLimiter(rate=1000, burst=10, max_concurrency=1)
+        limiter.acquire()
+        self.assertFalse(limiter._slots.acquire(blocking=False))  # pylint: disable=protected-access
+        limiter.release(200)
+        self.assertTrue(limiter._slots.acquire(blocking=False))  # pylint: disable=protected-access
+
+    @unittest.skipIf(fcntl is None, "file locks are not supported")
+    def test_shared_through_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "limiter"
+            first = RateLimiter(rate=10, path=path)
+            second = RateLimiter(rate=10, path=path)
+            self.assertEqual(first.reserve(), 0.0)
+            self.assertAlmostEqual(second.reserve(), 0.1, places=2)
+            second.feedback(429)
+            self.assertEqual(first.rate, 5)
+            first.close()
+            second.close()
+
+
+@patch("ncei_access.rest_adapter.time.sleep")
+class TestRestAdapterRateLimit(unittest.TestCase):
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_every_attempt_goes_through_limiter(self, mock_get, mock_sleep):
+        throttled = MagicMock(status_code=429, reason="Too Many Requests")
+        throttled.headers = {"Retry-After": "3"}
+        ok = MagicMock(status_code=200, reason="OK", headers={})
+        ok.content = b'[{"foo": "bar"}]'
+        mock_get.side_effect = [throttled, ok]
+
+        limiter = MagicMock(throttle_statuses=frozenset((429, 503)))
+        adapter = RestAdapter(rate_limiter=limiter)
+        result = adapter.get(endpoint="data/v1/", ep_params={})
+
+        self.assertEqual(result.data, [{"foo": "bar"}])
+        self.assertEqual(limiter.acquire.call_count, 2)
+        limiter.release.assert_any_call(429, 3.0)
+        limiter.release.assert_called_with(200, None)
+        # The limiter enforces Retry-After, so the adapter doesn't sleep on top of it.
+        mock_sleep.assert_called_once_with(0.0)
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_stream_holds_slot_until_read(self, mock_get, _):
+        response = MagicMock(status_code=200, reason="OK", headers={}, encoding=None)
+        response.iter_lines.return_value = iter(['"STATION"', '"S1"', '"S2"'])
+        mock_get.return_value = response
+        limiter = RateLimiter(rate=1000, burst=10, max_concurrency=1)
+        adapter = RestAdapter(rate_limiter=limiter)
+
+        rows = adapter.iter_csv(ep_params={})
+        self.assertEqual(next(rows), {"STATION": "S1"})
+        self.assertFalse(limiter._slots.acquire(blocking=False))  # pylint: disable=protected-access
+        rows.close()
+        response.close.assert_called_once()
+        self.assertTrue(limiter._slots.acquire(blocking=False))  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+    unittest.main()
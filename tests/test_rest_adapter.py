@@ -1,9 +1,12 @@
 """General tests for the RestAdapter class in ncei_access module."""
 
+import json
+import threading
+import time
 import unittest
 import requests
 from unittest.mock import patch, MagicMock
-from ncei_access.rest_adapter import RestAdapter, NceiAccessException
+from ncei_access.rest_adapter import RestAdapter, NceiAccessException, backoff_delay
 from ncei_access.models import Result
 
 
@@ -11,46 +14,191 @@ class TestRestAdapter(unittest.TestCase):
     def setUp(self):
         self.adapter = RestAdapter()
 
-    @patch("ncei_access.rest_adapter.requests.get")
+    @patch("ncei_access.rest_adapter.requests.Session.get")
     def test_get_success_data_endpoint(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.reason = "OK"
-        mock_response.json.return_value = {"results": [{"foo": "bar"}]}
+        mock_response.content = b'{"results": [{"foo": "bar"}]}'
         mock_get.return_value = mock_response
         result = self.adapter.get(endpoint="data/v1/", ep_params={})
         self.assertIsInstance(result, Result)
         self.assertEqual(result.status_code, 200)
         self.assertEqual(result.data, {"results": [{"foo": "bar"}]})
 
-    @patch("ncei_access.rest_adapter.requests.get")
+    @patch("ncei_access.rest_adapter.requests.Session.get")
     def test_get_success_search_endpoint(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.reason = "OK"
-        mock_response.json.return_value = {"results": [{"foo": "baz"}]}
+        mock_response.content = b'{"results": [{"foo": "baz"}]}'
         mock_get.return_value = mock_response
         result = self.adapter.get(endpoint="search/v1/data", ep_params={})
         self.assertIsInstance(result, Result)
         self.assertEqual(result.status_code, 200)
         self.assertEqual(result.data, [{"foo": "baz"}])
 
-    @patch("ncei_access.rest_adapter.requests.get")
+    @patch("ncei_access.rest_adapter.requests.Session.get")
     def test_get_http_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("Connection error")
         with self.assertRaises(NceiAccessException):
             self.adapter.get(endpoint="data/v1/", ep_params={})
 
-    @patch("ncei_access.rest_adapter.requests.get")
+    @patch("ncei_access.rest_adapter.requests.Session.get")
     def test_get_bad_json(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.reason = "OK"
-        mock_response.json.side_effect = ValueError("Bad JSON")
+        mock_response.content = b"<html>Bad JSON</html>"
         mock_get.return_value = mock_response
         with self.assertRaises(NceiAccessException):
             self.adapter.get(endpoint="data/v1/", ep_params={})
 
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_iter_csv(self, mock_get):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.encoding = None
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_lines.return_value = iter(
+            ['"STATION","DATE","TMAX","TMIN"', '"S1","2024-01-01","  -46",""']
+        )
+        mock_get.return_value = mock_response
+        rows = list(self.adapter.iter_csv(ep_params={"stations": ["S1"]}))
+        self.assertEqual(rows, [{"STATION": "S1", "DATE": "2024-01-01", "TMAX": "  -46"}])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["format"], "csv")
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_iter_csv_http_error(self, mock_get):
+        mock_response = MagicMock(status_code=400, reason="Bad Request")
+        mock_response.__enter__.return_value = mock_response
+        mock_get.return_value = mock_response
+        with self.assertRaises(NceiAccessException):
+            list(self.adapter.iter_csv(ep_params={}))
+
+
+def _response(status_code, body=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else "Service Unavailable"
+    response.headers = headers or {}
+    response.content = json.dumps(body if body is not None else {}).encode()
+    return response
+
+
+@patch("ncei_access.rest_adapter.time.sleep")
+class TestRestAdapterRetries(unittest.TestCase):
+    def setUp(self):
+        self.adapter = RestAdapter(retries=2, backoff_factor=0.1)
+
+    def test_session_is_reused(self, _):
+        self.assertIs(self.adapter._session, self.adapter._session)  # pylint: disable=protected-access
+        self.assertIsInstance(self.adapter._session, requests.Session)  # pylint: disable=protected-access
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_retry_on_503_then_success(self, mock_get, mock_sleep):
+        mock_get.side_effect = [_response(503), _response(200, [{"foo": "bar"}])]
+        result = self.adapter.get(endpoint="data/v1/", ep_params={})
+        self.assertEqual(result.data, [{"foo": "bar"}])
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_retry_after_is_honored(self, mock_get, mock_sleep):
+        mock_get.side_effect = [
+            _response(429, headers={"Retry-After": "7"}),
+            _response(200, [{"foo": "bar"}]),
+        ]
+        self.adapter.get(endpoint="data/v1/", ep_params={})
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_retry_on_connection_error(self, mock_get, _):
+        mock_get.side_effect = [
+            requests.exceptions.ConnectionError("reset"),
+            _response(200, [{"foo": "bar"}]),
+        ]
+        result = self.adapter.get(endpoint="data/v1/", ep_params={})
+        self.assertEqual(result.data, [{"foo": "bar"}])
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_retries_exhausted(self, mock_get, _):
+        mock_get.return_value = _response(503)
+        with self.assertRaises(NceiAccessException):
+            self.adapter.get(endpoint="data/v1/", ep_params={})
+        self.assertEqual(mock_get.call_count, 3)
+
+    def test_backoff_delay_bounds(self, _):
+        for attempt in range(10):
+            delay = backoff_delay(attempt, 0.5, 4.0)
+            self.assertGreaterEqual(delay, 0.0)
+            self.assertLessEqual(delay, 4.0)
+        self.assertEqual(backoff_delay(3, 0.5, 60.0, jitter=0), 4.0)
+
+
+class TestRestAdapterCoalescing(unittest.TestCase):
+    def _run_threads(self, adapter, params_list):
+        results = [None] * len(params_list)
+
+        def call(i):
+            try:
+                results[i] = adapter.get(
+                    endpoint="search/v1/data", ep_params=params_list[i]
+                )
+            except NceiAccessException as e:
+                results[i] = e
+
+        threads = [
+            threading.Thread(target=call, args=(i,)) for i in range(len(params_list))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_identical_requests_are_coalesced(self, mock_get):
+        def slow_get(**kwargs):  # pylint: disable=unused-argument
+            time.sleep(0.05)
+            return _response(200, {"results": [{"foo": "bar"}]})
+
+        mock_get.side_effect = slow_get
+        adapter = RestAdapter()
+        results = self._run_threads(
+            adapter,
+            [{"bbox": "1,2,3,4", "limit": 1000}] * 5
+            + [{"bbox": "5,6,7,8", "limit": 1000}],
+        )
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(adapter.coalesced, 4)
+        self.assertTrue(all(r is results[0] for r in results[:5]))
+        self.assertEqual(results[5].data, [{"foo": "bar"}])
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_coalesced_failure_reaches_every_caller(self, mock_get):
+        def slow_error(**kwargs):  # pylint: disable=unused-argument
+            time.sleep(0.05)
+            raise requests.exceptions.RequestException("boom")
+
+        mock_get.side_effect = slow_error
+        results = self._run_threads(RestAdapter(), [{"bbox": "1,2,3,4"}] * 3)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(all(isinstance(r, NceiAccessException) for r in results))
+
+    @patch("ncei_access.rest_adapter.requests.Session.get")
+    def test_coalescing_disabled(self, mock_get):
+        def slow_get(**kwargs):  # pylint: disable=unused-argument
+            time.sleep(0.02)
+            return _response(200, {"results": []})
+
+        mock_get.side_effect = slow_get
+        adapter = RestAdapter(coalesce=False)
+        self._run_threads(adapter, [{"bbox": "1,2,3,4"}] * 3)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(adapter.coalesced, 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for the ncei_access.store module."""
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock
+from ncei_access.store import DailyStore, merge_intervals, subtract_intervals
+
+
+def d(s):
+    return date.fromisoformat(s)
+
+
+class TestIntervals(unittest.TestCase):
+    def test_merge_intervals(self):
+        self.assertEqual(
+            merge_intervals(
+                [(d("2000-01-05"), d("2000-01-09")), (d("2000-01-01"), d("2000-01-04"))]
+            ),
+            [(d("2000-01-01"), d("2000-01-09"))],
+        )
+
+    def test_subtract_intervals(self):
+        held = [(d("2000-01-03"), d("2000-01-05")), (d("2000-01-08"), d("2000-01-09"))]
+        self.assertEqual(
+            subtract_intervals((d("2000-01-01"), d("2000-01-10")), held),
+            [
+                (d("2000-01-01"), d("2000-01-02")),
+                (d("2000-01-06"), d("2000-01-07")),
+                (d("2000-01-10"), d("2000-01-10")),
+            ],
+        )
+        self.assertEqual(subtract_intervals((d("2000-01-03"), d("2000-01-04")), held), [])
+
+
+class TestDailyStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.accessor = MagicMock()
+        self.accessor.get_daily.side_effect = self.fake_get_daily
+        self.store = DailyStore(
+            path=Path(self.tmp.name) / "daily.sqlite", accessor=self.accessor
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @staticmethod
+    def fake_get_daily(data_types, stations, start, end, **kwargs):  # pylint: disable=unused-argument
+        rows = []
+        for station in stations:
+            for day in (start, end):
+                row = {"DATE": day, "STATION": station}
+                row.update({t: "1" for t in data_types})
+                rows.append(row)
+        return rows
+
+    def test_only_gaps_are_fetched(self):
+        first = self.store.get_daily(["TMAX"], ["S1", "S2"], "2000-01-01", "2000-12-31")
+        self.assertEqual(self.accessor.get_daily.call_count, 1)
+        self.assertEqual(len(first), 4)
+
+        self.store.get_daily(["TMAX"], ["S1", "S2"], "2000-06-01", "2000-12-31")
+        self.assertEqual(self.accessor.get_daily.call_count, 1)
+
+        rows = self.store.get_daily(["TMAX"], ["S1"], "2000-06-01", "2001-01-31")
+        self.assertEqual(self.accessor.get_daily.call_count, 2)
+        _, kwargs = self.accessor.get_daily.call_args
+        self.assertEqual((kwargs["start"], kwargs["end"]), ("2001-01-01", "2001-01-31"))
+        self.assertEqual(
+            [r["DATE"] for r in rows], ["2000-12-31", "2001-01-01", "2001-01-31"]
+        )
+
+    def test_recent_days_are_refetched(self):
+        today = date.today().isoformat()
+        self.store.get_daily("TMAX", "S1", "2000-01-01", today)
+        self.store.get_daily("TMAX", "S1", "2000-01-01", today)
+        self.assertEqual(self.accessor.get_daily.call_count, 2)
+        _, kwargs = self.accessor.get_daily.call_args
+        self.assertGreater(kwargs["start"], "2000-01-01")
+
+
+if __name__ == "__main__":
+    unittest.main()